@@ -0,0 +1,264 @@
+"""Vistas asincronas servidas antes del handler ASGI de Django
+
+Django 3.0 no tiene vistas ni ORM asincronos, asi que las lecturas mas
+frecuentes se atienden con handlers async que solo usan hilos para la base
+de datos y el cache. Si un handler no puede responder retorna None y la
+peticion sigue por Django, con sus middlewares y vistas DRF.
+
+Las respuestas de los handlers no pasan por MIDDLEWARE. Router registra
+sus metricas como RequestMetricsMiddleware y agrega los headers de
+DEFAULT_HEADERS; como solo atienden GET autenticados con un token, no usan
+sesion, CSRF ni mensajes.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.exceptions import DisallowedHost
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from core import metrics
+
+
+# Headers que agregan los middlewares que estas vistas no recorren
+DEFAULT_HEADERS = (
+    ('Vary', 'Accept'),
+    ('X-Frame-Options', 'DENY'),
+    ('X-Content-Type-Options', 'nosniff'),
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Metricas de la peticion en curso, None si no se muestrea
+_request_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+
+def db_threads():
+    return getattr(settings, 'ASGI_DB_THREADS', 16)
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=db_threads(),
+                thread_name_prefix='asgi-db'
+            )
+
+    return _executor
+
+
+def _call_with_metrics(fn, request_metrics, *args):
+    if request_metrics is None:
+        return fn(*args)
+    with metrics.collect(request_metrics):
+        return fn(*args)
+
+
+def _call_with_connection(fn, request_metrics, *args):
+    close_old_connections()
+    try:
+        return _call_with_metrics(fn, request_metrics, *args)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(fn, *args):
+    """Ejecuta fn, que usa la base de datos o el cache, en un hilo
+
+    Se usa un pool propio de ASGI_DB_THREADS hilos, que acota las
+    conexiones abiertas. Con 0 se usa el hilo sincronico de asgiref, como
+    en los tests donde la conexion es la del test.
+    """
+    # Las consultas del hilo se suman a las metricas de la peticion
+    request_metrics = _request_metrics.get()
+    if db_threads() <= 0:
+        return await sync_to_async(
+            _call_with_metrics, thread_sensitive=True
+        )(fn, request_metrics, *args)
+
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(),
+        functools.partial(_call_with_connection, fn, request_metrics, *args)
+    )
+
+
+class Response(object):
+
+    def __init__(self, data=None, status=200, headers=None):
+        self.status = status
+        self.headers = dict(DEFAULT_HEADERS)
+        self.headers.update(headers or {})
+        self.body = b''
+        if data is not None:
+            self.body = JSONRenderer().render(data)
+            self.headers['Content-Type'] = 'application/json'
+
+    async def send(self, send):
+        headers = [
+            (name.encode('latin1'), str(value).encode('latin1'))
+            for name, value in self.headers.items()
+        ]
+        headers.append((b'Content-Length', str(len(self.body)).encode()))
+        await send({
+            'type': 'http.response.start',
+            'status': self.status,
+            'headers': headers,
+        })
+        await send({'type': 'http.response.body', 'body': self.body})
+
+
+def jwt_authentication():
+    """La autenticacion JWT de DEFAULT_AUTHENTICATION_CLASSES, o None
+
+    Es la misma que usan las vistas DRF: ClaimsJWTAuthentication con
+    JWT_STATELESS, si no JWTAuthentication, que consulta el usuario.
+    """
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        if issubclass(authentication_class, JWTAuthentication):
+            return authentication_class()
+
+    return None
+
+
+async def authenticate(request):
+    """Retorna el usuario del token, o None
+
+    Con None la peticion sigue por Django, que responde los errores de
+    autenticacion y los demas tipos de credenciales.
+    """
+    authentication = jwt_authentication()
+    if authentication is None:
+        return None
+    raw_token = authentication.get_raw_token(
+        authentication.get_header(request) or b''
+    )
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+        user = await run_sync(authentication.get_user, token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+    return user
+
+
+class Router(object):
+    """Aplicacion ASGI que atiende algunas urls con vistas async
+
+    routes mapea nombres de urls a las rutas de sus vistas. Cada vista
+    recibe el request de Django (sin cuerpo) y retorna un Response o None.
+    Las respuestas muestreadas se registran con el nombre de la url.
+    """
+
+    def __init__(self, application, routes):
+        self.application = application
+        self.routes = routes
+        self.views = None
+
+    def get_views(self):
+        if self.views is None:
+            self.views = {
+                reverse(name): (name, import_string(view))
+                for name, view in self.routes.items()
+            }
+
+        return self.views
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            route = self.get_views().get(scope['path'])
+            if route is not None:
+                name, view = route
+                response = await self.call_view(name, view, scope)
+                if response is not None:
+                    return await response.send(send)
+
+        return await self.application(scope, receive, send)
+
+    async def call_view(self, name, view, scope):
+        request_metrics = (
+            metrics.RequestMetrics() if metrics.sampled() else None
+        )
+        token = _request_metrics.set(request_metrics)
+        start = time.perf_counter()
+        try:
+            response = await view(ASGIRequest(scope, BytesIO()))
+        except DisallowedHost:
+            # Django responde el error
+            response = None
+        finally:
+            _request_metrics.reset(token)
+        duration = time.perf_counter() - start
+
+        if response is not None and request_metrics is not None:
+            metrics.registry.observe(
+                name, 'GET', response.status, duration, request_metrics,
+                len(response.body)
+            )
+            response.headers['Server-Timing'] = metrics.server_timing(
+                request_metrics, duration
+            )
+
+        return response
+
+
+async def call(application, method, path, headers=None, query_string=''):
+    """Hace una peticion a una aplicacion ASGI y retorna (status,
+    headers, cuerpo)
+    """
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string.encode(),
+        'root_path': '',
+        'headers': [
+            (name.lower().encode('latin1'), value.encode('latin1'))
+            for name, value in (headers or {}).items()
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    start = messages[0]
+    body = b''.join(
+        message.get('body', b'') for message in messages[1:]
+    )
+
+    return start['status'], dict(
+        (name.decode('latin1').lower(), value.decode('latin1'))
+        for name, value in start['headers']
+    ), body
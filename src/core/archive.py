@@ -0,0 +1,411 @@
+"""Exportacion e importacion de los datos de carrera en un zip
+
+El archivo tiene:
+
+- manifest.json: version del formato y filas exportadas.
+- skills.jsonl: el catalogo de habilidades, solo al exportar todo.
+- users/00000.jsonl, ...: un usuario por linea con sus habilidades, por
+  nombre, y sus trabajos. Cada archivo es un lote de usuarios.
+- photos/: las fotos originales, escritas despues de su lote.
+
+Se escribe y se lee por lotes de usuarios, asi la memoria usada no depende
+del numero de filas.
+"""
+import io
+import json
+import os
+import zipfile
+
+from collections import defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import models
+from . import routers
+from . import signals
+
+
+FORMAT_VERSION = 1
+
+CHUNK_SIZE = 2000
+
+MANIFEST = 'manifest.json'
+SKILLS = 'skills.jsonl'
+USERS_DIR = 'users/'
+PHOTOS_DIR = 'photos/'
+
+USER_FIELDS = (
+    'email', 'first_name', 'last_name', 'cellphone',
+    'is_active', 'is_staff', 'is_superuser'
+)
+
+JOB_FIELDS = ('title', 'company', 'start_date', 'end_date', 'present_day')
+
+
+class ArchiveError(ValueError):
+    """El archivo no es una exportacion valida"""
+
+
+class StreamBuffer(object):
+    """Destino de escritura del zip que se vacia entre lotes
+
+    No tiene tell ni seek, asi zipfile escribe cada entrada de corrido.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+
+        return data
+
+
+def chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def user_chunks(queryset, chunk_size):
+    """Genera los usuarios por lotes, paginando por id"""
+    last_id = 0
+    while True:
+        users = list(queryset.filter(id__gt=last_id).order_by('id').values(
+            'id', 'password', 'photo', *USER_FIELDS
+        )[:chunk_size])
+        if not users:
+            return
+        last_id = users[-1]['id']
+        yield users
+
+
+def photo_entry(name):
+    return PHOTOS_DIR + os.path.basename(name)
+
+
+def user_rows(users, include_passwords):
+    """Arma las filas de un lote de usuarios con tres consultas"""
+    user_ids = [user['id'] for user in users]
+    skills = defaultdict(list)
+    for user_id, name, proficiency in models.UserSkill.objects.filter(
+        user_id__in=user_ids
+    ).order_by('user_id', '-proficiency', 'skill__name').values_list(
+        'user_id', 'skill__name', 'proficiency'
+    ):
+        skills[user_id].append({'name': name, 'proficiency': proficiency})
+
+    jobs = defaultdict(list)
+    for job in models.Job.objects.filter(
+        user_id__in=user_ids
+    ).order_by('user_id', 'start_date', 'id').values('user_id', *JOB_FIELDS):
+        user_id = job.pop('user_id')
+        for field in ('start_date', 'end_date'):
+            if job[field] is not None:
+                job[field] = job[field].isoformat()
+        jobs[user_id].append(job)
+
+    for user in users:
+        row = {field: user[field] for field in USER_FIELDS}
+        row['cellphone'] = str(user['cellphone'] or '')
+        row['password'] = user['password'] if include_passwords else None
+        row['photo'] = photo_entry(user['photo']) if user['photo'] else None
+        row['skills'] = skills[user['id']]
+        row['jobs'] = jobs[user['id']]
+        yield row
+
+
+def write_lines(archive, name, rows):
+    with archive.open(name, 'w') as f:
+        for row in rows:
+            f.write(json.dumps(row).encode() + b'\n')
+
+
+def write_photo(archive, name):
+    if not default_storage.exists(name):
+        return False
+    with default_storage.open(name) as source:
+        with archive.open(photo_entry(name), 'w', force_zip64=True) as f:
+            for chunk in File(source).chunks():
+                f.write(chunk)
+
+    return True
+
+
+def write_archive(out, users=None, include_passwords=True,
+                  chunk_size=CHUNK_SIZE):
+    """Escribe en out la exportacion de users, o de todos los usuarios
+
+    Al exportar todo tambien se incluye el catalogo de habilidades. Es un
+    generador que avanza un lote por vez, para poder enviar lo escrito en
+    out entre lotes; retorna las filas exportadas por tipo.
+    """
+    counts = {'skills': 0, 'users': 0, 'user_skills': 0, 'jobs': 0,
+              'photos': 0}
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as archive:
+        if users is None:
+            users = models.User.objects.all()
+            with archive.open(SKILLS, 'w') as f:
+                for names in chunks(
+                    models.Skill.objects.order_by('id').values_list(
+                        'name', flat=True
+                    ).iterator(chunk_size=chunk_size),
+                    chunk_size
+                ):
+                    f.write(b''.join(
+                        json.dumps({'name': name}).encode() + b'\n'
+                        for name in names
+                    ))
+                    counts['skills'] += len(names)
+                    yield counts
+
+        for i, chunk in enumerate(user_chunks(users, chunk_size)):
+            rows = list(user_rows(chunk, include_passwords))
+            write_lines(archive, '{}{:05d}.jsonl'.format(USERS_DIR, i), rows)
+            counts['users'] += len(rows)
+            counts['user_skills'] += sum(len(row['skills']) for row in rows)
+            counts['jobs'] += sum(len(row['jobs']) for row in rows)
+            yield counts
+
+            for user in chunk:
+                if user['photo'] and write_photo(archive, user['photo']):
+                    counts['photos'] += 1
+                    yield counts
+
+        archive.writestr(MANIFEST, json.dumps({
+            'version': FORMAT_VERSION,
+            'created': timezone.now().isoformat(),
+            'counts': counts,
+        }))
+
+    return counts
+
+
+def export_archive(out, **kwargs):
+    """Escribe la exportacion completa en out y retorna las filas"""
+    generator = write_archive(out, **kwargs)
+    while True:
+        try:
+            next(generator)
+        except StopIteration as stop:
+            return stop.value
+
+
+def stream_archive(**kwargs):
+    """Genera los bytes del zip a medida que se escriben los lotes"""
+    buffer = StreamBuffer()
+    for _ in write_archive(buffer, **kwargs):
+        data = buffer.drain()
+        if data:
+            yield data
+    yield buffer.drain()
+
+
+def read_lines(archive, name):
+    with archive.open(name) as f:
+        for line in io.TextIOWrapper(f, encoding='utf-8'):
+            if line.strip():
+                yield json.loads(line)
+
+
+def resolve_skills(names, counts):
+    """Retorna los ids de las habilidades, creando las que faltan"""
+    skill_ids = dict(models.Skill.objects.filter(
+        name__in=names
+    ).values_list('name', 'id'))
+    missing = set(names) - set(skill_ids)
+    if missing:
+        counts['skills'] += models.Skill.objects.bulk_create_skills(missing)
+        skill_ids.update(models.Skill.objects.filter(
+            name__in=missing
+        ).values_list('name', 'id'))
+
+    return skill_ids
+
+
+def save_photo(archive, entry):
+    """Copia una foto del zip al storage y retorna su ruta"""
+    field = models.User._meta.get_field('photo')
+    with archive.open(entry) as f:
+        return default_storage.save(
+            field.generate_filename(None, os.path.basename(entry)),
+            File(f)
+        )
+
+
+def check_skills(email, row):
+    """Falla si la fila repite una habilidad, antes de copiar las fotos"""
+    names = set()
+    for skill in row.get('skills', []):
+        if skill['name'] in names:
+            raise ArchiveError('User {} has the skill {} twice'.format(
+                email, skill['name']
+            ))
+        names.add(skill['name'])
+
+
+def import_users(archive, rows, counts):
+    """Crea los usuarios de un lote con sus habilidades y trabajos
+
+    Los usuarios que ya existen, por email, se saltan completos. Si el
+    lote falla se borran las fotos que ya se habian copiado.
+    """
+    by_email = {}
+    for row in rows:
+        by_email.setdefault(
+            models.User.objects.normalize_email(row['email']), row
+        )
+    existing = set(models.User.objects.filter(
+        email__in=by_email
+    ).values_list('email', flat=True))
+    new = {
+        email: row for email, row in by_email.items() if email not in existing
+    }
+    counts['skipped'] += len(rows) - len(new)
+    if not new:
+        return
+    for email, row in new.items():
+        check_skills(email, row)
+
+    skill_ids = resolve_skills({
+        skill['name'] for row in new.values()
+        for skill in row.get('skills', [])
+    }, counts)
+    photos = {}
+    try:
+        user_ids, user_skills, jobs = create_users(
+            archive, new, skill_ids, photos
+        )
+    except Exception:
+        for photo in photos.values():
+            default_storage.delete(photo)
+        raise
+
+    # bulk_create no envia post_save
+    signals.user_skills_added.send(
+        sender=models.UserSkill,
+        user_skills=user_skills
+    )
+    signals.jobs_added.send(sender=models.Job, jobs=jobs)
+    # Los usuarios importados leen del primario hasta que las replicas
+    # los tengan
+    routers.pin(*user_ids.values())
+    counts['users'] += len(new)
+    counts['user_skills'] += len(user_skills)
+    counts['jobs'] += len(jobs)
+    counts['photos'] += len(photos)
+
+
+def create_users(archive, new, skill_ids, photos):
+    """Guarda los usuarios nuevos, agregando a photos las fotos copiadas
+
+    Retorna los ids por email y las habilidades y trabajos creados.
+    """
+    users = []
+    for email, row in new.items():
+        photo = None
+        if row.get('photo'):
+            photo = photos[email] = save_photo(archive, row['photo'])
+        users.append(models.User(
+            email=email,
+            password=row.get('password') or make_password(None),
+            photo=photo,
+            **{
+                field: row[field] for field in USER_FIELDS
+                if field != 'email' and field in row
+            }
+        ))
+
+    with transaction.atomic():
+        models.User.objects.bulk_create(users)
+        user_ids = dict(models.User.objects.filter(
+            email__in=new
+        ).values_list('email', 'id'))
+        user_skills = [
+            models.UserSkill(
+                user_id=user_ids[email],
+                skill_id=skill_ids[skill['name']],
+                proficiency=skill['proficiency']
+            )
+            for email, row in new.items()
+            for skill in row.get('skills', [])
+        ]
+        models.UserSkill.objects.bulk_create(user_skills)
+        jobs = [
+            models.Job(
+                user_id=user_ids[email],
+                title=job.get('title', ''),
+                company=job['company'],
+                start_date=parse_date(job['start_date']),
+                end_date=parse_date(job.get('end_date') or '') or None,
+                present_day=job.get('present_day', False)
+            )
+            for email, row in new.items()
+            for job in row.get('jobs', [])
+        ]
+        models.Job.objects.bulk_create(jobs)
+        # Las miniaturas de las fotos se generan en segundo plano
+        models.Task.objects.bulk_create([
+            models.Task(
+                kind='photo_thumbnails',
+                user_id=user_ids[email],
+                params=json.dumps({'photo': photo})
+            )
+            for email, photo in photos.items()
+        ])
+
+    return user_ids, user_skills, jobs
+
+
+def import_archive(file, chunk_size=CHUNK_SIZE):
+    """Importa una exportacion y retorna las filas creadas por tipo"""
+    counts = {'skills': 0, 'users': 0, 'skipped': 0, 'user_skills': 0,
+              'jobs': 0, 'photos': 0}
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        raise ArchiveError('The file is not a zip archive')
+
+    with archive:
+        names = archive.namelist()
+        if MANIFEST not in names:
+            raise ArchiveError('The archive has no manifest')
+        manifest = json.loads(archive.read(MANIFEST).decode('utf-8'))
+        if manifest.get('version') != FORMAT_VERSION:
+            raise ArchiveError('Unsupported archive version {}'.format(
+                manifest.get('version')
+            ))
+
+        if SKILLS in names:
+            for rows in chunks(read_lines(archive, SKILLS), chunk_size):
+                counts['skills'] += models.Skill.objects.bulk_create_skills(
+                    [row['name'] for row in rows]
+                )
+
+        for name in sorted(
+            name for name in names
+            if name.startswith(USERS_DIR) and name.endswith('.jsonl')
+        ):
+            for rows in chunks(read_lines(archive, name), chunk_size):
+                import_users(archive, rows, counts)
+
+    return counts
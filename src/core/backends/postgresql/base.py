@@ -0,0 +1,108 @@
+"""Backend de Postgres con chequeo de conexiones y pool en el proceso
+
+Se configura con claves extra del alias en DATABASES:
+
+- CONN_HEALTH_CHECKS: antes de la primera consulta de cada peticion se
+  comprueba que una conexion reusada siga viva, como en Django 4.1.
+- POOL: {'MAX_SIZE': n, 'TIMEOUT': s, 'MAX_IDLE': s}. Con MAX_SIZE mayor
+  a 0 las conexiones cerradas por Django vuelven a un pool del proceso en
+  vez de cerrarse, y las peticiones siguientes las reusan.
+"""
+from django.db.backends.postgresql import base
+
+from psycopg2 import extensions
+
+from core import db
+
+
+def is_alive(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not connection.autocommit:
+            connection.rollback()
+    except base.Database.Error:
+        return False
+
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        self.pool = None
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    def get_pool(self, conn_params):
+        options = self.settings_dict.get('POOL') or {}
+        if options.get('MAX_SIZE', 0) <= 0:
+            return None
+
+        return db.get_pool(
+            self.alias,
+            lambda: base.Database.connect(**conn_params),
+            options['MAX_SIZE'],
+            options.get('TIMEOUT', 5),
+            options.get('MAX_IDLE', 300)
+        )
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        if self.pool is None:
+            self.health_check_done = True
+            return super().get_new_connection(conn_params)
+
+        connection, reused = self.pool.get()
+        # Las conexiones del pool pudieron cortarse mientras esperaban
+        check = self.health_check_enabled
+        while reused and check and not is_alive(connection):
+            self.pool.put(connection, discard=True)
+            connection, reused = self.pool.get()
+        self.health_check_done = True
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+
+        return connection
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+
+        connection = self.connection
+        discard = self.errors_occurred
+        with self.wrap_database_errors:
+            try:
+                status = connection.get_transaction_status()
+                if status != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except base.Database.Error:
+                discard = True
+            finally:
+                self.pool.put(connection, discard=discard)
+
+    def close_if_unusable_or_obsolete(self):
+        # Se llama al empezar y al terminar cada peticion
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def ensure_connection(self):
+        if (
+            self.connection is not None and
+            self.health_check_enabled and
+            not self.health_check_done and
+            not self.in_atomic_block
+        ):
+            self.health_check_done = True
+            if not is_alive(self.connection):
+                self.close()
+
+        super().ensure_connection()
@@ -0,0 +1,443 @@
+import asyncio
+import json
+import math
+import platform
+import random
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from datetime import timedelta
+
+import django
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.db import connections
+from django.db import transaction
+from django.test import Client
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from users.serializers import TokenObtainPairSerializer
+
+from . import aio
+from . import models
+
+
+# Los datos sinteticos se reconocen por estos prefijos y se pueden borrar
+EMAIL_DOMAIN = 'bench.example.com'
+ADMIN_EMAIL = 'admin@' + EMAIL_DOMAIN
+SKILL_PREFIX = 'Bench skill '
+PASSWORD = 'bench-password'
+
+BATCH_SIZE = 5000
+
+
+def bench_email(i):
+    return 'user{}@{}'.format(i, EMAIL_DOMAIN)
+
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed(users, skills, skills_per_user=5, jobs_per_user=2,
+         batch_size=BATCH_SIZE, random_seed=0):
+    """Carga usuarios, habilidades, trabajos y habilidades de usuarios
+
+    Los datos son deterministas para una misma semilla, y todos los
+    usuarios comparten la clave PASSWORD. Tambien crea el administrador
+    de los escenarios. Retorna las filas creadas por tabla.
+    """
+    rng = random.Random(random_seed)
+    # Hashear una sola vez, con el mismo costo que un usuario real
+    password = make_password(PASSWORD)
+    skills_per_user = min(skills_per_user, skills)
+    counts = {}
+
+    counts['skills'] = 0
+    for names in batches(
+        ('{}{}'.format(SKILL_PREFIX, i) for i in range(skills)), batch_size
+    ):
+        counts['skills'] += models.Skill.objects.bulk_create_skills(
+            names, batch_size=batch_size
+        )
+    skill_ids = list(models.Skill.objects.filter(
+        name__startswith=SKILL_PREFIX
+    ).values_list('id', flat=True))
+
+    models.User.objects.get_or_create(
+        email=ADMIN_EMAIL,
+        defaults={
+            'password': password,
+            'is_staff': True,
+            'is_superuser': True,
+        }
+    )
+    start = models.User.objects.filter(
+        email__endswith='@' + EMAIL_DOMAIN
+    ).exclude(email=ADMIN_EMAIL).count()
+    counts['users'] = counts['user_skills'] = counts['jobs'] = 0
+    for emails in batches(
+        (bench_email(i) for i in range(start, start + users)), batch_size
+    ):
+        with transaction.atomic():
+            models.User.objects.bulk_create([
+                models.User(email=email, password=password, first_name='Bench')
+                for email in emails
+            ])
+            user_ids = list(models.User.objects.filter(
+                email__in=emails
+            ).values_list('id', flat=True))
+            user_skills = [
+                models.UserSkill(
+                    user_id=user_id,
+                    skill_id=skill_id,
+                    proficiency=rng.randint(1, 5)
+                )
+                for user_id in user_ids
+                for skill_id in rng.sample(skill_ids, skills_per_user)
+            ]
+            models.UserSkill.objects.bulk_create(user_skills)
+            jobs = [
+                build_job(rng, user_id)
+                for user_id in user_ids
+                for _ in range(jobs_per_user)
+            ]
+            models.Job.objects.bulk_create(jobs)
+        counts['users'] += len(user_ids)
+        counts['user_skills'] += len(user_skills)
+        counts['jobs'] += len(jobs)
+
+    return counts
+
+
+def build_job(rng, user_id):
+    start_date = date(2000, 1, 1) + timedelta(days=rng.randint(0, 7000))
+    present_day = rng.random() < 0.2
+
+    return models.Job(
+        user_id=user_id,
+        title='Engineer',
+        company='Company {}'.format(rng.randint(1, 1000)),
+        start_date=start_date,
+        end_date=(
+            None if present_day
+            else start_date + timedelta(days=rng.randint(30, 2000))
+        ),
+        present_day=present_day
+    )
+
+
+def clear():
+    """Borra los datos sinteticos cargados por seed y por los escenarios
+
+    El dominio de los emails incluye al administrador de los escenarios.
+    """
+    users = models.User.objects.filter(email__endswith='@' + EMAIL_DOMAIN)
+    deleted = users.delete()[0]
+    deleted += models.Skill.objects.filter(
+        name__startswith=SKILL_PREFIX
+    ).delete()[0]
+
+    return deleted
+
+
+def percentile(values, percent):
+    """Percentil por rango mas cercano de una lista ordenada"""
+    if not values:
+        return None
+    index = max(math.ceil(percent / 100 * len(values)) - 1, 0)
+
+    return values[index]
+
+
+def summarize(timings, queries, statuses):
+    timings = sorted(timings)
+    if not timings:
+        return {'requests': 0, 'statuses': {}}
+    summary = {
+        'requests': len(timings),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+        'max_ms': round(timings[-1] * 1000, 3),
+        'statuses': {
+            str(code): statuses.count(code) for code in sorted(set(statuses))
+        },
+    }
+    if queries is not None:
+        summary['queries_p50'] = percentile(sorted(queries), 50)
+        summary['queries_max'] = max(queries)
+
+    return summary
+
+
+def measure(request, iterations, warmup=0):
+    """Ejecuta request varias veces y mide latencia y consultas
+
+    request recibe el numero de iteracion y retorna la respuesta.
+    """
+    for i in range(warmup):
+        request(-i - 1)
+
+    timings = []
+    queries = []
+    statuses = []
+    for i in range(iterations):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = request(i)
+            timings.append(time.perf_counter() - start)
+        queries.append(len(context.captured_queries))
+        statuses.append(response.status_code)
+
+    return summarize(timings, queries, statuses)
+
+
+def measure_wsgi(path, headers, iterations, concurrency):
+    """Pide path con concurrency hilos a traves del handler WSGI"""
+    clients = {}
+
+    def request(i):
+        client = clients.setdefault(
+            threading.get_ident(), Client(**wsgi_headers(headers))
+        )
+        start = time.perf_counter()
+        response = client.get(path)
+
+        return time.perf_counter() - start, response.status_code
+
+    def close(i):
+        connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(request, range(iterations)))
+        list(pool.map(close, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return summarize_concurrent(results, elapsed)
+
+
+def wsgi_headers(headers):
+    return {
+        'HTTP_' + name.upper().replace('-', '_'): value
+        for name, value in headers.items()
+    }
+
+
+def measure_asgi(path, headers, iterations, concurrency):
+    """Pide path con concurrency peticiones a la vez en la aplicacion ASGI"""
+    application = import_string('resume_generator.asgi.application')
+    slots = asyncio.Semaphore(concurrency)
+    headers = dict(headers, host='testserver')
+
+    async def request(i):
+        async with slots:
+            start = time.perf_counter()
+            status = (await aio.call(application, 'GET', path, headers))[0]
+
+            return time.perf_counter() - start, status
+
+    async def run_all():
+        return await asyncio.gather(*(
+            request(i) for i in range(iterations)
+        ))
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+
+    return summarize_concurrent(results, elapsed)
+
+
+def summarize_concurrent(results, elapsed):
+    timings = [timing for timing, status in results]
+    summary = summarize(
+        timings, None, [status for timing, status in results]
+    )
+    summary['requests_per_second'] = round(len(results) / elapsed, 1)
+
+    return summary
+
+
+INTERFACES = {
+    'wsgi': measure_wsgi,
+    'asgi': measure_asgi,
+}
+
+
+class Scenarios(object):
+    """Peticiones medidas por el benchmark, ejecutadas en el proceso"""
+
+    def __init__(self):
+        users = models.User.objects.filter(
+            email__endswith='@' + EMAIL_DOMAIN
+        )
+        self.user = users.exclude(email=ADMIN_EMAIL).order_by('id').first()
+        self.admin = users.filter(email=ADMIN_EMAIL).first()
+        if self.user is None or self.admin is None:
+            raise ValueError('There is no benchmark data, seed it first')
+        # Cada corrida crea nombres distintos para no chocar con la anterior
+        self.run_id = timezone.now().strftime('%Y%m%d%H%M%S%f')
+
+    def client(self, user=None):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+
+        return client
+
+    def token_headers(self, user):
+        token = TokenObtainPairSerializer.get_token(user).access_token
+
+        return {'Authorization': 'Bearer {}'.format(token)}
+
+    def token_client(self, user):
+        """Cliente autenticado con un token de acceso JWT"""
+        return Client(**wsgi_headers(self.token_headers(user)))
+
+    def reads(self):
+        """Lecturas que se comparan entre WSGI y ASGI"""
+        return {
+            'users_me': reverse('users:me'),
+            'users_resume': reverse('users:resume'),
+            'skills_list': reverse('skills:list'),
+        }
+
+    def all(self):
+        return {
+            'users_token': self.users_token(),
+            'users_me': self.users_me(),
+            'skills_list': self.skills_list(),
+            'users_create': self.users_create(),
+            'skills_create': self.skills_create(),
+        }
+
+    def users_token(self):
+        client = self.client()
+        url = reverse('users:token')
+        payload = {'email': self.user.email, 'password': PASSWORD}
+
+        return lambda i: client.post(url, payload)
+
+    def users_me(self):
+        client = self.token_client(self.user)
+        url = reverse('users:me')
+
+        return lambda i: client.get(url)
+
+    def skills_list(self):
+        client = self.token_client(self.user)
+        url = reverse('skills:list')
+
+        return lambda i: client.get(url)
+
+    def users_create(self):
+        client = self.client()
+        url = reverse('users:create')
+
+        def request(i):
+            return client.post(url, {
+                'email': 'new{}-{}@{}'.format(self.run_id, i, EMAIL_DOMAIN),
+                'password': PASSWORD,
+            })
+
+        return request
+
+    def skills_create(self):
+        client = self.client(self.admin)
+        url = reverse('skills:create')
+
+        def request(i):
+            return client.post(url, {
+                'name': '{}{}-{}'.format(SKILL_PREFIX, self.run_id, i)
+            })
+
+        return request
+
+
+def run(iterations, warmup=5, only=None, interfaces=(), concurrency=1):
+    """Mide todos los escenarios, o los nombrados en only
+
+    Con interfaces tambien mide las lecturas con peticiones concurrentes
+    a traves de cada interfaz (wsgi, asgi).
+    """
+    results = {}
+    concurrent = {}
+    # El cliente de pruebas usa el host testserver
+    with override_settings(ALLOWED_HOSTS=['testserver']):
+        scenarios = Scenarios()
+        for name, request in scenarios.all().items():
+            if only and name not in only:
+                continue
+            results[name] = measure(request, iterations, warmup)
+
+        headers = scenarios.token_headers(scenarios.user)
+        for interface in interfaces:
+            measure_interface = INTERFACES[interface]
+            concurrent[interface] = {}
+            for name, path in scenarios.reads().items():
+                if only and name not in only:
+                    continue
+                if warmup:
+                    measure_interface(path, headers, warmup, 1)
+                concurrent[interface][name] = measure_interface(
+                    path, headers, iterations, concurrency
+                )
+
+    return {
+        'meta': {
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'iterations': iterations,
+            'concurrency': concurrency,
+            'rows': {
+                'users': models.User.objects.count(),
+                'skills': models.Skill.objects.count(),
+                'user_skills': models.UserSkill.objects.count(),
+                'jobs': models.Job.objects.count(),
+            },
+        },
+        'results': results,
+        'interfaces': concurrent,
+    }
+
+
+def compare(baseline, current):
+    """Compara dos corridas y retorna la razon de latencias y consultas"""
+    diff = {}
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        diff[name] = {
+            'p50_ratio': ratio(result['p50_ms'], before['p50_ms']),
+            'p99_ratio': ratio(result['p99_ms'], before['p99_ms']),
+            'queries_delta': result['queries_max'] - before['queries_max'],
+        }
+
+    return diff
+
+
+def ratio(value, base):
+    return round(value / base, 3) if base else None
+
+
+def dumps(results):
+    return json.dumps(results, indent=2, sort_keys=True)
@@ -0,0 +1,61 @@
+"""Version del catalogo de habilidades, compartida a traves del cache
+
+Cada cambio en Skill genera una nueva version; las respuestas cacheadas
+llevan la version en su clave, asi que nunca hace falta borrarlas.
+"""
+import hashlib
+import time
+
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+VERSION_KEY = 'skills:catalog:version'
+
+# Cambia solo cuando se renombra o borra una habilidad, no al agregarlas
+NAMES_KEY = 'skills:catalog:names'
+
+
+def get_cache():
+    return caches[getattr(settings, 'SKILLS_CACHE', 'default')]
+
+
+def catalog_version():
+    """Retorna la version actual y la fecha de modificacion (timestamp)"""
+    cache = get_cache()
+    value = cache.get(VERSION_KEY)
+    if value is None:
+        cache.add(VERSION_KEY, (uuid4().hex, int(time.time())), None)
+        value = cache.get(VERSION_KEY)
+
+    return value
+
+
+def bump_version():
+    """Invalida todo lo cacheado del catalogo"""
+    get_cache().set(VERSION_KEY, (uuid4().hex, int(time.time())), None)
+
+
+def names_version():
+    """Retorna la version de los nombres existentes del catalogo"""
+    cache = get_cache()
+    value = cache.get(NAMES_KEY)
+    if value is None:
+        cache.add(NAMES_KEY, uuid4().hex, None)
+        value = cache.get(NAMES_KEY)
+
+    return value
+
+
+def bump_names_version():
+    get_cache().set(NAMES_KEY, uuid4().hex, None)
+
+
+def cache_key(version, *parts):
+    digest = hashlib.md5(
+        '|'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+
+    return 'skills:catalog:{}:{}'.format(version, digest)
@@ -0,0 +1,163 @@
+import collections
+import threading
+import time
+
+from django.db import connections
+from django.db.utils import DatabaseError
+from django.db.utils import OperationalError
+from django.db.migrations.executor import MigrationExecutor
+
+
+def ping(alias='default'):
+    """Ejecuta una consulta para comprobar que la base responde"""
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def replication_lag(alias):
+    """Segundos de retraso de una replica, None si no responde
+
+    Una replica que ya aplico todo lo recibido no tiene retraso, aunque
+    el primario lleve tiempo sin escrituras. Fuera de Postgres las
+    replicas no tienen retraso.
+    """
+    connection = connections[alias]
+    try:
+        if connection.vendor != 'postgresql':
+            ping(alias)
+            return 0.0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT CASE'
+                ' WHEN NOT pg_is_in_recovery()'
+                ' OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()'
+                ' THEN 0'
+                ' ELSE EXTRACT(EPOCH FROM'
+                ' now() - pg_last_xact_replay_timestamp()) END'
+            )
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        connection.close()
+        return None
+
+    return float(lag or 0)
+
+
+def unapplied_migrations(alias='default'):
+    """Retorna las migraciones que faltan aplicar, como app.nombre"""
+    connection = connections[alias]
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+    return [
+        '{}.{}'.format(migration.app_label, migration.name)
+        for migration, backwards in plan
+    ]
+
+
+class PoolExhausted(OperationalError):
+    """No se libero ninguna conexion del pool a tiempo"""
+
+
+class ConnectionPool(object):
+    """Conexiones abiertas que los hilos se prestan entre peticiones
+
+    Como maximo max_size conexiones estan abiertas a la vez; un hilo que
+    pide una con todas prestadas espera hasta timeout segundos y luego
+    falla con PoolExhausted. Las conexiones libres se reusan empezando por
+    la ultima devuelta, y se cierran despues de max_idle segundos sin uso.
+    """
+
+    def __init__(self, connect, max_size, timeout=5, max_idle=300):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        # Pares (conexion, momento en que se devolvio)
+        self.idle = collections.deque()
+        self.opened = 0
+
+    def get(self):
+        """Retorna una conexion y si ya habia sido usada"""
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PoolExhausted(
+                'No database connection was released within {}s'.format(
+                    self.timeout
+                )
+            )
+        try:
+            connection = self.take_idle()
+            if connection is not None:
+                return connection, True
+            connection = self.connect()
+        except BaseException:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.opened += 1
+
+        return connection, False
+
+    def take_idle(self):
+        now = time.monotonic()
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection, released_at = self.idle.pop()
+            if connection.closed or now - released_at > self.max_idle:
+                self.discard(connection)
+                continue
+
+            return connection
+
+    def put(self, connection, discard=False):
+        """Devuelve una conexion prestada; con discard se cierra"""
+        try:
+            if discard or connection.closed:
+                self.discard(connection)
+            else:
+                with self.lock:
+                    self.idle.append((connection, time.monotonic()))
+        finally:
+            self.slots.release()
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """Cierra las conexiones libres"""
+        with self.lock:
+            idle, self.idle = self.idle, collections.deque()
+        for connection, released_at in idle:
+            self.discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, connect, max_size, timeout=5, max_idle=300):
+    """Pool de conexiones del alias, creado la primera vez que se pide"""
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None:
+            pool = _pools[alias] = ConnectionPool(
+                connect, max_size, timeout, max_idle
+            )
+
+        return pool
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
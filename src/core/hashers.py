@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id con los costos de los settings
+
+    El Argon2PasswordHasher de Django 3.0 usa Argon2i; los hashes
+    anteriores en Argon2i se siguen aceptando y, como al cambiar los
+    costos, se actualizan en el siguiente login.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
+
+    def encode(self, password, salt):
+        argon2 = self._load_library()
+        data = argon2.low_level.hash_secret(
+            password.encode(),
+            salt.encode(),
+            time_cost=self.time_cost,
+            memory_cost=self.memory_cost,
+            parallelism=self.parallelism,
+            hash_len=argon2.DEFAULT_HASH_LENGTH,
+            type=argon2.low_level.Type.ID,
+        )
+
+        return self.algorithm + data.decode('ascii')
+
+    def verify(self, password, encoded):
+        argon2 = self._load_library()
+        algorithm, rest = encoded.split('$', 1)
+        assert algorithm == self.algorithm
+        variety = rest.split('$', 1)[0]
+        try:
+            return argon2.low_level.verify_secret(
+                ('$' + rest).encode('ascii'),
+                password.encode(),
+                type=(
+                    argon2.low_level.Type.ID if variety == 'argon2id'
+                    else argon2.low_level.Type.I
+                ),
+            )
+        except argon2.exceptions.VerificationError:
+            return False
+
+    def must_update(self, encoded):
+        variety = self._decode(encoded)[1]
+
+        return variety != 'argon2id' or super().must_update(encoded)
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """BCrypt con el numero de rondas de los settings"""
+
+    @property
+    def rounds(self):
+        return settings.BCRYPT_ROUNDS
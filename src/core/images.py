@@ -0,0 +1,144 @@
+import os
+
+from io import BytesIO
+
+from PIL import Image
+from PIL import ImageOps
+from PIL import features
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+
+# Lado maximo en pixeles de cada miniatura
+THUMBNAIL_SIZES = {
+    'small': 64,
+    'medium': 256,
+    'large': 512,
+}
+
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+# Modulo de Pillow que necesita cada formato de miniatura
+FORMAT_FEATURES = {
+    'webp': 'webp',
+    'jpeg': 'jpg',
+}
+
+THUMBNAILS_PATH = 'thumbs'
+
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+
+def max_bytes():
+    return getattr(settings, 'PHOTO_MAX_BYTES', 5 * 1024 * 1024)
+
+
+def max_pixels():
+    return getattr(settings, 'PHOTO_MAX_PIXELS', 25000000)
+
+
+def validate_image(file):
+    """Valida el tamaño y las dimensiones de una imagen sin decodificarla
+
+    Image.open solo lee la cabecera, los pixeles no se cargan. Retorna el
+    formato de la imagen.
+    """
+    if file.size > max_bytes():
+        raise ValidationError('Image is larger than {} bytes'.format(
+            max_bytes()
+        ))
+
+    position = file.tell()
+    try:
+        image = Image.open(file)
+        width, height = image.size
+        image_format = image.format
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError('Upload a valid image')
+    finally:
+        file.seek(position)
+
+    if image_format not in ALLOWED_FORMATS:
+        raise ValidationError('Unsupported image format')
+    if width * height > max_pixels():
+        raise ValidationError('Image is larger than {} pixels'.format(
+            max_pixels()
+        ))
+
+    return image_format
+
+
+def thumbnail_formats():
+    """Formatos de miniatura que soporta el Pillow instalado
+
+    Pillow compilado sin libwebp no puede guardar WEBP.
+    """
+    return {
+        extension: value for extension, value in THUMBNAIL_FORMATS.items()
+        if features.check(FORMAT_FEATURES[extension])
+    }
+
+
+def thumbnail_path(photo_name, size, extension):
+    """Ruta de una miniatura de la foto en el storage"""
+    directory, filename = os.path.split(photo_name)
+    stem = os.path.splitext(filename)[0]
+
+    return os.path.join(
+        directory,
+        THUMBNAILS_PATH,
+        '{}_{}.{}'.format(stem, size, extension)
+    )
+
+
+def generate_thumbnails(photo_name):
+    """Genera las miniaturas de una foto en todos los tamaños y en los
+    formatos soportados
+    """
+    with default_storage.open(photo_name) as f:
+        image = Image.open(f)
+        # Con JPEG el decodificador puede reducir la escala al leer
+        image.draft('RGB', (max(THUMBNAIL_SIZES.values()),) * 2)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    formats = thumbnail_formats()
+    paths = {}
+    # De mayor a menor, cada miniatura parte de la anterior
+    for size, pixels in sorted(
+        THUMBNAIL_SIZES.items(), key=lambda item: -item[1]
+    ):
+        image.thumbnail((pixels, pixels), Image.LANCZOS)
+        for extension, (image_format, _) in formats.items():
+            buffer = BytesIO()
+            image.save(buffer, image_format, quality=85)
+            path = thumbnail_path(photo_name, size, extension)
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            paths['{}.{}'.format(size, extension)] = default_storage.save(
+                path, ContentFile(buffer.getvalue())
+            )
+
+    return paths
+
+
+def thumbnails_task(task, photo):
+    """Tarea que genera las miniaturas de la foto de un usuario"""
+    return generate_thumbnails(photo)
+
+
+def schedule_thumbnails(user):
+    """Encola la generacion de miniaturas de la foto del usuario"""
+    from core import tasks
+
+    if user.photo:
+        return tasks.enqueue(
+            'photo_thumbnails',
+            user=user,
+            photo=user.photo.name
+        )
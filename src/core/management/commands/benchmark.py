@@ -0,0 +1,94 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """Comando de Django que mide la latencia y consultas de la API"""
+    help = (
+        'Seeds synthetic data and benchmarks the users and skills API '
+        'against the configured PostgreSQL database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=0,
+            help='Synthetic users to seed before measuring'
+        )
+        parser.add_argument('--skills', type=int, default=1000)
+        parser.add_argument('--skills-per-user', type=int, default=5)
+        parser.add_argument('--jobs-per-user', type=int, default=2)
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--only',
+            action='append',
+            help='Scenario to measure, can be repeated'
+        )
+        parser.add_argument(
+            '--interface',
+            action='append',
+            choices=sorted(benchmark.INTERFACES),
+            help='Also measure concurrent reads through WSGI or ASGI'
+        )
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--output', help='File for the JSON results')
+        parser.add_argument(
+            '--compare',
+            help='Previous JSON results to compare against'
+        )
+        parser.add_argument(
+            '--seed-only',
+            action='store_true',
+            help='Seed the data and exit without measuring'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete the synthetic data and exit'
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted = benchmark.clear()
+            self.stdout.write('Deleted {} rows'.format(deleted))
+            return
+
+        if options['users']:
+            counts = benchmark.seed(
+                options['users'],
+                options['skills'],
+                skills_per_user=options['skills_per_user'],
+                jobs_per_user=options['jobs_per_user']
+            )
+            self.stderr.write('Seeded {}'.format(json.dumps(counts)))
+        if options['seed_only']:
+            return
+
+        try:
+            results = benchmark.run(
+                options['iterations'],
+                warmup=options['warmup'],
+                only=options['only'],
+                interfaces=options['interface'] or (),
+                concurrency=options['concurrency']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            results['compare'] = benchmark.compare(baseline, results)
+
+        output = benchmark.dumps(results)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
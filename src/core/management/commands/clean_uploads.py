@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from users import uploads
+
+
+class Command(BaseCommand):
+    """Comando de Django que borra las subidas de fotos abandonadas"""
+    help = 'Deletes chunked photo uploads idle for PHOTO_UPLOAD_MAX_AGE'
+
+    def handle(self, *args, **options):
+        removed = uploads.remove_expired()
+
+        self.stdout.write(self.style.SUCCESS(
+            'Deleted {} expired uploads'.format(removed)
+        ))
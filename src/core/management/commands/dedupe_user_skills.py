@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core import models
+from core import utils
+
+
+class Command(BaseCommand):
+    """Comando de Django que borra los UserSkill repetidos"""
+    help = 'Deletes duplicated (user, skill) rows, keeping the best one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = utils.dedupe_user_skills(
+            models.UserSkill,
+            batch_size=options['batch_size']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            'Deleted {} duplicated user skills'.format(deleted)
+        ))
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from core import archive
+from core import models
+
+
+class Command(BaseCommand):
+    """Comando de Django que exporta usuarios, habilidades y trabajos"""
+    help = (
+        'Exports users with their skills, jobs and photos to a zip of '
+        'JSON lines files'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='emails',
+            metavar='EMAIL',
+            help='Export only this user, can be repeated'
+        )
+        parser.add_argument(
+            '--no-passwords',
+            action='store_true',
+            help='Leave out the password hashes'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=archive.CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        users = None
+        if options['emails']:
+            users = models.User.objects.filter(email__in=options['emails'])
+            if not users.exists():
+                raise CommandError('No user matches the given emails')
+
+        start = time.monotonic()
+        try:
+            with open(options['path'], 'wb') as f:
+                counts = archive.export_archive(
+                    f,
+                    users=users,
+                    include_passwords=not options['no_passwords'],
+                    chunk_size=options['chunk_size']
+                )
+        except OSError as e:
+            raise CommandError('Could not export: {}'.format(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            'Exported {} in {:.2f}s'.format(
+                format_counts(counts), time.monotonic() - start
+            )
+        ))
+
+
+def format_counts(counts):
+    return ', '.join(
+        '{} {}'.format(count, name.replace('_', ' '))
+        for name, count in counts.items()
+    )
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from core import archive
+
+from .export_data import format_counts
+
+
+class Command(BaseCommand):
+    """Comando de Django que importa una exportacion de export_data"""
+    help = (
+        'Imports users with their skills, jobs and photos from a zip made '
+        'by export_data, skipping users that already exist'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--chunk-size', type=int, default=archive.CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        try:
+            with open(options['path'], 'rb') as f:
+                counts = archive.import_archive(
+                    f, chunk_size=options['chunk_size']
+                )
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError('Could not import: {}'.format(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            'Imported {} in {:.2f}s'.format(
+                format_counts(counts), time.monotonic() - start
+            )
+        ))
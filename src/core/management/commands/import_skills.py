@@ -0,0 +1,93 @@
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from core import models
+
+
+class Command(BaseCommand):
+    """Comando de Django que importa habilidades desde un CSV o JSON"""
+    help = 'Imports skills from a CSV, JSON or JSON lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format',
+            choices=('csv', 'json', 'jsonl'),
+            help='File format, guessed from the extension by default'
+        )
+        parser.add_argument(
+            '--column',
+            default='name',
+            help='CSV column or JSON key holding the skill name'
+        )
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or self.guess_format(path)
+        column = options['column']
+        chunk_size = options['chunk_size']
+
+        start = time.monotonic()
+        total = created = 0
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                names = self.read_names(f, file_format, column)
+                for chunk in self.chunks(names, chunk_size):
+                    total += len(chunk)
+                    created += models.Skill.objects.bulk_create_skills(
+                        chunk,
+                        batch_size=chunk_size
+                    )
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError('Could not import skills: {}'.format(e))
+
+        elapsed = max(time.monotonic() - start, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            'Processed {} skills, {} new, in {:.2f}s ({:.0f} rows/sec)'.format(
+                total, created, elapsed, total / elapsed
+            )
+        ))
+
+    def guess_format(self, path):
+        if path.endswith('.csv'):
+            return 'csv'
+        if path.endswith(('.jsonl', '.ndjson')):
+            return 'jsonl'
+        if path.endswith('.json'):
+            return 'json'
+        raise CommandError('Unknown file format, use --format')
+
+    def read_names(self, f, file_format, column):
+        """Genera los nombres de las habilidades del archivo"""
+        if file_format == 'csv':
+            for row in csv.DictReader(f):
+                yield row[column]
+        elif file_format == 'jsonl':
+            for line in f:
+                if line.strip():
+                    yield self.get_name(json.loads(line), column)
+        else:
+            # Un arreglo JSON no se puede leer por partes sin otra libreria
+            for item in json.load(f):
+                yield self.get_name(item, column)
+
+    def get_name(self, item, column):
+        if isinstance(item, str):
+            return item
+
+        return item[column]
+
+    def chunks(self, iterable, size):
+        chunk = []
+        for item in iterable:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
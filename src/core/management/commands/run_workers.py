@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import time
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+
+from django.core.management.base import BaseCommand
+
+from core import models
+from core import tasks
+from core import workers
+
+
+class Command(BaseCommand):
+    """Comando de Django que ejecuta las tareas encoladas"""
+    help = 'Runs queued background tasks with a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes, 1 runs tasks inline'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when the queue is empty'
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=600,
+            help='Seconds before a running task is considered abandoned'
+        )
+        parser.add_argument(
+            '--requeue-interval',
+            type=float,
+            default=60.0,
+            help='Seconds between checks for abandoned tasks'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.done = 0
+        self.failed = 0
+        self.next_requeue = 0
+
+        if options['workers'] <= 1:
+            self.run_inline()
+        else:
+            self.run_pool(options['workers'])
+
+        self.stdout.write(self.style.SUCCESS(
+            'Finished {} tasks, {} failed'.format(self.done, self.failed)
+        ))
+
+    def count(self, status):
+        if status == models.Task.DONE:
+            self.done += 1
+        else:
+            self.failed += 1
+
+    def requeue(self):
+        """Reencola las tareas abandonadas cada requeue_interval segundos
+
+        Se llama en cada vuelta del bucle, asi las tareas de un worker que
+        murio no esperan a que se reinicie el comando.
+        """
+        now = time.monotonic()
+        if now < self.next_requeue:
+            return
+        tasks.requeue_stale(self.options['stale_after'])
+        self.next_requeue = now + self.options['requeue_interval']
+
+    def idle(self):
+        """Retorna True si el comando debe terminar"""
+        if self.options['once']:
+            return True
+        time.sleep(self.options['poll_interval'])
+
+        return False
+
+    def run_inline(self):
+        while True:
+            self.requeue()
+            task_ids = tasks.claim()
+            if not task_ids:
+                if self.idle():
+                    return
+                continue
+            for task_id in task_ids:
+                self.count(tasks.run(task_id))
+
+    def run_pool(self, size):
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(
+            max_workers=size,
+            mp_context=context,
+            initializer=workers.init
+        ) as pool:
+            running = set()
+            while True:
+                self.requeue()
+                free = size - len(running)
+                task_ids = tasks.claim(limit=free) if free else []
+                running |= {
+                    pool.submit(workers.run, task_id)
+                    for task_id in task_ids
+                }
+                if not running:
+                    if self.idle():
+                        return
+                    continue
+                finished, running = wait(
+                    running,
+                    timeout=self.options['poll_interval'],
+                    return_when=FIRST_COMPLETED
+                )
+                for future in finished:
+                    self.count(future.result())
@@ -0,0 +1,40 @@
+import uvicorn
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Comando de Django que sirve la aplicacion ASGI con uvicorn"""
+    help = 'Serves resume_generator.asgi with uvicorn'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker processes'
+        )
+        parser.add_argument(
+            '--limit-concurrency',
+            type=int,
+            help='Connections per worker before answering 503'
+        )
+        parser.add_argument('--backlog', type=int, default=2048)
+        parser.add_argument('--timeout-keep-alive', type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write('Serving ASGI on http://{}:{}/'.format(
+            options['host'], options['port']
+        ))
+        uvicorn.run(
+            'resume_generator.asgi:application',
+            host=options['host'],
+            port=options['port'],
+            workers=options['workers'],
+            limit_concurrency=options['limit_concurrency'],
+            backlog=options['backlog'],
+            timeout_keep_alive=options['timeout_keep_alive'],
+            lifespan='off'
+        )
@@ -3,19 +3,72 @@ import time
 from django.db import connections
 from django.db.utils import OperationalError
 from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from core import db
 
 
 class Command(BaseCommand):
     """Comando de Django que pausa la ejecucion hasta que la db este lista"""
+    help = 'Waits until the database answers queries'
+    # Los checks del sistema no dependen de la base y demoran el arranque
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='Seconds to wait before failing'
+        )
+        parser.add_argument('--initial-delay', type=float, default=0.1)
+        parser.add_argument('--max-delay', type=float, default=2)
+        parser.add_argument(
+            '--check-migrations',
+            action='store_true',
+            help='Also wait until every migration is applied'
+        )
 
     def handle(self, *args, **options):
+        alias = options['database']
+        deadline = time.monotonic() + options['timeout']
+        delay = options['initial_delay']
+
         self.stdout.write('Waiting for database...')
-        db_conn = None
-        while not db_conn:
-            try:
-                db_conn = connections['default']
-            except OperationalError:
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1)
+        while True:
+            error = self.probe(alias, options['check_migrations'])
+            if error is None:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise CommandError(
+                    'Database not ready after {}s: {}'.format(
+                        options['timeout'], error
+                    )
+                )
+            wait = min(delay, remaining)
+            self.stdout.write('{}, waiting {:.2f} seconds...'.format(
+                error, wait
+            ))
+            time.sleep(wait)
+            delay = min(delay * 2, options['max_delay'])
 
         self.stdout.write(self.style.SUCCESS('Database available!'))
+
+    def probe(self, alias, check_migrations):
+        """Retorna None si la base esta lista o el motivo si no"""
+        try:
+            db.ping(alias)
+            if check_migrations:
+                pending = db.unapplied_migrations(alias)
+                if pending:
+                    return '{} unapplied migrations'.format(len(pending))
+        except OperationalError as e:
+            # La conexion fallida no se puede reusar
+            connections[alias].close()
+            return 'Database unavailable ({})'.format(
+                str(e).strip().split('\n')[0] or 'error'
+            )
+
+        return None
@@ -0,0 +1,262 @@
+import hmac
+import random
+import threading
+import time
+
+from contextlib import ExitStack
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.http import HttpResponseForbidden
+
+
+# Limites en segundos del histograma de duracion de las peticiones
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+_local = threading.local()
+
+
+def sample_rate():
+    return getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+
+
+class RequestMetrics(object):
+    """Metricas de una peticion en curso"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.spans = {}
+        self.depth = {}
+
+    def query_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+
+def sampled():
+    """Sortea si se instrumenta la peticion, segun METRICS_SAMPLE_RATE"""
+    rate = sample_rate()
+
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def current():
+    """Metricas de la peticion del hilo actual, None si no se muestrea"""
+    return getattr(_local, 'metrics', None)
+
+
+@contextmanager
+def span(name):
+    """Suma el tiempo del bloque a la metrica name de la peticion actual
+
+    Los bloques anidados con el mismo nombre se cuentan una sola vez.
+    """
+    metrics = current()
+    if metrics is None or metrics.depth.get(name):
+        yield
+        return
+
+    metrics.depth[name] = 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.depth[name] = 0
+        metrics.spans[name] = (
+            metrics.spans.get(name, 0.0) + time.perf_counter() - start
+        )
+
+
+@contextmanager
+def collect(metrics):
+    """Registra en metrics las consultas y spans del hilo actual"""
+    previous = current()
+    _local.metrics = metrics
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(metrics.query_wrapper)
+                )
+            yield
+    finally:
+        _local.metrics = previous
+
+
+class TimedSerializerMixin(object):
+    """Mide el tiempo de serializacion como la metrica serializer"""
+
+    def to_representation(self, instance):
+        with span('serializer'):
+            return super().to_representation(instance)
+
+
+class Registry(object):
+    """Acumula las metricas de las peticiones muestreadas del proceso"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+    def observe(self, view, method, status, duration, metrics, size):
+        key = (view, method, str(status))
+        with self.lock:
+            stats = self.views.get(key)
+            if stats is None:
+                stats = self.views[key] = {
+                    'requests': 0,
+                    'duration': 0.0,
+                    'buckets': [0] * len(DURATION_BUCKETS),
+                    'queries': 0,
+                    'db': 0.0,
+                    'serializer': 0.0,
+                    'bytes': 0,
+                }
+            stats['requests'] += 1
+            stats['duration'] += duration
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stats['buckets'][i] += 1
+            stats['queries'] += metrics.queries
+            stats['db'] += metrics.db_time
+            stats['serializer'] += metrics.spans.get('serializer', 0.0)
+            stats['bytes'] += size
+
+    def render(self):
+        """Retorna las metricas en el formato de texto de Prometheus"""
+        with self.lock:
+            views = sorted(self.views.items())
+
+        lines = [
+            '# HELP http_request_duration_seconds Request duration.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for key, stats in views:
+            labels = format_labels(key)
+            for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+                lines.append(
+                    'http_request_duration_seconds_bucket{{{},le="{}"}} {}'
+                    .format(labels, bound, count)
+                )
+            lines.append(
+                'http_request_duration_seconds_bucket{{{},le="+Inf"}} {}'
+                .format(labels, stats['requests'])
+            )
+            lines.append('http_request_duration_seconds_sum{{{}}} {}'.format(
+                labels, stats['duration']
+            ))
+            lines.append('http_request_duration_seconds_count{{{}}} {}'.format(
+                labels, stats['requests']
+            ))
+
+        counters = (
+            ('http_db_queries_total', 'queries', 'Database queries.'),
+            ('http_db_seconds_total', 'db', 'Time spent in the database.'),
+            (
+                'http_serializer_seconds_total',
+                'serializer',
+                'Time spent serializing.'
+            ),
+            ('http_response_bytes_total', 'bytes', 'Response body size.'),
+        )
+        for name, field, description in counters:
+            lines.append('# HELP {} {}'.format(name, description))
+            lines.append('# TYPE {} counter'.format(name))
+            for key, stats in views:
+                lines.append('{}{{{}}} {}'.format(
+                    name, format_labels(key), stats[field]
+                ))
+
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(key):
+    view, method, status = key
+
+    return 'view="{}",method="{}",status="{}"'.format(
+        view.replace('\\', '\\\\').replace('"', '\\"'), method, status
+    )
+
+
+registry = Registry()
+
+
+def server_timing(metrics, duration):
+    """Valor del header Server-Timing de la peticion"""
+    entries = [
+        'db;dur={:.3f};desc="{} queries"'.format(
+            metrics.db_time * 1000, metrics.queries
+        )
+    ]
+    for name, value in sorted(metrics.spans.items()):
+        entries.append('{};dur={:.3f}'.format(name, value * 1000))
+    entries.append('total;dur={:.3f}'.format(duration * 1000))
+
+    return ', '.join(entries)
+
+
+class RequestMetricsMiddleware(object):
+    """Registra consultas, tiempo de base de datos, de serializacion y
+    tamaño de la respuesta de las peticiones muestreadas
+
+    Solo se instrumenta la fraccion METRICS_SAMPLE_RATE de las peticiones,
+    el resto solo paga el sorteo.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not sampled():
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        start = time.perf_counter()
+        with collect(metrics):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(
+            view, request.method, response.status_code,
+            duration, metrics, size
+        )
+        response['Server-Timing'] = server_timing(metrics, duration)
+
+        return response
+
+
+def metrics_view(request):
+    """Expone las metricas del proceso para Prometheus
+
+    Si METRICS_TOKEN esta definido se exige como token Bearer; si no, solo
+    las ven los usuarios staff con sesion iniciada.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        allowed = hmac.compare_digest(
+            request.META.get('HTTP_AUTHORIZATION', '').encode(),
+            'Bearer {}'.format(token).encode()
+        )
+    else:
+        allowed = request.user.is_authenticated and request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
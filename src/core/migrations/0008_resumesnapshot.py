@@ -0,0 +1,25 @@
+# Generated by Django 3.0.14 on 2026-10-18 17:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_skill_name_trigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('data', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resume_snapshot', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,145 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models, transaction
+from django.db.migrations.operations import AddIndex
+from django.db.models import Count
+
+
+def drop_invalid_index(schema_editor, name):
+    """Borra el indice si quedo invalido por un CONCURRENTLY que fallo
+
+    Postgres deja el indice a medio armar marcado como invalido, y con el
+    mismo nombre el reintento falla o, con IF NOT EXISTS, no lo vuelve a
+    armar.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_index '
+            'JOIN pg_class ON pg_class.oid = pg_index.indexrelid '
+            'WHERE pg_class.relname = %s '
+            'AND pg_table_is_visible(pg_class.oid) '
+            'AND NOT pg_index.indisvalid',
+            [name]
+        )
+        invalid = cursor.fetchone() is not None
+    if invalid:
+        schema_editor.execute(
+            'DROP INDEX CONCURRENTLY IF EXISTS {}'.format(name)
+        )
+
+
+class AddIndexConcurrentlyIfPostgres(AddIndexConcurrently):
+    """AddIndexConcurrently en Postgres, AddIndex en otras bases de datos"""
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            drop_invalid_index(schema_editor, self.index.name)
+            super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        else:
+            AddIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        else:
+            AddIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+
+def dedupe(apps, schema_editor):
+    """Borra los UserSkill repetidos, dejando la mejor fila
+
+    Copia de core.utils.dedupe_user_skills al momento de esta migracion, asi
+    los cambios posteriores no cambian lo que hace. En tablas grandes
+    conviene correr antes manage.py dedupe_user_skills.
+    """
+    UserSkill = apps.get_model('core', 'UserSkill')
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            UserSkill.objects.filter(
+                user_id__gt=last_user_id
+            ).order_by('user_id').values_list(
+                'user_id', flat=True
+            ).distinct()[:1000]
+        )
+        if not user_ids:
+            return
+        last_user_id = user_ids[-1]
+
+        duplicates = UserSkill.objects.filter(
+            user_id__in=user_ids
+        ).values('user_id', 'skill_id').annotate(
+            rows=Count('id')
+        ).filter(rows__gt=1).order_by()
+        with transaction.atomic():
+            for duplicate in duplicates:
+                ids = list(UserSkill.objects.filter(
+                    user_id=duplicate['user_id'],
+                    skill_id=duplicate['skill_id']
+                ).order_by('-proficiency', 'id').values_list('id', flat=True))
+                UserSkill.objects.filter(id__in=ids[1:]).delete()
+
+
+class AddConstraintConcurrentlyIfPostgres(migrations.AddConstraint):
+    """En Postgres arma el indice unico sin bloquear escrituras"""
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        # Luego el indice se usa como constraint, que solo toma un lock
+        # breve
+        name = self.constraint.name
+        drop_invalid_index(schema_editor, name)
+        schema_editor.execute(
+            'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {} '
+            'ON core_userskill (user_id, skill_id)'.format(name)
+        )
+        schema_editor.execute(
+            'ALTER TABLE core_userskill ADD CONSTRAINT {0} '
+            'UNIQUE USING INDEX {0}'.format(name)
+        )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0009_task'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfPostgres(
+            model_name='job',
+            index=models.Index(
+                fields=['user', '-start_date'],
+                name='core_job_user_start_idx'
+            ),
+        ),
+        AddIndexConcurrentlyIfPostgres(
+            model_name='userskill',
+            index=models.Index(
+                fields=['user', '-proficiency', 'skill'],
+                name='core_userskill_user_prof_idx'
+            ),
+        ),
+        migrations.RunPython(dedupe, migrations.RunPython.noop),
+        AddConstraintConcurrentlyIfPostgres(
+            model_name='userskill',
+            constraint=models.UniqueConstraint(
+                fields=['user', 'skill'],
+                name='core_userskill_user_skill_uniq'
+            ),
+        ),
+    ]
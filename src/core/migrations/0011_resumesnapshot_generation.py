@@ -0,0 +1,18 @@
+# Generated by Django 3.0.14 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_userskill_job_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumesnapshot',
+            name='generation',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
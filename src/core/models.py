@@ -1,4 +1,9 @@
+from uuid import uuid4
+
+from django.db import connections
 from django.db import models
+from django.db import transaction
+from django.db.models import F
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import AbstractBaseUser
 from django.contrib.auth.models import BaseUserManager
@@ -6,6 +11,8 @@ from django.contrib.auth.models import PermissionsMixin
 
 from phonenumber_field.modelfields import PhoneNumberField
 
+from . import catalog
+from . import signals
 from . import utils
 
 
@@ -74,23 +81,63 @@ class User(AbstractBaseUser, PermissionsMixin):
         return '{} {}'.format(self.first_name, self.last_name)
 
     def add_skill(self, skill=None, proficiency=None):
+        user_skill = self._build_skill(skill, proficiency)
+        user_skill.save()
+
+        return user_skill
+
+    def add_skills(self, skills):
+        """Agrega varias habilidades en una sola transaccion"""
+        user_skills = [self._build_skill(**skill) for skill in skills]
+        with transaction.atomic():
+            UserSkill.objects.bulk_create(user_skills)
+            # bulk_create no envia post_save
+            self.invalidate_resume()
+        signals.user_skills_added.send(
+            sender=UserSkill,
+            user_skills=user_skills
+        )
+
+        return user_skills
+
+    def add_job(self, title='', company=None, start_date=None,
+                end_date=None, present_day=False):
+        job = self._build_job(
+            title, company, start_date, end_date, present_day
+        )
+        job.save()
+
+        return job
+
+    def add_jobs(self, jobs):
+        """Agrega varios trabajos en una sola transaccion"""
+        jobs = [self._build_job(**job) for job in jobs]
+        with transaction.atomic():
+            Job.objects.bulk_create(jobs)
+            # bulk_create no envia post_save
+            self.invalidate_resume()
+        signals.jobs_added.send(sender=Job, jobs=jobs)
+
+        return jobs
+
+    def invalidate_resume(self):
+        """Descarta el snapshot del curriculum del usuario"""
+        ResumeSnapshot.objects.filter(user_id=self.pk).invalidate()
+
+    def _build_skill(self, skill=None, proficiency=None):
         if not skill:
             raise ValueError('You need to pass a skill as argument')
         if not proficiency:
             raise ValueError('Proficiency is required')
 
-        user_skill = UserSkill(
+        return UserSkill(
             user=self,
             skill=skill,
             proficiency=proficiency
         )
 
-        user_skill.save()
-
-        return user_skill
-
-    def add_job(self, title='', company=None, start_date=None,
-                end_date=None, present_day=False):
+    def _build_job(self, title='', company=None, start_date=None,
+                   end_date=None, present_day=False):
         if not company:
             raise ValueError('Job requires company')
         if not start_date:
@@ -102,7 +149,7 @@ class User(AbstractBaseUser, PermissionsMixin):
             if end_date < start_date:
                 raise ValidationError('Start date should be before end date')
 
-        job = Job(
+        return Job(
             title=title,
             company=company,
             start_date=start_date,
@@ -111,10 +158,6 @@ class User(AbstractBaseUser, PermissionsMixin):
             user=self
         )
 
-        job.save()
-
-        return job
-
 
 class SkillManager(models.Manager):
 
@@ -128,6 +171,39 @@ class SkillManager(models.Manager):
 
         return skill
 
+    def bulk_create_skills(self, names, batch_size=1000):
+        """Crea varias habilidades ignorando las que ya existen
+
+        Retorna cuantas se crearon. Los nombres que otra transaccion crea
+        al mismo tiempo pueden contarse como creados.
+        """
+        names = sorted({
+            name.strip() for name in names if name and name.strip()
+        })
+        if not names:
+            return 0
+
+        # Django 3.0 no limita batch_size al maximo que acepta la base, y
+        # el filtro por nombre usa un parametro por cada uno
+        batch_size = min(
+            batch_size,
+            connections[self.db].ops.bulk_batch_size(['name'], names)
+        )
+        created = 0
+        for i in range(0, len(names), batch_size):
+            batch = names[i:i + batch_size]
+            existing = self.filter(name__in=batch).count()
+            self.bulk_create(
+                [self.model(name=name) for name in batch],
+                ignore_conflicts=True
+            )
+            created += len(batch) - existing
+        if created:
+            # bulk_create no envia post_save
+            catalog.bump_version()
+
+        return created
+
 
 class Skill(models.Model):
     name = models.CharField(unique=True, max_length=255)
@@ -146,6 +222,22 @@ class UserSkill(models.Model):
     skill = models.ForeignKey('Skill', on_delete=models.CASCADE)
     proficiency = models.SmallIntegerField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'skill'],
+                name='core_userskill_user_skill_uniq'
+            ),
+        ]
+        indexes = [
+            # Incluye skill para que el listado por competencia no lea la
+            # tabla
+            models.Index(
+                fields=['user', '-proficiency', 'skill'],
+                name='core_userskill_user_prof_idx'
+            ),
+        ]
+
 
 class Job(models.Model):
     title = models.CharField(max_length=255, blank=True)
@@ -158,3 +250,81 @@ class Job(models.Model):
         on_delete=models.CASCADE,
         related_name='jobs'
     )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-start_date'],
+                name='core_job_user_start_idx'
+            ),
+        ]
+
+
+class ResumeSnapshotQuerySet(models.QuerySet):
+
+    def invalidate(self):
+        """Marca los snapshots como desactualizados
+
+        Se cambia generation en vez de borrar la fila, asi no se guarda un
+        curriculum que se estaba armando con los datos anteriores.
+        """
+        return self.update(data='', generation=F('generation') + 1)
+
+
+class ResumeSnapshot(models.Model):
+    """Copia desnormalizada del curriculum de un usuario
+
+    data vacio indica que hay que volver a armarlo.
+    """
+    user = models.OneToOneField(
+        'User',
+        on_delete=models.CASCADE,
+        related_name='resume_snapshot'
+    )
+    version = models.PositiveIntegerField()
+    data = models.TextField()
+    generation = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ResumeSnapshotQuerySet.as_manager()
+
+
+class Task(models.Model):
+    """Tarea en segundo plano encolada en la base de datos"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    user = models.ForeignKey(
+        'User',
+        on_delete=models.CASCADE,
+        related_name='tasks',
+        null=True,
+        blank=True
+    )
+    kind = models.CharField(max_length=50)
+    params = models.TextField(default='{}')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    result = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import catalog
+from . import models
+
+
+@receiver(post_save, sender=models.User)
+def invalidate_user_resume(sender, instance, update_fields=None, **kwargs):
+    """Descarta el snapshot cuando cambian los datos del usuario"""
+    # El login solo actualiza last_login, que no esta en el curriculum
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    instance.invalidate_resume()
+
+
+@receiver(post_save, sender=models.UserSkill)
+@receiver(post_delete, sender=models.UserSkill)
+@receiver(post_save, sender=models.Job)
+@receiver(post_delete, sender=models.Job)
+def invalidate_owner_resume(sender, instance, **kwargs):
+    """Descarta el snapshot cuando cambian sus habilidades o trabajos"""
+    models.ResumeSnapshot.objects.filter(
+        user_id=instance.user_id
+    ).invalidate()
+
+
+@receiver(post_save, sender=models.Skill)
+def invalidate_skill_resumes(sender, instance, created=False, **kwargs):
+    """Descarta los snapshots que muestran el nombre de la habilidad"""
+    if created:
+        return
+    models.ResumeSnapshot.objects.filter(
+        user__userskill__skill=instance
+    ).invalidate()
+
+
+@receiver(post_save, sender=models.Skill)
+@receiver(post_delete, sender=models.Skill)
+def bump_catalog_version(sender, created=False, **kwargs):
+    """Invalida el catalogo de habilidades cacheado"""
+    catalog.bump_version()
+    if not created:
+        catalog.bump_names_version()
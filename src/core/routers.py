@@ -0,0 +1,183 @@
+import itertools
+import threading
+import time
+
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core import db
+
+
+# Metodos con los que una vista de lectura usa las replicas
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Apps que se leen siempre del primario, como la sesion recien creada
+# por un login
+PRIMARY_APPS = ('sessions',)
+
+PINNED_KEY = 'db-pinned:{}'
+
+_local = threading.local()
+_counter = itertools.count()
+_lags = {}
+_lags_lock = threading.Lock()
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def max_lag():
+    return getattr(settings, 'DB_REPLICA_MAX_LAG', 5)
+
+
+def lag_check_interval():
+    return getattr(settings, 'DB_REPLICA_LAG_INTERVAL', 5)
+
+
+def get_cache():
+    """Cache de los usuarios fijados, separado para que otros datos no
+    descarten un fijado antes de tiempo
+    """
+    return caches[getattr(settings, 'DB_REPLICA_PIN_CACHE', 'default')]
+
+
+def reading_from_replica():
+    return getattr(_local, 'replica', False)
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """Las lecturas del bloque se hacen en una replica, si hay alguna
+
+    Con enabled en False el bloque lee del primario.
+    """
+    previous = reading_from_replica()
+    _local.replica = enabled
+    try:
+        yield
+    finally:
+        _local.replica = previous
+
+
+def pin(*user_ids):
+    """Lee del primario lo que pidan los usuarios por un tiempo
+
+    Se llama despues de una escritura, para que el usuario vea sus cambios
+    aunque las replicas aun no los tengan.
+    """
+    get_cache().set_many(
+        {PINNED_KEY.format(user_id): True for user_id in user_ids},
+        getattr(settings, 'DB_REPLICA_PIN_SECONDS', 10)
+    )
+
+
+def is_pinned(user):
+    if user is None or not user.is_authenticated:
+        return False
+
+    return get_cache().get(PINNED_KEY.format(user.pk)) is not None
+
+
+def recently_written(timestamp):
+    """Si un cambio hecho en timestamp puede no estar aun en las replicas"""
+    return time.time() - timestamp <= max_lag() + 1
+
+
+def read(user, fn, *args):
+    """Ejecuta fn leyendo de las replicas, salvo que el usuario este fijado
+    al primario
+    """
+    if is_pinned(user):
+        return fn(*args)
+    with use_replica():
+        return fn(*args)
+
+
+def replica_lag(alias):
+    """Retraso de la replica, revisado cada DB_REPLICA_LAG_INTERVAL
+
+    Retorna None si la replica no responde.
+    """
+    now = time.monotonic()
+    with _lags_lock:
+        checked = _lags.get(alias)
+    if checked is not None and now - checked[0] < lag_check_interval():
+        return checked[1]
+
+    lag = db.replication_lag(alias)
+    with _lags_lock:
+        _lags[alias] = (now, lag)
+
+    return lag
+
+
+def reset_lags():
+    with _lags_lock:
+        _lags.clear()
+
+
+def choose_replica():
+    """Elige por turnos una replica al dia, o None si ninguna lo esta"""
+    aliases = replicas()
+    if not aliases:
+        return None
+
+    start = next(_counter)
+    for i in range(len(aliases)):
+        alias = aliases[(start + i) % len(aliases)]
+        lag = replica_lag(alias)
+        if lag is not None and lag <= max_lag():
+            return alias
+
+    return None
+
+
+class ReplicaRouter(object):
+    """Envia a las replicas las lecturas hechas dentro de use_replica
+
+    Las replicas se usan por turnos y se saltan las que no responden o
+    estan mas de DB_REPLICA_MAX_LAG segundos atrasadas; si ninguna sirve
+    se lee de default. Las escrituras siempre van a default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            reading_from_replica() and
+            model._meta.app_label not in PRIMARY_APPS
+        ):
+            return choose_replica()
+
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las replicas tienen los mismos datos que default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replicas()
+
+
+class ReplicaReadMixin(object):
+    """Vista DRF cuyas lecturas se atienden desde las replicas
+
+    Se decide despues de autenticar, asi los usuarios fijados al primario
+    por una escritura reciente leen de default.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned(request.user):
+            _local.replica = True
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Tambien si la vista fallo con un error no manejado
+            _local.replica = False
@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+
+# Se envian despues de User.add_skills y User.add_jobs, ya que bulk_create
+# no envia post_save
+user_skills_added = Signal(providing_args=['user_skills'])
+jobs_added = Signal(providing_args=['jobs'])
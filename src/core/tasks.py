@@ -0,0 +1,112 @@
+import json
+import logging
+
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import models
+
+
+# Tipo de tarea -> funcion que la ejecuta. La funcion recibe la tarea y sus
+# parametros, y retorna un resultado serializable a JSON.
+HANDLERS = {
+    'render_resume': 'resumes.tasks.render_resume',
+    'photo_thumbnails': 'core.images.thumbnails_task',
+    'build_portfolio': 'resumes.tasks.build_portfolio',
+    'parse_resume': 'resumes.tasks.parse_resume',
+}
+
+MAX_ATTEMPTS = 3
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(kind, user=None, **params):
+    """Encola una tarea y la retorna"""
+    if kind not in HANDLERS:
+        raise ValueError('Unknown task kind {}'.format(kind))
+
+    return models.Task.objects.create(
+        kind=kind,
+        user=user,
+        params=json.dumps(params)
+    )
+
+
+def claim(limit=1):
+    """Marca hasta limit tareas pendientes como en ejecucion
+
+    Retorna sus ids. Con Postgres varios workers pueden reclamar tareas a
+    la vez sin tomar la misma gracias a SKIP LOCKED.
+    """
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    with transaction.atomic():
+        queryset = models.Task.objects.filter(
+            status=models.Task.PENDING
+        ).order_by('created_at')
+        if skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        task_ids = list(queryset.values_list('id', flat=True)[:limit])
+        models.Task.objects.filter(id__in=task_ids).update(
+            status=models.Task.RUNNING,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1
+        )
+
+    return task_ids
+
+
+def requeue_stale(timeout):
+    """Vuelve a encolar tareas de workers que murieron a mitad de camino"""
+    limit = timezone.now() - timedelta(seconds=timeout)
+    stale = models.Task.objects.filter(
+        status=models.Task.RUNNING,
+        started_at__lt=limit
+    )
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=models.Task.FAILED,
+        error='Worker did not finish the task',
+        finished_at=timezone.now()
+    )
+    requeued = stale.update(status=models.Task.PENDING)
+
+    return requeued, failed
+
+
+def error_message(error):
+    """Mensaje de error de la tarea que ve el usuario
+
+    Los errores de validacion describen un problema de los datos de la
+    tarea; del resto solo se informa que fallo, el detalle va al log.
+    """
+    if isinstance(error, ValidationError):
+        return ' '.join(error.messages)
+    if isinstance(error, ValueError):
+        return str(error)
+
+    return 'The task failed'
+
+
+def run(task_id):
+    """Ejecuta una tarea reclamada y guarda su resultado o error"""
+    task = models.Task.objects.select_related('user').get(id=task_id)
+    try:
+        handler = import_string(HANDLERS[task.kind])
+        result = handler(task, **json.loads(task.params))
+    except Exception as e:
+        logger.exception('Task %s (%s) failed', task.id, task.kind)
+        task.status = models.Task.FAILED
+        task.error = error_message(e)
+    else:
+        task.status = models.Task.DONE
+        task.result = json.dumps(result)
+    task.finished_at = timezone.now()
+    task.save(update_fields=['status', 'result', 'error', 'finished_at'])
+
+    return task.status
@@ -0,0 +1,110 @@
+import itertools
+import shutil
+import tempfile
+
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+
+
+LOCMEM_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+cache_names = itertools.count()
+
+
+def locmem_caches(name):
+    """Retorna CACHES con cada alias en memoria y sus mismas opciones
+
+    Cada alias usa su propio espacio, asi MAX_ENTRIES sigue separando los
+    caches dedicados del default como en produccion.
+    """
+    return {
+        alias: dict(
+            {key: value for key, value in config.items()
+             if key not in ('BACKEND', 'LOCATION')},
+            BACKEND=LOCMEM_BACKEND,
+            LOCATION='{}-{}'.format(name, alias)
+        )
+        for alias, config in settings.CACHES.items()
+    }
+
+
+class TestRunner(DiscoverRunner):
+    """Corre los tests con los caches en memoria
+
+    Los caches de archivos de settings se comparten con el servidor local,
+    los tests no deben leerlos ni vaciarlos.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.caches_override = override_settings(
+            CACHES=locmem_caches('test')
+        )
+        self.caches_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.caches_override.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+class CacheMixin(object):
+    """Usa caches en memoria y vacios durante cada test"""
+
+    def setUp(self):
+        super().setUp()
+        settings_override = override_settings(
+            CACHES=locmem_caches('test{}'.format(next(cache_names)))
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for alias in settings.CACHES:
+            self.addCleanup(caches[alias].clear)
+
+
+class MediaRootMixin(object):
+    """Usa un MEDIA_ROOT temporal durante cada test"""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class QueryBudgetMixin(object):
+    """Verifica que una vista no supere su presupuesto de consultas"""
+
+    @contextmanager
+    def assertQueryBudget(self, budget, using='default'):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                '{}. {}'.format(i, query['sql'])
+                for i, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail('{} queries executed, budget is {}\n{}'.format(
+                executed, budget, queries
+            ))
+
+    def assertViewBudgets(self, client, budgets):
+        """Pide cada url de budgets y verifica su presupuesto
+
+        budgets es una lista de (metodo, url, presupuesto) o
+        (metodo, url, presupuesto, datos).
+        """
+        for method, url, budget, *data in budgets:
+            with self.subTest(method=method, url=url):
+                with self.assertQueryBudget(budget):
+                    res = getattr(client, method.lower())(url, *data)
+                self.assertLess(res.status_code, 400)
@@ -1,20 +1,84 @@
+import json
+import os
+import tempfile
+import zipfile
+
+from importlib import import_module
+from io import BytesIO
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import Mock
 from unittest.mock import patch
 
+from PIL import Image
+
+from asgiref.sync import async_to_sync
+
+from django.conf import settings
+
 from django.test import TestCase
+from django.test import TransactionTestCase
 from django.test import Client
+from django.test import RequestFactory
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
 from django.contrib.auth import get_user_model
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.signals import request_finished
+from django.core.signals import request_started
+from django.db import close_old_connections
+from django.db import connection
+from django.db import IntegrityError
+from django.db import connections
 from django.db.utils import OperationalError
 
 from django.urls import reverse
 
 from rest_framework import status
 
+from resume_generator.asgi import application
+
+from users.serializers import TokenObtainPairSerializer
+
+from . import aio
+from . import archive
+from . import benchmark
+from . import db
+from . import images
+from . import metrics
 from . import models
+from . import routers
+from . import tasks
+from .management.commands.run_workers import Command
+from .testing import CacheMixin
+from .testing import MediaRootMixin
+
+
+def sample_image(size=(100, 100), image_format='PNG'):
+    buffer = BytesIO()
+    Image.new('RGB', size).save(buffer, image_format)
+
+    return ContentFile(buffer.getvalue(), name='photo.png')
+
+
+def failing_handler(task, **params):
+    raise RuntimeError('boom')
+
+
+def echo_handler(task, **params):
+    return params
+
+
+def invalid_handler(task, **params):
+    raise ValueError('The file is not valid JSON')
 
 
 class UserModelTests(TestCase):
@@ -77,6 +141,29 @@ class SkillModelTests(TestCase):
         with self.assertRaises(ValueError):
             models.Skill.objects.create_skill()
 
+    def test_bulk_create_skills(self):
+        """Testea la creacion en lote de habilidades sin duplicados"""
+        models.Skill.objects.create_skill(**self.payload)
+
+        count = models.Skill.objects.bulk_create_skills(
+            ['C++', ' Go ', 'Rust', '', 'Go']
+        )
+
+        self.assertEqual(count, 2)
+        self.assertEqual(models.Skill.objects.count(), 3)
+        self.assertTrue(models.Skill.objects.filter(name='Go').exists())
+
+    def test_bulk_create_skills_batches(self):
+        """Testea contar solo las habilidades nuevas de cada lote"""
+        models.Skill.objects.create_skill(name='Skill 3')
+
+        count = models.Skill.objects.bulk_create_skills(
+            ['Skill {}'.format(i) for i in range(10)], batch_size=3
+        )
+
+        self.assertEqual(count, 9)
+        self.assertEqual(models.Skill.objects.count(), 10)
+
     def test_user_add_skill(self):
         user = get_user_model().objects.create_user(
             email='test@mail.com',
@@ -91,6 +178,51 @@ class SkillModelTests(TestCase):
         self.assertEqual(user_skill.skill, skill)
         self.assertEqual(user_skill.proficiency, proficiency)
 
+    def test_user_add_skill_twice_fail(self):
+        """Testea que un usuario no pueda tener dos veces una habilidad"""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        skill = models.Skill.objects.create_skill(**self.payload)
+        user.add_skill(skill, 3)
+
+        with self.assertRaises(IntegrityError):
+            user.add_skill(skill, 4)
+
+    def test_user_add_skills(self):
+        """Testea agregar varias habilidades a la vez"""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        cpp = models.Skill.objects.create_skill(**self.payload)
+        go = models.Skill.objects.create_skill(name='Go')
+
+        user.add_skills([
+            {'skill': cpp, 'proficiency': 80},
+            {'skill': go, 'proficiency': 40},
+        ])
+
+        self.assertEqual(user.skills.count(), 2)
+
+    def test_user_add_skills_no_proficiency_fail(self):
+        """Testea que no se guarde nada si una habilidad es invalida"""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        cpp = models.Skill.objects.create_skill(**self.payload)
+        go = models.Skill.objects.create_skill(name='Go')
+
+        with self.assertRaises(ValueError):
+            user.add_skills([
+                {'skill': cpp, 'proficiency': 80},
+                {'skill': go},
+            ])
+
+        self.assertFalse(user.skills.exists())
+
 
 class JobExperienceModelTests(TestCase):
     payload = {
@@ -165,6 +297,27 @@ class JobExperienceModelTests(TestCase):
         with self.assertRaises(ValidationError):
             self.user.add_job(**payload)
 
+    def test_add_jobs_successful(self):
+        """Testea agregar varios trabajos a la vez"""
+        present = self.payload.copy()
+        del present['end_date']
+        present['present_day'] = True
+
+        jobs = self.user.add_jobs([self.payload, present])
+
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(self.user.jobs.count(), 2)
+
+    def test_add_jobs_end_date_before_start_date_fail(self):
+        """Testea que no se guarde nada si un trabajo es invalido"""
+        invalid = self.payload.copy()
+        invalid['start_date'] = '2020-09-02'
+
+        with self.assertRaises(ValidationError):
+            self.user.add_jobs([self.payload, invalid])
+
+        self.assertFalse(self.user.jobs.exists())
+
 
 class AdminSiteTests(TestCase):
     payload = {
@@ -214,17 +367,1081 @@ class AdminSiteTests(TestCase):
 
 class CommandTests(TestCase):
 
+    def write_file(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+
+        return path
+
+    def test_import_skills_csv(self):
+        """Testea importar habilidades desde un CSV"""
+        path = self.write_file('.csv', 'name,type\nPython,lang\nGo,lang\n')
+
+        call_command('import_skills', path, chunk_size=1, stdout=StringIO())
+
+        names = models.Skill.objects.values_list('name', flat=True)
+        self.assertEqual(list(names), ['Go', 'Python'])
+
+    def test_import_skills_jsonl(self):
+        """Testea importar habilidades desde JSON lines"""
+        models.Skill.objects.create_skill(name='Go')
+        path = self.write_file('.jsonl', '{"name": "Go"}\n"Rust"\n')
+        out = StringIO()
+
+        call_command('import_skills', path, stdout=out)
+
+        names = models.Skill.objects.values_list('name', flat=True)
+        self.assertEqual(list(names), ['Go', 'Rust'])
+        self.assertIn('Processed 2 skills, 1 new', out.getvalue())
+
     def test_wait_for_db_ready(self):
         """Testea esperar a la base de datos cuando esta disponible"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 1)
+        with patch('core.db.ping') as ping:
+            call_command('wait_for_db', stdout=StringIO())
+            self.assertEqual(ping.call_count, 1)
 
     @patch('time.sleep', return_value=True)
     def test_wait_for_db(self, ts):
-        """Testea esperar a la base de datos"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 6)
+        """Testea esperar a la base de datos con espera exponencial"""
+        with patch('core.db.ping') as ping:
+            ping.side_effect = [OperationalError] * 5 + [None]
+            call_command('wait_for_db', stdout=StringIO())
+            self.assertEqual(ping.call_count, 6)
+
+        delays = [call[0][0] for call in ts.call_args_list]
+        self.assertEqual(delays, [0.1, 0.2, 0.4, 0.8, 1.6])
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_max_delay(self, ts):
+        """Testea que la espera no supere el maximo"""
+        with patch('core.db.ping') as ping:
+            ping.side_effect = [OperationalError] * 3 + [None]
+            call_command('wait_for_db', max_delay=0.25, stdout=StringIO())
+
+        delays = [call[0][0] for call in ts.call_args_list]
+        self.assertEqual(delays, [0.1, 0.2, 0.25])
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_timeout(self, ts):
+        """Testea que se falle al agotar el tiempo de espera"""
+        with patch('core.db.ping', side_effect=OperationalError('down')):
+            with patch('time.monotonic', side_effect=[0, 1, 2, 31]):
+                with self.assertRaises(CommandError):
+                    call_command('wait_for_db', timeout=30, stdout=StringIO())
+
+    def test_wait_for_db_real_query(self):
+        """Testea que se ejecute una consulta real"""
+        with CaptureQueriesContext(connection) as context:
+            call_command('wait_for_db', stdout=StringIO())
+
+        self.assertEqual(context.captured_queries[0]['sql'], 'SELECT 1')
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_migrations(self, ts):
+        """Testea esperar a que se apliquen las migraciones"""
+        with patch('core.db.unapplied_migrations') as unapplied:
+            unapplied.side_effect = [['core.0010_x'], []]
+            call_command(
+                'wait_for_db', check_migrations=True, stdout=StringIO()
+            )
+
+        self.assertEqual(unapplied.call_count, 2)
+
+    def test_replication_lag(self):
+        """Testea que una base que no es replica no tenga retraso"""
+        self.assertEqual(db.replication_lag('default'), 0.0)
+
+    def test_unapplied_migrations(self):
+        """Testea que la base de los tests tenga todo migrado"""
+        self.assertEqual(db.unapplied_migrations(), [])
+
+    def test_dedupe_user_skills(self):
+        """Testea el comando que borra UserSkill repetidos"""
+        out = StringIO()
+
+        call_command('dedupe_user_skills', stdout=out)
+
+        self.assertIn('Deleted 0 duplicated user skills', out.getvalue())
+
+
+class DedupeUserSkillsTests(TransactionTestCase):
+    """Testea borrar UserSkill repetidos creados sin la restriccion unica"""
+
+    def setUp(self):
+        constraint = models.UserSkill._meta.constraints[0]
+        # SQLite rearma la tabla con las restricciones del modelo
+        with patch.object(models.UserSkill._meta, 'constraints', []):
+            with connection.schema_editor() as editor:
+                editor.remove_constraint(models.UserSkill, constraint)
+        self.addCleanup(self.restore_constraint, constraint)
+
+    def restore_constraint(self, constraint):
+        # Si el test fallo pueden quedar filas repetidas
+        models.UserSkill.objects.all().delete()
+        with connection.schema_editor() as editor:
+            editor.add_constraint(models.UserSkill, constraint)
+
+    def test_dedupe_user_skills(self):
+        """Testea que quede la fila de mayor competencia, o la primera"""
+        first = get_user_model().objects.create_user(
+            email='a@test.com', password='123456'
+        )
+        second = get_user_model().objects.create_user(
+            email='b@test.com', password='123456'
+        )
+        python = models.Skill.objects.create_skill(name='Python')
+        go = models.Skill.objects.create_skill(name='Go')
+        models.UserSkill.objects.bulk_create([
+            models.UserSkill(user=first, skill=python, proficiency=2),
+            models.UserSkill(user=first, skill=python, proficiency=5),
+            models.UserSkill(user=first, skill=python, proficiency=5),
+            models.UserSkill(user=first, skill=go, proficiency=1),
+            models.UserSkill(user=second, skill=python, proficiency=3),
+            models.UserSkill(user=second, skill=python, proficiency=3),
+        ])
+        ids = list(models.UserSkill.objects.order_by('id').values_list(
+            'id', flat=True
+        ))
+        out = StringIO()
+
+        call_command('dedupe_user_skills', batch_size=1, stdout=out)
+
+        self.assertIn('Deleted 3 duplicated user skills', out.getvalue())
+        self.assertEqual(
+            list(models.UserSkill.objects.order_by('id').values_list(
+                'id', flat=True
+            )),
+            [ids[1], ids[3], ids[4]]
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', 'Requires Postgres')
+    def test_migration_drops_invalid_index(self):
+        """Testea que la migracion borre el indice de un intento fallido"""
+        migration = import_module('core.migrations.0010_userskill_job_indexes')
+        user = get_user_model().objects.create_user(
+            email='a@test.com', password='123456'
+        )
+        python = models.Skill.objects.create_skill(name='Python')
+        models.UserSkill.objects.bulk_create([
+            models.UserSkill(user=user, skill=python, proficiency=2),
+            models.UserSkill(user=user, skill=python, proficiency=5),
+        ])
+        with self.assertRaises(IntegrityError):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'CREATE UNIQUE INDEX CONCURRENTLY core_userskill_test '
+                    'ON core_userskill (user_id, skill_id)'
+                )
+
+        with connection.schema_editor(atomic=False) as editor:
+            migration.drop_invalid_index(editor, 'core_userskill_test')
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_class WHERE relname = 'core_userskill_test'"
+            )
+            self.assertIsNone(cursor.fetchone())
+
+
+class ConnectionPoolTests(TestCase):
+
+    def fake_connect(self):
+        return Mock(closed=False)
+
+    def test_reuse_released_connection(self):
+        """Testea que una conexion devuelta se reuse"""
+        pool = db.ConnectionPool(self.fake_connect, max_size=2)
+
+        first, reused = pool.get()
+        self.assertFalse(reused)
+        pool.put(first)
+        second, reused = pool.get()
+
+        self.assertIs(second, first)
+        self.assertTrue(reused)
+        self.assertEqual(pool.opened, 1)
+
+    def test_discard_closed_connection(self):
+        """Testea que no se reusen conexiones cerradas o descartadas"""
+        pool = db.ConnectionPool(self.fake_connect, max_size=2)
+
+        first, _ = pool.get()
+        pool.put(first, discard=True)
+        second, reused = pool.get()
+        second.closed = True
+        pool.put(second)
+        third, reused = pool.get()
+
+        first.close.assert_called_once_with()
+        self.assertFalse(reused)
+        self.assertEqual(pool.opened, 3)
+
+    def test_discard_idle_connection(self):
+        """Testea que se cierren las conexiones sin uso por mucho tiempo"""
+        pool = db.ConnectionPool(self.fake_connect, max_size=1, max_idle=30)
+
+        first, _ = pool.get()
+        with patch('time.monotonic', return_value=0):
+            pool.put(first)
+        with patch('time.monotonic', return_value=31):
+            second, reused = pool.get()
+
+        self.assertIsNot(second, first)
+        first.close.assert_called_once_with()
+
+    def test_exhausted(self):
+        """Testea fallar si no se libera una conexion a tiempo"""
+        pool = db.ConnectionPool(self.fake_connect, max_size=1, timeout=0.01)
+
+        pool.get()
+        with self.assertRaises(db.PoolExhausted):
+            pool.get()
+
+    def test_failed_connect_releases_slot(self):
+        """Testea que un error al conectar no ocupe un lugar del pool"""
+        connect = Mock(side_effect=[OperationalError, Mock(closed=False)])
+        pool = db.ConnectionPool(connect, max_size=1, timeout=0.01)
+
+        with self.assertRaises(OperationalError):
+            pool.get()
+        connection, reused = pool.get()
+
+        self.assertFalse(reused)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Requires Postgres')
+    def test_pooled_backend_reuses_connection(self):
+        """Testea que el backend reuse la conexion del pool al reconectar"""
+        settings_dict = dict(
+            connections['default'].settings_dict,
+            CONN_MAX_AGE=0,
+            POOL={'MAX_SIZE': 1}
+        )
+        wrapper = connection.__class__(settings_dict)
+        self.addCleanup(db.close_pools)
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            first = cursor.fetchone()[0]
+        wrapper.close()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            second = cursor.fetchone()[0]
+        wrapper.close()
+
+        self.assertEqual(first, second)
+
+
+@override_settings(
+    DATABASE_REPLICAS=['replica1', 'replica2'],
+    DB_REPLICA_MAX_LAG=5,
+    DB_REPLICA_LAG_INTERVAL=5
+)
+@patch('core.db.replication_lag', return_value=0.0)
+class ReplicaRouterTests(CacheMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.router = routers.ReplicaRouter()
+        routers.reset_lags()
+        self.addCleanup(routers.reset_lags)
+
+    def reads(self, count):
+        with routers.use_replica():
+            return [
+                self.router.db_for_read(models.Skill) for _ in range(count)
+            ]
+
+    def test_read_from_replicas(self, lag):
+        """Testea leer de las replicas por turnos dentro de use_replica"""
+        self.assertIsNone(self.router.db_for_read(models.Skill))
+        self.assertEqual(
+            sorted(self.reads(4)),
+            ['replica1', 'replica1', 'replica2', 'replica2']
+        )
+        self.assertEqual(self.router.db_for_write(models.Skill), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self, lag):
+        """Testea que sin replicas todo se lea de default"""
+        self.assertEqual(self.reads(1), [None])
+
+    def test_skip_lagging_replica(self, lag):
+        """Testea saltar las replicas atrasadas o que no responden"""
+        lag.side_effect = lambda alias: {'replica1': 30.0}.get(alias, 0.0)
+        self.assertEqual(self.reads(3), ['replica2'] * 3)
+
+        routers.reset_lags()
+        lag.side_effect = lambda alias: {'replica1': 0.0}.get(alias)
+        self.assertEqual(self.reads(3), ['replica1'] * 3)
+
+    def test_all_replicas_lagging(self, lag):
+        """Testea leer del primario si ninguna replica esta al dia"""
+        lag.return_value = 30.0
+
+        self.assertEqual(self.reads(2), [None, None])
+
+    def test_lag_checked_by_interval(self, lag):
+        """Testea que el retraso se revise cada cierto tiempo"""
+        with patch('time.monotonic', return_value=100):
+            self.reads(4)
+        self.assertEqual(lag.call_count, 2)
+
+        with patch('time.monotonic', return_value=106):
+            self.reads(2)
+        self.assertEqual(lag.call_count, 4)
+
+    def test_sessions_from_primary(self, lag):
+        """Testea que las sesiones se lean del primario"""
+        from django.contrib.sessions.models import Session
+
+        with routers.use_replica():
+            self.assertIsNone(self.router.db_for_read(Session))
+
+    def test_no_migrations_on_replica(self, lag):
+        """Testea que no se migren las replicas"""
+        self.assertTrue(self.router.allow_migrate('default', 'core'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'core'))
+
+    def test_pin_user(self, lag):
+        """Testea fijar al primario las lecturas de un usuario"""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        self.assertFalse(routers.is_pinned(user))
+
+        routers.pin(user.pk)
+        read = routers.read(user, routers.reading_from_replica)
+
+        self.assertTrue(routers.is_pinned(user))
+        self.assertFalse(read)
+
+    def test_pin_survives_cache_pressure(self, lag):
+        """Testea que llenar el cache por defecto no descarte un fijado"""
+        user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        routers.pin(user.pk)
+
+        # Varias veces el MAX_ENTRIES por defecto de Django: cada descarte
+        # borra un tercio de las entradas
+        for i in range(3000):
+            cache.set('filler:{}'.format(i), None)
+
+        self.assertTrue(routers.is_pinned(user))
+
+
+class BenchmarkTests(TestCase):
+
+    def test_seed(self):
+        """Testea cargar datos sinteticos de forma repetible"""
+        counts = benchmark.seed(10, 20, skills_per_user=3, jobs_per_user=2)
+
+        self.assertEqual(counts, {
+            'skills': 20, 'users': 10, 'user_skills': 30, 'jobs': 20
+        })
+        benchmark.seed(5, 20)
+        self.assertEqual(
+            models.User.objects.filter(is_superuser=False).count(), 15
+        )
+        self.assertTrue(models.User.objects.filter(
+            email=benchmark.ADMIN_EMAIL, is_superuser=True
+        ).exists())
+
+        benchmark.clear()
+        self.assertFalse(models.User.objects.exists())
+        self.assertFalse(models.Skill.objects.exists())
+
+    def test_percentile(self):
+        """Testea el percentil por rango mas cercano"""
+        values = list(range(1, 101))
+
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([7], 99), 7)
+
+    def test_summarize_without_requests(self):
+        """Testea resumir una medicion sin peticiones"""
+        summary = benchmark.summarize([], None, [])
+
+        self.assertEqual(summary, {'requests': 0, 'statuses': {}})
+
+    def test_benchmark_command(self):
+        """Testea que el benchmark mida todos los escenarios"""
+        out = StringIO()
+
+        call_command(
+            'benchmark', users=3, skills=5, iterations=2, warmup=0,
+            stdout=out, stderr=StringIO()
+        )
+
+        results = json.loads(out.getvalue())['results']
+        self.assertEqual(set(results), {
+            'users_token', 'users_me', 'skills_list',
+            'users_create', 'skills_create'
+        })
+        for result in results.values():
+            self.assertEqual(result['requests'], 2)
+            self.assertTrue(all(
+                code.startswith('2') for code in result['statuses']
+            ))
+
+    def test_benchmark_without_data_fail(self):
+        """Testea que el benchmark falle si no hay datos cargados"""
+        with self.assertRaises(CommandError):
+            call_command('benchmark', iterations=1, stdout=StringIO())
+
+        self.assertFalse(models.User.objects.exists())
+
+
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        metrics.registry.reset()
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_server_timing_header(self):
+        """Testea que las peticiones muestreadas informen sus tiempos"""
+        res = self.client.get(reverse('users:me'))
+
+        timing = res['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[0-9.]+;desc="[1-9][0-9]* queries"')
+        self.assertIn('serializer;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_unsampled_request(self):
+        """Testea que las peticiones no muestreadas no se instrumenten"""
+        res = self.client.get(reverse('users:me'))
+
+        self.assertFalse(res.has_header('Server-Timing'))
+        self.assertEqual(metrics.registry.views, {})
+
+    def test_metrics_endpoint(self):
+        """Testea exponer las metricas en formato Prometheus"""
+        self.user.is_staff = True
+        self.user.save()
+        self.client.get(reverse('users:me'))
+
+        res = self.client.get(reverse('metrics'))
+
+        content = res.content.decode()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            'http_request_duration_seconds_count'
+            '{view="users:me",method="GET",status="200"} 1',
+            content
+        )
+        self.assertIn('http_db_queries_total{view="users:me"', content)
+        self.assertIn('http_response_bytes_total{view="users:me"', content)
+
+    def test_metrics_endpoint_staff_only(self):
+        """Testea que sin token las metricas no sean publicas"""
+        res = self.client.get(reverse('metrics'))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.logout()
+        res = self.client.get(reverse('metrics'))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint_token(self):
+        """Testea que el endpoint de metricas exija el token configurado"""
+        res = self.client.get(reverse('metrics'))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        res = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong'
+        )
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        res = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_nested_spans_counted_once(self):
+        """Testea que un span anidado con el mismo nombre no se duplique"""
+        request_metrics = metrics._local.metrics = metrics.RequestMetrics()
+        self.addCleanup(setattr, metrics._local, 'metrics', None)
+
+        with patch('time.perf_counter', side_effect=[0.0, 1.0]):
+            with metrics.span('serializer'):
+                with metrics.span('serializer'):
+                    pass
+
+        self.assertEqual(request_metrics.spans, {'serializer': 1.0})
+
+
+@override_settings(ASGI_DB_THREADS=0)
+class AsgiTests(CacheMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        metrics.registry.reset()
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        token = TokenObtainPairSerializer.get_token(self.user).access_token
+        self.headers = {
+            'Authorization': 'Bearer {}'.format(token),
+            'Host': 'testserver',
+        }
+        # Como el cliente de pruebas, no cerrar la conexion del test
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+    def get(self, url, **headers):
+        return async_to_sync(aio.call)(
+            application, 'GET', url, dict(self.headers, **headers)
+        )
+
+    def test_me(self):
+        """Testea obtener el perfil desde la vista async"""
+        status_code, headers, body = self.get(reverse('users:me'))
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(body)['email'], 'test@mail.com')
+        # Las vistas async no pasan por los middlewares pero si se miden
+        self.assertIn('server-timing', headers)
+        self.assertIn(('users:me', 'GET', '200'), metrics.registry.views)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_me_unsampled(self):
+        """Testea la vista async sin medir la peticion"""
+        status_code, headers, body = self.get(reverse('users:me'))
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertNotIn('server-timing', headers)
+        self.assertEqual(metrics.registry.views, {})
+
+    def test_resume(self):
+        """Testea obtener el curriculum desde la vista async"""
+        status_code, headers, body = self.get(reverse('users:resume'))
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(body)['user']['email'], 'test@mail.com')
+
+    def test_skills_list_cached_page(self):
+        """Testea que las paginas cacheadas se respondan sin Django"""
+        models.Skill.objects.create_skill(name='Python')
+        url = reverse('skills:list')
+
+        status_code, headers, body = self.get(url)
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertIn('server-timing', headers)
+
+        status_code, cached_headers, cached_body = self.get(url)
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertIn('server-timing', cached_headers)
+        self.assertEqual(
+            metrics.registry.views[('skills:list', 'GET', '200')]['requests'],
+            2
+        )
+        self.assertEqual(cached_body, body)
+        self.assertEqual(cached_headers['etag'], headers['etag'])
+
+        status_code, _, _ = self.get(url, **{'If-None-Match': headers['etag']})
+        self.assertEqual(status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_without_token_uses_django(self):
+        """Testea que sin token la peticion siga por Django"""
+        status_code, headers, body = async_to_sync(aio.call)(
+            application, 'GET', reverse('users:me'), {'Host': 'testserver'}
+        )
+
+        self.assertEqual(status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_revoked_token_uses_django(self):
+        """Testea que un token revocado no se acepte en la vista async"""
+        self.user.is_active = False
+        self.user.save()
+
+        status_code, headers, body = self.get(reverse('users:me'))
+
+        self.assertEqual(status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(REST_FRAMEWORK=dict(
+        settings.REST_FRAMEWORK,
+        DEFAULT_AUTHENTICATION_CLASSES=(
+            'rest_framework_simplejwt.authentication.JWTAuthentication',
+        )
+    ))
+    def test_stateful_authentication(self):
+        """Testea que sin JWT_STATELESS la vista async consulte el usuario"""
+        request = RequestFactory().get(
+            reverse('users:me'),
+            HTTP_AUTHORIZATION=self.headers['Authorization']
+        )
+        authenticate = async_to_sync(aio.authenticate)
+
+        user = authenticate(request)
+        self.assertIsInstance(user, get_user_model())
+        self.assertEqual(user.pk, self.user.pk)
+
+        # Sin signals, el token no se revoca
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+        self.assertIsNone(authenticate(request))
+
+
+class QueryPlanTests(TestCase):
+    """Compara los planes de las consultas del curriculum con y sin indices"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+
+    def explain(self, queryset, label):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Con tablas chicas Postgres prefiere leer toda la tabla
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            # El comentario evita que SQLite reuse un plan ya preparado
+            cursor.execute('{} {} /* {} */'.format(
+                connection.ops.explain_query_prefix(), sql, label
+            ), params)
+            rows = cursor.fetchall()
+
+        return '\n'.join(' '.join(str(col) for col in row) for row in rows)
+
+    def drop_index(self, name):
+        # Se deshace con el rollback del test
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX {}'.format(name))
+
+    def assertUsesIndex(self, queryset, name):
+        after = self.explain(queryset, 'after')
+        self.drop_index(name)
+        before = self.explain(queryset, 'before')
+
+        plans = 'Before:\n{}\nAfter:\n{}'.format(before, after)
+        self.assertIn(name, after, plans)
+        self.assertNotIn(name, before, plans)
+
+    def test_jobs_by_start_date_use_index(self):
+        """Testea que los trabajos del usuario se lean por indice"""
+        queryset = models.Job.objects.filter(
+            user=self.user
+        ).order_by('-start_date')
+
+        self.assertUsesIndex(queryset, 'core_job_user_start_idx')
+
+    def test_skills_by_proficiency_use_covering_index(self):
+        """Testea que las habilidades del usuario se lean solo del indice"""
+        queryset = models.UserSkill.objects.filter(
+            user=self.user
+        ).order_by('-proficiency').values_list('skill_id', 'proficiency')
+
+        self.assertUsesIndex(queryset, 'core_userskill_user_prof_idx')
+
+
+@patch.dict(tasks.HANDLERS, {
+    'echo': 'core.tests.echo_handler',
+    'boom': 'core.tests.failing_handler',
+    'invalid': 'core.tests.invalid_handler',
+})
+class TaskQueueTests(TestCase):
+
+    def test_enqueue_unknown_kind_fail(self):
+        """Testea que no se pueda encolar un tipo de tarea desconocido"""
+        with self.assertRaises(ValueError):
+            tasks.enqueue('unknown')
+
+    def test_claim_marks_running(self):
+        """Testea que reclamar una tarea la marque en ejecucion"""
+        first = tasks.enqueue('echo', value=1)
+        tasks.enqueue('echo', value=2)
+
+        task_ids = tasks.claim()
+
+        self.assertEqual(task_ids, [first.id])
+        first.refresh_from_db()
+        self.assertEqual(first.status, models.Task.RUNNING)
+        self.assertEqual(first.attempts, 1)
+        self.assertEqual(len(tasks.claim(limit=5)), 1)
+        self.assertEqual(tasks.claim(), [])
+
+    def test_run_stores_result(self):
+        """Testea que se guarde el resultado de una tarea"""
+        task = tasks.enqueue('echo', value=1)
+        tasks.claim()
+
+        status = tasks.run(task.id)
+
+        task.refresh_from_db()
+        self.assertEqual(status, models.Task.DONE)
+        self.assertEqual(task.result, '{"value": 1}')
+
+    def test_run_stores_error(self):
+        """Testea que se guarde el error de una tarea fallida"""
+        task = tasks.enqueue('boom')
+        tasks.claim()
+
+        with self.assertLogs('core.tasks', 'ERROR') as logs:
+            status = tasks.run(task.id)
+
+        task.refresh_from_db()
+        self.assertEqual(status, models.Task.FAILED)
+        # El traceback solo va al log
+        self.assertEqual(task.error, 'The task failed')
+        self.assertIn('RuntimeError: boom', logs.output[0])
+
+    def test_run_stores_validation_error(self):
+        """Testea que el error de los datos de la tarea se informe"""
+        task = tasks.enqueue('invalid')
+        tasks.claim()
+
+        with self.assertLogs('core.tasks', 'ERROR'):
+            tasks.run(task.id)
+
+        task.refresh_from_db()
+        self.assertEqual(task.error, 'The file is not valid JSON')
+
+    def test_requeue_stale(self):
+        """Testea que se vuelvan a encolar las tareas abandonadas"""
+        task = tasks.enqueue('echo')
+        tasks.claim()
+
+        self.assertEqual(tasks.requeue_stale(60), (0, 0))
+        self.assertEqual(tasks.requeue_stale(-1), (1, 0))
+        task.refresh_from_db()
+        self.assertEqual(task.status, models.Task.PENDING)
+
+    def test_run_workers_once(self):
+        """Testea que el comando procese toda la cola"""
+        tasks.enqueue('echo')
+        tasks.enqueue('boom')
+        out = StringIO()
+
+        with self.assertLogs('core.tasks', 'ERROR'):
+            call_command('run_workers', workers=1, once=True, stdout=out)
+
+        self.assertIn('Finished 1 tasks, 1 failed', out.getvalue())
+        self.assertFalse(
+            models.Task.objects.filter(status=models.Task.PENDING).exists()
+        )
+
+    def test_run_workers_requeues_periodically(self):
+        """Testea que el comando reencole tareas abandonadas mientras corre"""
+        started = []
+
+        def idle():
+            # Otro worker reclama una tarea despues del arranque y muere
+            if started:
+                return True
+            started.append(tasks.enqueue('echo'))
+            tasks.claim()
+            return False
+
+        with patch.object(Command, 'idle', side_effect=idle):
+            call_command(
+                'run_workers',
+                workers=1,
+                stale_after=-1,
+                requeue_interval=0,
+                stdout=StringIO()
+            )
+
+        started[0].refresh_from_db()
+        self.assertEqual(started[0].status, models.Task.DONE)
+
+
+class ImageTests(MediaRootMixin, TestCase):
+
+    def test_validate_image_successful(self):
+        """Testea que una imagen dentro de los limites sea valida"""
+        images.validate_image(sample_image())
+
+    @override_settings(PHOTO_MAX_BYTES=10)
+    def test_validate_image_too_many_bytes(self):
+        """Testea que falle una imagen con demasiados bytes"""
+        with self.assertRaises(ValidationError):
+            images.validate_image(sample_image())
+
+    @override_settings(PHOTO_MAX_PIXELS=100 * 99)
+    def test_validate_image_too_many_pixels(self):
+        """Testea que falle una imagen con demasiados pixeles"""
+        with self.assertRaises(ValidationError):
+            images.validate_image(sample_image())
+
+    def test_validate_image_not_an_image(self):
+        """Testea que falle un archivo que no es una imagen"""
+        with self.assertRaises(ValidationError):
+            images.validate_image(ContentFile(b'not an image'))
+
+    def test_generate_thumbnails(self):
+        """Testea que se generen las miniaturas en todos los tamaños"""
+        name = default_storage.save(
+            'Users/photo.jpg', sample_image((1200, 600), 'JPEG')
+        )
+
+        paths = images.generate_thumbnails(name)
+
+        self.assertEqual(
+            len(paths),
+            len(images.THUMBNAIL_SIZES) * len(images.THUMBNAIL_FORMATS)
+        )
+        self.assertEqual(
+            paths['small.webp'], images.thumbnail_path(name, 'small', 'webp')
+        )
+        with default_storage.open(paths['medium.jpeg']) as f:
+            thumbnail = Image.open(f)
+            self.assertEqual(thumbnail.size, (256, 128))
+            self.assertEqual(thumbnail.format, 'JPEG')
+
+    @patch('PIL.features.check', lambda feature: feature != 'webp')
+    def test_generate_thumbnails_without_webp(self):
+        """Testea generar solo JPEG si Pillow no soporta WEBP"""
+        name = default_storage.save(
+            'Users/photo.jpg', sample_image((1200, 600), 'JPEG')
+        )
+
+        paths = images.generate_thumbnails(name)
+
+        self.assertEqual(
+            sorted(paths), ['large.jpeg', 'medium.jpeg', 'small.jpeg']
+        )
+
+
+class ArchiveTests(MediaRootMixin, TestCase):
+    """Testea exportar e importar los datos de carrera"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456',
+            first_name='Ada',
+            cellphone='+56912345678'
+        )
+        self.user.photo.save('photo.png', sample_image())
+        python = models.Skill.objects.create_skill(name='Python')
+        models.Skill.objects.create_skill(name='Unused')
+        self.user.add_skills([{'skill': python, 'proficiency': 4}])
+        self.user.add_jobs([
+            {
+                'company': 'ACME',
+                'start_date': '2016-01-01',
+                'end_date': '2017-12-31'
+            },
+            {
+                'company': 'ADP',
+                'start_date': '2018-01-01',
+                'present_day': True
+            },
+        ])
+        get_user_model().objects.create_user(
+            email='other@mail.com',
+            password='123456'
+        )
+
+    def export(self, **kwargs):
+        buffer = BytesIO()
+        counts = archive.export_archive(buffer, **kwargs)
+        buffer.seek(0)
+
+        return buffer, counts
+
+    def test_export_all(self):
+        """Testea exportar todos los usuarios y el catalogo"""
+        buffer, counts = self.export(chunk_size=1)
+
+        self.assertEqual(counts, {
+            'skills': 2, 'users': 2, 'user_skills': 1, 'jobs': 2,
+            'photos': 1
+        })
+        with zipfile.ZipFile(buffer) as f:
+            self.assertEqual(sorted(f.namelist()), sorted([
+                'manifest.json',
+                'skills.jsonl',
+                'users/00000.jsonl',
+                'users/00001.jsonl',
+                archive.photo_entry(self.user.photo.name),
+            ]))
+            row = json.loads(f.read('users/00000.jsonl'))
+
+        self.assertEqual(row['email'], 'test@mail.com')
+        self.assertEqual(row['cellphone'], '+56912345678')
+        self.assertTrue(row['password'].startswith('argon2'))
+        self.assertEqual(row['skills'], [{'name': 'Python', 'proficiency': 4}])
+        self.assertEqual(
+            [job['start_date'] for job in row['jobs']],
+            ['2016-01-01', '2018-01-01']
+        )
+
+    def test_export_user(self):
+        """Testea exportar un usuario sin el catalogo ni la clave"""
+        buffer, counts = self.export(
+            users=get_user_model().objects.filter(pk=self.user.pk),
+            include_passwords=False
+        )
+
+        self.assertEqual(counts['users'], 1)
+        with zipfile.ZipFile(buffer) as f:
+            self.assertNotIn('skills.jsonl', f.namelist())
+            row = json.loads(f.read('users/00000.jsonl'))
+        self.assertIsNone(row['password'])
+
+    def test_stream_export(self):
+        """Testea que el zip generado por partes sea valido"""
+        parts = list(archive.stream_archive(chunk_size=1))
+
+        self.assertGreater(len(parts), 3)
+        with zipfile.ZipFile(BytesIO(b''.join(parts))) as f:
+            self.assertIsNone(f.testzip())
+            manifest = json.loads(f.read('manifest.json'))
+        self.assertEqual(manifest['counts']['users'], 2)
+
+    def test_import(self):
+        """Testea importar una exportacion en una base vacia"""
+        buffer, _ = self.export()
+        get_user_model().objects.all().delete()
+        models.Skill.objects.all().delete()
+
+        counts = archive.import_archive(buffer, chunk_size=1)
+
+        self.assertEqual(counts, {
+            'skills': 2, 'users': 2, 'skipped': 0, 'user_skills': 1,
+            'jobs': 2, 'photos': 1
+        })
+        user = get_user_model().objects.get(email='test@mail.com')
+        self.assertTrue(user.check_password('123456'))
+        self.assertEqual(user.first_name, 'Ada')
+        self.assertEqual(
+            list(user.userskill_set.values_list(
+                'skill__name', 'proficiency'
+            )),
+            [('Python', 4)]
+        )
+        self.assertEqual(user.jobs.filter(present_day=True).count(), 1)
+        self.assertTrue(default_storage.exists(user.photo.name))
+        self.assertTrue(models.Task.objects.filter(
+            kind='photo_thumbnails', user=user
+        ).exists())
+        self.assertTrue(models.Skill.objects.filter(name='Unused').exists())
+
+    def test_import_skips_existing_users(self):
+        """Testea que no se dupliquen los usuarios que ya existen"""
+        buffer, _ = self.export()
+
+        counts = archive.import_archive(buffer)
+
+        self.assertEqual(counts['skipped'], 2)
+        self.assertEqual(counts['users'], 0)
+        self.assertEqual(counts['skills'], 0)
+        self.assertEqual(models.UserSkill.objects.count(), 1)
+
+    def test_import_counts_skills_of_users(self):
+        """Testea contar las habilidades creadas al importar los usuarios"""
+        buffer, _ = self.export(
+            users=get_user_model().objects.filter(pk=self.user.pk)
+        )
+        self.user.delete()
+        models.Skill.objects.filter(name='Python').delete()
+
+        counts = archive.import_archive(buffer)
+
+        self.assertEqual(counts['skills'], 1)
+        self.assertTrue(models.Skill.objects.filter(name='Python').exists())
+
+    def edited_export(self, edit):
+        """Exportacion con la fila de test@mail.com cambiada por edit"""
+        buffer, _ = self.export(chunk_size=1)
+        with zipfile.ZipFile(buffer) as f:
+            files = {name: f.read(name) for name in f.namelist()}
+        row = json.loads(files['users/00000.jsonl'])
+        edit(row)
+        files['users/00000.jsonl'] = json.dumps(row)
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as f:
+            for name, data in files.items():
+                f.writestr(name, data)
+        buffer.seek(0)
+
+        return buffer
+
+    def assertImportFails(self, buffer, exception):
+        self.user.delete()
+        photo_dir = os.path.dirname(self.user.photo.name)
+        photos = set(default_storage.listdir(photo_dir)[1])
+
+        with self.assertRaises(exception):
+            archive.import_archive(buffer)
+
+        self.assertFalse(
+            get_user_model().objects.filter(email='test@mail.com').exists()
+        )
+        self.assertEqual(set(default_storage.listdir(photo_dir)[1]), photos)
+
+    def test_import_repeated_skill(self):
+        """Testea que una habilidad repetida falle sin copiar la foto"""
+        buffer = self.edited_export(
+            lambda row: row['skills'].append(row['skills'][0])
+        )
+
+        self.assertImportFails(buffer, archive.ArchiveError)
+
+    def test_import_failed_batch_deletes_photos(self):
+        """Testea borrar las fotos copiadas si el lote falla"""
+        buffer = self.edited_export(lambda row: row['jobs'][0].pop('company'))
+
+        self.assertImportFails(buffer, KeyError)
+
+    def test_import_without_passwords(self):
+        """Testea que sin hash el usuario importado no pueda entrar"""
+        buffer, _ = self.export(include_passwords=False)
+        get_user_model().objects.all().delete()
+
+        archive.import_archive(buffer)
+
+        user = get_user_model().objects.get(email='test@mail.com')
+        self.assertFalse(user.has_usable_password())
+
+    def test_import_invalid_archive(self):
+        """Testea que falle un archivo que no es una exportacion"""
+        with self.assertRaises(archive.ArchiveError):
+            archive.import_archive(BytesIO(b'not a zip'))
+
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as f:
+            f.writestr('other.txt', 'hello')
+        with self.assertRaises(archive.ArchiveError):
+            archive.import_archive(buffer)
+
+    def test_export_import_commands(self):
+        """Testea los comandos export_data e import_data"""
+        fd, path = tempfile.mkstemp(suffix='.zip')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        out = StringIO()
+
+        call_command('export_data', path, user=['test@mail.com'], stdout=out)
+        self.assertIn('Exported 0 skills, 1 users', out.getvalue())
+
+        self.user.delete()
+        call_command('import_data', path, stdout=out)
+
+        self.assertIn('Imported 0 skills, 1 users', out.getvalue())
+        self.assertTrue(
+            get_user_model().objects.filter(email='test@mail.com').exists()
+        )
+
+    def test_import_command_invalid_file(self):
+        """Testea que el comando falle con un archivo invalido"""
+        with self.assertRaises(CommandError):
+            call_command('import_data', '/does/not/exist.zip')
@@ -21,3 +21,41 @@ class PathAndRename(object):
             filename = '{}.{}'.format(uuid4().hex, ext)
         # return the whole path to the file
         return os.path.join(self.path, filename)
+
+
+def dedupe_user_skills(model, batch_size=1000):
+    """Borra los UserSkill repetidos por (user, skill)
+
+    Deja la fila con mayor competencia (y menor id ante un empate). Recorre
+    los usuarios por lotes con transacciones cortas, asi se puede correr
+    sobre una tabla grande en uso.
+    """
+    from django.db import transaction
+    from django.db.models import Count
+
+    deleted = 0
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            model.objects.filter(
+                user_id__gt=last_user_id
+            ).order_by('user_id').values_list(
+                'user_id', flat=True
+            ).distinct()[:batch_size]
+        )
+        if not user_ids:
+            return deleted
+        last_user_id = user_ids[-1]
+
+        duplicates = model.objects.filter(
+            user_id__in=user_ids
+        ).values('user_id', 'skill_id').annotate(
+            rows=Count('id')
+        ).filter(rows__gt=1).order_by()
+        with transaction.atomic():
+            for duplicate in duplicates:
+                ids = list(model.objects.filter(
+                    user_id=duplicate['user_id'],
+                    skill_id=duplicate['skill_id']
+                ).order_by('-proficiency', 'id').values_list('id', flat=True))
+                deleted += model.objects.filter(id__in=ids[1:]).delete()[0]
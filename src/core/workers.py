@@ -0,0 +1,21 @@
+"""Funciones que se ejecutan dentro de los procesos del pool de workers
+
+Este modulo no importa modelos para poder cargarse antes de django.setup().
+"""
+import django
+
+from django.db import connections
+
+
+def init():
+    """Prepara un proceso del pool de workers (iniciado con spawn)"""
+    django.setup()
+
+
+def run(task_id):
+    from core import tasks
+
+    try:
+        return tasks.run(task_id)
+    finally:
+        connections.close_all()
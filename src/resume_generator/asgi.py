@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'resume_generator.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Requiere Django configurado
+from core.aio import Router  # noqa: E402
+
+# Las lecturas mas frecuentes se atienden con vistas async, el resto de
+# las peticiones siguen por Django
+application = Router(django_application, {
+    'skills:list': 'skills.async_views.list_skills',
+    'users:me': 'users.async_views.me',
+    'users:resume': 'users.async_views.resume',
+})
@@ -37,11 +37,14 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'users',
+    'resumes',
 ]
 
 MIDDLEWARE = [
+    'core.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,20 +74,227 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'resume_generator.wsgi.application'
 
+# Los tests usan caches en memoria en vez de los de archivos
+TEST_RUNNER = 'core.testing.TestRunner'
+
 
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'HOST': os.environ.get('DB_HOST'),
+# Segundos que una conexion se reusa entre peticiones; con el pool cada
+# peticion devuelve su conexion al pool y esto no se usa
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+
+# Comprobar que una conexion reusada siga viva antes de usarla
+DB_HEALTH_CHECKS = os.environ.get('DB_HEALTH_CHECKS', '1') == '1'
+
+DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', '5'))
+
+# Conexiones abiertas por proceso y por alias, con 0 no se usa el pool.
+# Con todas prestadas se espera DB_POOL_TIMEOUT segundos por una libre.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '0'))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '5'))
+DB_POOL_MAX_IDLE = float(os.environ.get('DB_POOL_MAX_IDLE', '300'))
+
+
+def _database(host):
+    return {
+        'ENGINE': 'core.backends.postgresql',
+        'HOST': host,
+        'PORT': os.environ.get('DB_PORT', ''),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_HEALTH_CHECKS,
+        'POOL': {
+            'MAX_SIZE': DB_POOL_SIZE,
+            'TIMEOUT': DB_POOL_TIMEOUT,
+            'MAX_IDLE': DB_POOL_MAX_IDLE,
+        },
+        'OPTIONS': {
+            'connect_timeout': DB_CONNECT_TIMEOUT,
+        },
     }
+
+
+DATABASES = {
+    'default': _database(os.environ.get('DB_HOST')),
+}
+
+# Replicas de lectura, separadas por comas, usadas por turnos por las
+# vistas de lectura
+DB_REPLICA_HOSTS = [
+    host for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',')
+    if host
+]
+
+DATABASES.update({
+    'replica{}'.format(i): dict(_database(host), TEST={'MIRROR': 'default'})
+    for i, host in enumerate(DB_REPLICA_HOSTS, 1)
+})
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Las replicas mas atrasadas se saltan; el retraso se revisa cada
+# DB_REPLICA_LAG_INTERVAL segundos
+DB_REPLICA_MAX_LAG = float(os.environ.get('DB_REPLICA_MAX_LAG', '5'))
+DB_REPLICA_LAG_INTERVAL = float(
+    os.environ.get('DB_REPLICA_LAG_INTERVAL', '5')
+)
+
+# Despues de escribir, el usuario lee del primario por estos segundos
+DB_REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', '10'))
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+
+CACHES = {
+    # Compartido entre los procesos locales, ya que se usa para datos que
+    # se invalidan con señales
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.environ.get(
+            'CACHE_LOCATION',
+            os.path.join(BASE_DIR, '.cache', 'default')
+        ),
+    },
+    'skills': {
+        'BACKEND': os.environ.get(
+            'SKILLS_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.environ.get(
+            'SKILLS_CACHE_LOCATION',
+            os.path.join(BASE_DIR, '.cache', 'skills')
+        ),
+        'TIMEOUT': 24 * 60 * 60,
+    },
+    # Revocaciones de tokens JWT, una por usuario durante la vida de un token
+    # de acceso. Los caches descartan entradas al pasar MAX_ENTRIES, y una
+    # revocacion descartada vuelve a validar el token, asi que el limite
+    # debe superar las revocaciones posibles en ese tiempo
+    'tokens': {
+        'BACKEND': os.environ.get(
+            'TOKENS_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.environ.get(
+            'TOKENS_CACHE_LOCATION',
+            os.path.join(BASE_DIR, '.cache', 'tokens')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                os.environ.get('TOKENS_CACHE_MAX_ENTRIES', '1000000')
+            ),
+        },
+    },
+    # Usuarios fijados al primario despues de escribir. Como con las
+    # revocaciones, un fijado descartado antes de tiempo manda al usuario
+    # a una replica que aun no tiene sus cambios
+    'pins': {
+        'BACKEND': os.environ.get(
+            'PINS_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.environ.get(
+            'PINS_CACHE_LOCATION',
+            os.path.join(BASE_DIR, '.cache', 'pins')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                os.environ.get('PINS_CACHE_MAX_ENTRIES', '1000000')
+            ),
+        },
+    },
+}
+
+# Alias del cache usado por el catalogo de habilidades
+SKILLS_CACHE = 'skills'
+
+# Alias del cache con las revocaciones de tokens JWT
+JWT_REVOCATION_CACHE = 'tokens'
+
+# Alias del cache con los usuarios fijados al primario
+DB_REPLICA_PIN_CACHE = 'pins'
+
+
+# REST framework
+
+# Con JWT_STATELESS los tokens de acceso se validan con sus claims, sin
+# consultar el usuario en cada peticion
+JWT_STATELESS = os.environ.get('JWT_STATELESS', '1') == '1'
+
+# La primera clase define la respuesta sin credenciales (403 con sesion)
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+        'users.authentication.ClaimsJWTAuthentication'
+        if JWT_STATELESS else
+        'rest_framework_simplejwt.authentication.JWTAuthentication',
+    ),
+}
+
+
+# ASGI
+
+# Hilos con los que las vistas async de core.aio usan la base de datos y
+# el cache; cada hilo mantiene su propia conexion
+ASGI_DB_THREADS = int(os.environ.get('ASGI_DB_THREADS', '16'))
+
+
+# Request metrics
+
+# Fraccion de las peticiones instrumentadas por RequestMetricsMiddleware
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '1.0'))
+
+# Token Bearer exigido por el endpoint de metricas. Sin token, el endpoint
+# solo responde a usuarios staff con sesion iniciada
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/3.0/topics/auth/passwords/
+
+# Los hashes con los otros algoritmos se siguen aceptando y se actualizan
+# al algoritmo elegido en el siguiente login
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'argon2')
+
+_PASSWORD_HASHERS = {
+    'argon2': 'core.hashers.Argon2PasswordHasher',
+    'bcrypt': 'core.hashers.BCryptSHA256PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
 }
 
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHERS.items()
+    if name != PASSWORD_HASHER
+]
+
+# Costos de Argon2id, por defecto los minimos recomendados por OWASP
+# (19 MiB, 2 pasadas, 1 hilo)
+ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', '2'))
+ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST', '19456'))
+ARGON2_PARALLELISM = int(os.environ.get('ARGON2_PARALLELISM', '1'))
+
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '10'))
+
+# Hilos que verifican claves, con 0 se verifican en el hilo de la peticion.
+# Hasta PASSWORD_POOL_QUEUE logins esperan un hilo libre; los demas esperan
+# PASSWORD_POOL_TIMEOUT segundos por un lugar y reciben un 503.
+PASSWORD_POOL_WORKERS = int(os.environ.get('PASSWORD_POOL_WORKERS', '0'))
+PASSWORD_POOL_QUEUE = int(os.environ.get('PASSWORD_POOL_QUEUE', '16'))
+PASSWORD_POOL_TIMEOUT = float(os.environ.get('PASSWORD_POOL_TIMEOUT', '2'))
+
+AUTHENTICATION_BACKENDS = ['users.passwords.PooledModelBackend']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -16,8 +16,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from core.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/users/', include('users.urls')),
     path('api/skills/', include('skills.urls')),
+    path('api/resumes/', include('resumes.urls')),
+    path('metrics/', metrics_view, name='metrics'),
 ]
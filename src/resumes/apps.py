@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ResumesConfig(AppConfig):
+    name = 'resumes'
+
+    def ready(self):
+        from . import receivers  # noqa: F401
@@ -0,0 +1,153 @@
+"""Automata de Aho-Corasick para buscar muchos nombres en un texto
+
+Busca todos los nombres en una sola pasada por el texto, sin importar
+cuantos sean. Las mayusculas se ignoran y solo se aceptan ocurrencias con
+limites de palabra que respetan nombres como C++, C# o Node.js.
+"""
+from collections import deque
+
+
+def is_word_char(char):
+    return char.isalnum() or char in '_+#'
+
+
+class Automaton(object):
+    """Automata inmutable armado desde pares (nombre, valor)
+
+    Los nodos se guardan en listas paralelas: transiciones, enlace de
+    falla, valor del nombre que termina en el nodo, su largo y el enlace
+    al siguiente nodo terminal por la cadena de fallas.
+    """
+
+    def __init__(self, words=()):
+        self.goto = [{}]
+        self.fail = [0]
+        self.value = [None]
+        self.length = [0]
+        self.output = [0]
+        self.words = 0
+
+        for word, value in words:
+            self.insert(word.lower(), value)
+        self.link()
+
+    def __len__(self):
+        return self.words
+
+    def insert(self, word, value):
+        if not word:
+            return
+        node = 0
+        for char in word:
+            child = self.goto[node].get(char)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][char] = child
+                self.goto.append({})
+                self.fail.append(0)
+                self.value.append(None)
+                self.length.append(0)
+                self.output.append(0)
+            node = child
+        if self.value[node] is None:
+            self.words += 1
+        self.value[node] = value
+        self.length[node] = len(word)
+
+    def link(self):
+        """Calcula los enlaces de falla y de salida recorriendo por niveles"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                fail = self.goto[state].get(char, 0)
+                self.fail[child] = fail
+                self.output[child] = (
+                    fail if self.value[fail] is not None
+                    else self.output[fail]
+                )
+
+    def find(self, text):
+        """Genera (inicio, fin, valor) por cada ocurrencia en el texto"""
+        text = text.lower()
+        goto = self.goto
+        fail = self.fail
+        value = self.value
+        length = self.length
+        output = self.output
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            node = state if value[state] is not None else output[state]
+            while node:
+                start = end - length[node]
+                if (
+                    (start == 0 or not is_word_char(text[start - 1])) and
+                    (end == len(text) or not is_word_char(text[end]))
+                ):
+                    yield start, end, value[node]
+                node = output[node]
+
+
+def longest(matches):
+    """Deja las ocurrencias mas largas que no se superponen
+
+    'Machine Learning' gana sobre 'Learning' dentro del mismo texto.
+    """
+    selected = []
+    last_end = 0
+    for start, end, value in sorted(
+        matches, key=lambda match: (match[0], match[0] - match[1])
+    ):
+        if start >= last_end:
+            selected.append((start, end, value))
+            last_end = end
+
+    return selected
+
+
+class IncrementalAutomaton(object):
+    """Automata al que se le pueden agregar nombres sin rearmarlo entero
+
+    Los nombres nuevos van a un automata chico que se rearma solo; cuando
+    crece mas que una fraccion del principal ambos se juntan. La busqueda
+    recorre los dos automatas.
+    """
+
+    def __init__(self, words=(), merge_ratio=0.1, min_merge=256):
+        self.words = dict(words)
+        self.merge_ratio = merge_ratio
+        self.min_merge = min_merge
+        self.main = Automaton(self.words.items())
+        self.pending = {}
+        self.delta = Automaton()
+
+    def __len__(self):
+        return len(self.words) + len(self.pending)
+
+    def add(self, words):
+        """Agrega pares (nombre, valor) y retorna si se rearmo el principal"""
+        self.pending.update(words)
+        limit = max(self.min_merge, len(self.words) * self.merge_ratio)
+        if len(self.pending) > limit:
+            self.words.update(self.pending)
+            self.pending = {}
+            self.main = Automaton(self.words.items())
+            self.delta = Automaton()
+            return True
+
+        self.delta = Automaton(self.pending.items())
+        return False
+
+    def find(self, text):
+        matches = list(self.main.find(text))
+        if len(self.delta):
+            matches.extend(self.delta.find(text))
+
+        return longest(matches)
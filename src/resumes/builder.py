@@ -0,0 +1,114 @@
+import json
+
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import Prefetch
+from django.db.models import prefetch_related_objects
+
+from core import models
+from core import routers
+
+
+SNAPSHOT_VERSION = 1
+
+
+def build_resume(user):
+    """Arma el documento del curriculum con un numero fijo de consultas"""
+    # Un prefetch anterior sobre la misma instancia puede estar desactualizado
+    user.__dict__.pop('_prefetched_objects_cache', None)
+    prefetch_related_objects(
+        [user],
+        Prefetch(
+            'userskill_set',
+            queryset=models.UserSkill.objects.select_related(
+                'skill'
+            ).order_by('-proficiency', 'skill__name')
+        ),
+        Prefetch(
+            'jobs',
+            queryset=models.Job.objects.order_by('-start_date')
+        )
+    )
+
+    return {
+        'version': SNAPSHOT_VERSION,
+        'user': {
+            'id': user.id,
+            'email': user.email,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'display_name': user.display_name,
+            'cellphone': str(user.cellphone or ''),
+            'photo': user.photo.name if user.photo else None,
+        },
+        'skills': [
+            {
+                'id': user_skill.skill.id,
+                'name': user_skill.skill.name,
+                'proficiency': user_skill.proficiency,
+            }
+            for user_skill in user.userskill_set.all()
+        ],
+        'jobs': [
+            {
+                'id': job.id,
+                'title': job.title,
+                'company': job.company,
+                'start_date': job.start_date.isoformat(),
+                'end_date': (
+                    job.end_date.isoformat() if job.end_date else None
+                ),
+                'present_day': job.present_day,
+            }
+            for job in user.jobs.all()
+        ],
+    }
+
+
+def get_resume(user):
+    """Retorna el curriculum desde su snapshot o lo arma y lo guarda
+
+    El snapshot se guarda solo si nadie lo invalido mientras se armaba. Se
+    arma leyendo del primario, para no guardar los datos de una replica
+    atrasada; con una generation atrasada de la replica no se guarda.
+    """
+    snapshot = models.ResumeSnapshot.objects.filter(
+        user_id=user.pk
+    ).values_list('version', 'data', 'generation').first()
+    if snapshot is not None:
+        version, cached, generation = snapshot
+        if version == SNAPSHOT_VERSION and cached:
+            return json.loads(cached)
+
+    with routers.use_replica(False):
+        if snapshot is None:
+            generation = create_snapshot(user)
+        data = build_resume(user)
+    models.ResumeSnapshot.objects.filter(
+        user_id=user.pk,
+        generation=generation
+    ).update(version=SNAPSHOT_VERSION, data=json.dumps(data))
+
+    return data
+
+
+def create_snapshot(user):
+    """Crea el snapshot vacio del usuario y retorna su generation
+
+    La fila existe antes de leer los datos, asi una invalidacion que
+    llegue durante el armado cambia su generation.
+    """
+    try:
+        with transaction.atomic():
+            models.ResumeSnapshot.objects.create(
+                user_id=user.pk,
+                version=SNAPSHOT_VERSION,
+                data=''
+            )
+    except IntegrityError:
+        # Otra peticion lo creo al mismo tiempo
+        return models.ResumeSnapshot.objects.filter(
+            user_id=user.pk
+        ).values_list('generation', flat=True).get()
+
+    return 0
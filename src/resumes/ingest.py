@@ -0,0 +1,176 @@
+"""Importacion de curriculums: trabajos candidatos y habilidades mencionadas
+
+Las habilidades se buscan con un automata de Aho-Corasick sobre todos los
+nombres del catalogo, armado una vez por proceso. Cuando se agregan
+habilidades solo se suman las nuevas; se rearma entero si alguna se
+renombro o borro.
+"""
+import threading
+import time
+
+from collections import Counter
+from datetime import date
+
+from core import catalog
+from core import models
+from core import routers
+
+from resumes import parsers
+from resumes.automaton import IncrementalAutomaton
+
+
+# Competencia de una habilidad segun cuantas veces se menciona
+MAX_PROFICIENCY = 5
+
+
+class SkillMatcher(object):
+    """Busca las habilidades del catalogo mencionadas en un texto"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.automaton = None
+        self.version = None
+        self.names_version = None
+        self.max_id = 0
+        self.names = {}
+
+    def rebuild(self):
+        skills = list(models.Skill.objects.values_list('id', 'name'))
+        self.names = dict(skills)
+        self.max_id = max(self.names, default=0)
+        self.automaton = IncrementalAutomaton(
+            (name, skill_id) for skill_id, name in skills
+        )
+
+    def add_new(self):
+        """Agrega al automata las habilidades creadas desde la ultima vez
+
+        Una habilidad que se confirmo despues que otra de id mayor queda
+        bajo max_id; si el catalogo tiene mas habilidades que las conocidas
+        se rearma.
+        """
+        skills = list(models.Skill.objects.filter(
+            id__gt=self.max_id
+        ).values_list('id', 'name'))
+        if skills:
+            self.names.update(skills)
+            self.max_id = max(
+                self.max_id, *(skill_id for skill_id, _ in skills)
+            )
+            self.automaton.add((name, skill_id) for skill_id, name in skills)
+        if models.Skill.objects.count() != len(self.names):
+            self.rebuild()
+
+    def sync(self):
+        """Pone el automata al dia con el catalogo
+
+        Sin cambios solo cuesta leer la version del cache.
+        """
+        version = catalog.catalog_version()
+        with self.lock:
+            if version == self.version:
+                return
+            names_version = catalog.names_version()
+            if (
+                self.automaton is None or
+                names_version != self.names_version
+            ):
+                self.rebuild()
+            else:
+                self.add_new()
+            self.version = version
+            self.names_version = names_version
+
+    def match(self, text):
+        """Retorna las menciones por id de habilidad y los nombres por id"""
+        self.sync()
+        with self.lock:
+            automaton = self.automaton
+            names = self.names
+        mentions = Counter(
+            skill_id for _, _, skill_id in automaton.find(text)
+        )
+
+        return {
+            skill_id: count for skill_id, count in mentions.items()
+            if skill_id in names
+        }, names
+
+
+matcher = SkillMatcher()
+
+
+def parse(data, input_format):
+    """Trabajos candidatos y habilidades mencionadas en un curriculum
+
+    Cada habilidad lleva una competencia sugerida segun sus menciones. El
+    resultado incluye los milisegundos de lectura y de busqueda.
+    """
+    start = time.perf_counter()
+    text, jobs = parsers.parse(data, input_format)
+    parsed = time.perf_counter()
+    mentions, names = matcher.match(text)
+    matched = time.perf_counter()
+
+    skills = [
+        {
+            'id': skill_id,
+            'name': names[skill_id],
+            'mentions': count,
+            'proficiency': min(count, MAX_PROFICIENCY),
+        }
+        for skill_id, count in sorted(
+            mentions.items(), key=lambda item: (-item[1], names[item[0]])
+        )
+    ]
+
+    return {
+        'jobs': jobs,
+        'skills': skills,
+        'timing': {
+            'parse_ms': round((parsed - start) * 1000, 3),
+            'match_ms': round((matched - parsed) * 1000, 3),
+        },
+    }
+
+
+def save(user, result):
+    """Agrega al usuario los trabajos y habilidades que aun no tiene
+
+    Retorna cuantos se crearon de cada uno.
+    """
+    existing_jobs = set(user.jobs.values_list(
+        'title', 'company', 'start_date'
+    ))
+    jobs = []
+    for job in result['jobs']:
+        job = dict(job, start_date=date.fromisoformat(job['start_date']))
+        if job['end_date']:
+            job['end_date'] = date.fromisoformat(job['end_date'])
+        key = (job['title'], job['company'], job['start_date'])
+        if key not in existing_jobs:
+            existing_jobs.add(key)
+            jobs.append(job)
+
+    existing_skills = set(models.UserSkill.objects.filter(
+        user=user
+    ).values_list('skill_id', flat=True))
+    skill_ids = [
+        skill['id'] for skill in result['skills']
+        if skill['id'] not in existing_skills
+    ]
+    # Las habilidades pudieron borrarse despues de armar el automata
+    skills = models.Skill.objects.in_bulk(skill_ids)
+    user_skills = [
+        {'skill': skills[skill['id']], 'proficiency': skill['proficiency']}
+        for skill in result['skills'] if skill['id'] in skills
+    ]
+
+    if jobs:
+        user.add_jobs(jobs)
+    if user_skills:
+        user.add_skills(user_skills)
+    if jobs or user_skills:
+        routers.pin(user.pk)
+
+    return {'jobs': len(jobs), 'skills': len(user_skills)}
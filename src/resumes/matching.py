@@ -0,0 +1,107 @@
+import re
+
+import numpy as np
+
+
+WORD_RE = re.compile(r'[\w+#]+')
+
+# Limites de palabra que respetan nombres como C++, C# o Node.js
+BOUNDARY = r'(?<![\w+#]){}(?![\w+#])'
+
+
+class Profile(object):
+    """Matrices precomputadas de un curriculum para puntuar avisos
+
+    Las columnas son el vocabulario del usuario: los nombres de sus
+    habilidades y las palabras de los titulos de sus trabajos. Armar el
+    perfil una vez permite puntuar cientos de avisos con unas pocas
+    operaciones de matrices.
+    """
+
+    def __init__(self, resume):
+        self.skills = resume['skills']
+        self.jobs = resume['jobs']
+
+        vocabulary = {}
+        names = [skill['name'].lower() for skill in self.skills]
+        for name in names:
+            vocabulary.setdefault(name, len(vocabulary))
+        for job in self.jobs:
+            for word in WORD_RE.findall(job['title'].lower()):
+                vocabulary.setdefault(word, len(vocabulary))
+        self.vocabulary = vocabulary
+
+        if vocabulary:
+            # Los terminos mas largos primero para que 'c++' gane sobre 'c'
+            terms = sorted(vocabulary, key=len, reverse=True)
+            self.pattern = re.compile(BOUNDARY.format(
+                '(?:{})'.format('|'.join(re.escape(term) for term in terms))
+            ))
+        else:
+            self.pattern = None
+
+        self.skill_columns = np.array(
+            [vocabulary[name] for name in names], dtype=np.intp
+        )
+        proficiency = np.array(
+            [skill['proficiency'] for skill in self.skills], dtype=float
+        )
+        if proficiency.size:
+            proficiency = proficiency / proficiency.max()
+        self.skill_weights = proficiency
+
+        # Trabajo x termino, con filas normalizadas
+        self.job_matrix = np.zeros((len(self.jobs), len(vocabulary)))
+        for row, job in enumerate(self.jobs):
+            text = '{} {}'.format(job['title'], job['company'])
+            for term in self.terms(text):
+                self.job_matrix[row, vocabulary[term]] = 1.0
+        norms = np.linalg.norm(self.job_matrix, axis=1, keepdims=True)
+        np.divide(self.job_matrix, norms, out=self.job_matrix, where=norms > 0)
+
+    def terms(self, text):
+        if self.pattern is None:
+            return set()
+
+        return set(self.pattern.findall(text.lower()))
+
+    def vectorize(self, targets):
+        """Aviso x termino; cada aviso es un texto o una lista de nombres"""
+        matrix = np.zeros((len(targets), len(self.vocabulary)))
+        for row, target in enumerate(targets):
+            if not isinstance(target, str):
+                target = ', '.join(target)
+            for term in self.terms(target):
+                matrix[row, self.vocabulary[term]] = 1.0
+
+        return matrix
+
+    def score(self, targets):
+        """Retorna los puntajes de habilidades y trabajos por cada aviso"""
+        matrix = self.vectorize(targets)
+        skill_scores = matrix[:, self.skill_columns] * self.skill_weights
+        job_scores = matrix @ self.job_matrix.T
+
+        return skill_scores, job_scores
+
+    def match(self, targets, top_k=5):
+        """Retorna las top_k habilidades y trabajos para cada aviso"""
+        skill_scores, job_scores = self.score(targets)
+
+        return [
+            {
+                'skills': self.top(self.skills, skill_row, top_k),
+                'jobs': self.top(self.jobs, job_row, top_k),
+            }
+            for skill_row, job_row in zip(skill_scores, job_scores)
+        ]
+
+    def top(self, items, scores, top_k):
+        # El orden estable desempata por el orden del curriculum
+        order = np.argsort(-scores, kind='stable')[:top_k]
+
+        return [
+            dict(items[index], score=round(float(scores[index]), 4))
+            for index in order
+            if scores[index] > 0
+        ]
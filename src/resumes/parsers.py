@@ -0,0 +1,304 @@
+"""Lectura de curriculums subidos: PDF, DOCX y la exportacion JSON de
+LinkedIn
+
+Cada formato se convierte a texto y a una lista de trabajos candidatos,
+con los mismos campos que recibe User.add_jobs.
+"""
+import io
+import json
+import re
+import zipfile
+
+from datetime import date
+from xml.etree import ElementTree
+
+from django.conf import settings
+
+from resumes import pdf
+
+
+FORMATS = ('pdf', 'docx', 'linkedin')
+
+EXTENSIONS = {'pdf': 'pdf', 'docx': 'docx', 'linkedin': 'json'}
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    'ene': 1, 'abr': 4, 'ago': 8, 'set': 9, 'dic': 12,
+}
+
+PRESENT = r'present|current|now|actual(?:idad)?|presente|hoy'
+
+MONTH = r'(?:{})[a-z]*\.?'.format('|'.join(MONTHS))
+
+DATE = r'(?:{month}\s+(?:de\s+)?\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})'.format(
+    month=MONTH
+)
+
+RANGE_RE = re.compile(
+    r'(?P<start>{date})\s*(?:-|–|—|to|a|hasta)\s*'
+    r'(?P<end>{date}|{present})'.format(date=DATE, present=PRESENT),
+    re.I
+)
+
+DATE_RE = re.compile(
+    r'(?:(?P<month>{month})\s+(?:de\s+)?|(?P<number>\d{{1,2}})/)?'
+    r'(?P<year>\d{{4}})'.format(month=MONTH),
+    re.I
+)
+
+# Separadores entre el cargo y la empresa, en orden de preferencia
+SEPARATORS = (' at ', ' en ', ' @ ', '@', ' - ', ' – ', ' | ', ', ')
+
+
+class ParseError(ValueError):
+    """El archivo no se puede leer como curriculum"""
+
+
+def max_text_length():
+    """Limite de bytes descomprimidos y de caracteres del texto leido"""
+    return getattr(settings, 'RESUME_MAX_TEXT_LENGTH', pdf.MAX_TEXT_LENGTH)
+
+
+def detect_format(name, data):
+    """Retorna el formato de un archivo por su contenido, o None"""
+    if data.startswith(b'%PDF'):
+        return 'pdf'
+    if data.startswith(b'PK'):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                if 'word/document.xml' in archive.namelist():
+                    return 'docx'
+        except zipfile.BadZipFile:
+            return None
+        return None
+    if name.lower().endswith('.json') or data.lstrip()[:1] in (b'{', b'['):
+        try:
+            json.loads(data.decode('utf-8'))
+        except ValueError:
+            return None
+        return 'linkedin'
+
+    return None
+
+
+def docx_text(data, max_length=pdf.MAX_TEXT_LENGTH):
+    """Texto de un DOCX, un renglon por parrafo
+
+    El documento no se descomprime si pasa de max_length bytes.
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            info = archive.getinfo('word/document.xml')
+            if info.file_size > max_length:
+                raise ParseError(
+                    'The document is larger than {} bytes'.format(max_length)
+                )
+            root = ElementTree.fromstring(archive.read(info))
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        raise ParseError('The file is not a valid DOCX document')
+
+    lines = []
+    for paragraph in root.iter(WORD_NS + 'p'):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == WORD_NS + 't':
+                parts.append(node.text or '')
+            elif node.tag in (WORD_NS + 'tab', WORD_NS + 'br'):
+                parts.append('\n' if node.tag == WORD_NS + 'br' else ' ')
+        lines.extend(''.join(parts).splitlines())
+
+    return '\n'.join(line.strip() for line in lines if line.strip())
+
+
+def parse_date(value, end=False):
+    """Fecha de 'Mar 2019', 'marzo de 2019', '03/2019' o '2019'
+
+    Sin mes se usa enero, o diciembre si es la fecha de fin.
+    """
+    match = DATE_RE.search(value)
+    if match is None:
+        return None
+    month = 12 if end else 1
+    if match.group('month'):
+        month = MONTHS.get(match.group('month')[:3].lower())
+        if month is None:
+            return None
+    elif match.group('number'):
+        month = int(match.group('number'))
+        if not 1 <= month <= 12:
+            return None
+
+    return date(int(match.group('year')), month, 1)
+
+
+def split_title(text):
+    """Separa 'Cargo at Empresa' en cargo y empresa"""
+    text = text.strip(' \t-–—|,:;')
+    for separator in SEPARATORS:
+        if separator in text:
+            title, company = text.split(separator, 1)
+            title = title.strip(' -–—|,')
+            company = company.strip(' -–—|,')
+            if title and company:
+                return title, company
+
+    return '', text
+
+
+def extract_jobs(text):
+    """Trabajos candidatos de un texto, uno por rango de fechas
+
+    El cargo y la empresa se toman del mismo renglon que las fechas o, si
+    ahi no hay nada mas, del renglon anterior.
+    """
+    jobs = []
+    lines = [line.strip() for line in text.splitlines()]
+    for i, line in enumerate(lines):
+        match = RANGE_RE.search(line)
+        if match is None:
+            continue
+        start_date = parse_date(match.group('start'))
+        present_day = re.fullmatch(PRESENT, match.group('end'), re.I)
+        end_date = (
+            None if present_day else parse_date(match.group('end'), end=True)
+        )
+        if start_date is None or (not present_day and end_date is None):
+            continue
+        if end_date is not None and end_date < start_date:
+            continue
+
+        rest = (line[:match.start()] + ' ' + line[match.end():]).strip(
+            ' \t-–—|,:;()'
+        )
+        if not rest and i > 0:
+            rest = lines[i - 1]
+        title, company = split_title(rest)
+        if not company:
+            continue
+        jobs.append({
+            'title': title[:255],
+            'company': company[:255],
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat() if end_date else None,
+            'present_day': bool(present_day),
+        })
+
+    return jobs
+
+
+def linkedin_values(value):
+    """Las listas de la API de LinkedIn vienen como {'values': [...]}"""
+    if isinstance(value, dict):
+        value = value.get('values', [])
+
+    return value if isinstance(value, list) else []
+
+
+def linkedin_date(value, end=False):
+    if not isinstance(value, dict) or not value.get('year'):
+        return None
+    month = value.get('month') or (12 if end else 1)
+    try:
+        return date(int(value['year']), int(month), 1)
+    except (TypeError, ValueError):
+        raise ParseError('Invalid date {}/{}'.format(month, value['year']))
+
+
+def linkedin_skill(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        if isinstance(value.get('skill'), dict):
+            return value['skill'].get('name')
+        return value.get('name')
+
+    return None
+
+
+def linkedin(data):
+    """Texto y trabajos del JSON de un perfil de LinkedIn
+
+    Las habilidades declaradas y los textos del perfil quedan en el texto,
+    donde las encuentra el automata como al resto de los formatos.
+    """
+    try:
+        profile = json.loads(data.decode('utf-8'))
+    except ValueError:
+        raise ParseError('The file is not valid JSON')
+    if not isinstance(profile, dict):
+        raise ParseError('The file is not a LinkedIn profile')
+
+    lines = [
+        str(profile[field]) for field in ('headline', 'summary')
+        if profile.get(field)
+    ]
+    jobs = []
+    for position in linkedin_values(profile.get('positions')):
+        if not isinstance(position, dict):
+            continue
+        company = position.get('companyName') or position.get('company')
+        if isinstance(company, dict):
+            company = company.get('name')
+        start_date = linkedin_date(position.get('startDate'))
+        end_date = linkedin_date(position.get('endDate'), end=True)
+        present_day = bool(position.get('isCurrent')) or end_date is None
+        lines.extend(
+            str(position[field]) for field in ('title', 'summary')
+            if position.get(field)
+        )
+        if not company or start_date is None:
+            continue
+        # Como en extract_jobs, un rango invertido no es un trabajo
+        if not present_day and end_date < start_date:
+            continue
+        jobs.append({
+            'title': str(position.get('title') or '')[:255],
+            'company': str(company)[:255],
+            'start_date': start_date.isoformat(),
+            'end_date': (
+                None if present_day else end_date.isoformat()
+            ),
+            'present_day': present_day,
+        })
+    lines.extend(
+        name for name in (
+            linkedin_skill(skill)
+            for skill in linkedin_values(profile.get('skills'))
+        ) if name
+    )
+
+    return '\n'.join(lines), jobs
+
+
+def check_length(text, max_length):
+    if len(text) > max_length:
+        raise ParseError(
+            'The file has more than {} characters of text'.format(max_length)
+        )
+
+
+def parse(data, input_format):
+    """Retorna el texto y los trabajos candidatos de un curriculum
+
+    Falla si el texto pasa de max_text_length.
+    """
+    max_length = max_text_length()
+    if input_format == 'linkedin':
+        text, jobs = linkedin(data)
+        check_length(text, max_length)
+        return text, jobs
+    if input_format == 'docx':
+        text = docx_text(data, max_length)
+    elif input_format == 'pdf':
+        try:
+            text = pdf.extract_text(data, max_length)
+        except pdf.TooLarge as e:
+            raise ParseError(str(e))
+    else:
+        raise ParseError('Unknown format {}'.format(input_format))
+    check_length(text, max_length)
+
+    return text, extract_jobs(text)
@@ -0,0 +1,289 @@
+import re
+import zlib
+
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 56
+FONT_SIZE = 11
+LEADING = 15
+
+
+def escape(text):
+    """Escapa un texto para usarlo como string de PDF"""
+    text = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    return text.encode('latin-1', errors='replace')
+
+
+def paginate(lines):
+    per_page = (PAGE_HEIGHT - 2 * MARGIN) // LEADING
+    for i in range(0, max(len(lines), 1), per_page):
+        yield lines[i:i + per_page]
+
+
+def text_document(lines):
+    """Arma un PDF de texto plano con Helvetica, una linea por renglon"""
+    pages = list(paginate(lines))
+    # 1: catalogo, 2: arbol de paginas, 3: fuente, luego pagina y contenido
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = {
+        1: b'<< /Type /Catalog /Pages 2 0 R >>',
+        2: '<< /Type /Pages /Kids [{}] /Count {} >>'.format(
+            ' '.join('{} 0 R'.format(page_id) for page_id in page_ids),
+            len(pages)
+        ).encode(),
+        3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica '
+           b'/Encoding /WinAnsiEncoding >>',
+    }
+    for page_id, page_lines in zip(page_ids, pages):
+        stream = b'BT /F1 %d Tf %d TL %d %d Td ' % (
+            FONT_SIZE, LEADING, MARGIN, PAGE_HEIGHT - MARGIN
+        )
+        stream += b''.join(
+            b'(' + escape(line) + b') Tj T* ' for line in page_lines
+        )
+        stream += b'ET'
+        objects[page_id] = (
+            '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {} {}] '
+            '/Resources << /Font << /F1 3 0 R >> >> '
+            '/Contents {} 0 R >>'.format(
+                PAGE_WIDTH, PAGE_HEIGHT, page_id + 1
+            ).encode()
+        )
+        objects[page_id + 1] = (
+            b'<< /Length %d >>\nstream\n' % len(stream)
+            + stream + b'\nendstream'
+        )
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for object_id in sorted(objects):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n' % object_id
+        output += objects[object_id] + b'\nendobj\n'
+
+    xref = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(offsets) + 1)
+    output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    output += b'trailer\n<< /Size %d /Root 1 0 R >>\n' % (len(offsets) + 1)
+    output += b'startxref\n%d\n%%%%EOF\n' % xref
+
+    return bytes(output)
+
+
+# Limite por defecto de bytes descomprimidos al extraer el texto
+MAX_TEXT_LENGTH = 8388608
+
+# Streams sin texto: imagenes, referencias, objetos y fuentes embebidas
+SKIPPED_STREAMS = (
+    b'/Image', b'/XRef', b'/ObjStm', b'/Length1', b'/Type1C',
+    b'/CIDFontType0C', b'/OpenType'
+)
+
+# Inicio de los datos de un stream, sin confundirlo con endstream
+STREAM_RE = re.compile(rb'(?<!end)stream\r?\n')
+
+NUMBER_RE = re.compile(rb'[+-]?(?:\d+\.?\d*|\.\d+)')
+
+DELIMITERS = b'()<>[]{}/%'
+
+ESCAPES = {
+    ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t',
+    ord('b'): b'\b', ord('f'): b'\f',
+}
+
+# Un desplazamiento de TJ mayor a esto, en milesimas de em, es un espacio
+TJ_SPACE = 200
+
+
+def read_literal(data, i):
+    """Lee un string (...) desde data[i] y retorna el string y el final"""
+    depth = 1
+    i += 1
+    value = bytearray()
+    while i < len(data) and depth:
+        char = data[i]
+        if char == ord('\\'):
+            i += 1
+            if i >= len(data):
+                break
+            escaped = data[i]
+            if escaped in ESCAPES:
+                value += ESCAPES[escaped]
+            elif ord('0') <= escaped <= ord('7'):
+                digits = re.match(rb'[0-7]{1,3}', data[i:i + 3]).group()
+                value.append(int(digits, 8) & 0xFF)
+                i += len(digits) - 1
+            elif escaped not in b'\r\n':
+                value.append(escaped)
+        elif char == ord('('):
+            depth += 1
+            value.append(char)
+        elif char == ord(')'):
+            depth -= 1
+            if depth:
+                value.append(char)
+        else:
+            value.append(char)
+        i += 1
+
+    return bytes(value), i
+
+
+def tokens(data):
+    """Genera (tipo, valor) de los tokens de un stream de contenido"""
+    i = 0
+    length = len(data)
+    while i < length:
+        char = data[i:i + 1]
+        if char.isspace():
+            i += 1
+        elif char == b'%':
+            end = data.find(b'\n', i)
+            i = length if end < 0 else end
+        elif char == b'(':
+            value, i = read_literal(data, i)
+            yield 'string', value
+        elif data.startswith(b'<<', i) or data.startswith(b'>>', i):
+            i += 2
+        elif char == b'<':
+            end = data.find(b'>', i)
+            end = length if end < 0 else end
+            digits = re.sub(rb'[^0-9A-Fa-f]', b'', data[i + 1:end])
+            if len(digits) % 2:
+                digits += b'0'
+            yield 'string', bytes.fromhex(digits.decode())
+            i = end + 1
+        elif char in (b'[', b']'):
+            yield char.decode(), None
+            i += 1
+        elif char == b'/':
+            end = i + 1
+            while (
+                end < length and not data[end:end + 1].isspace() and
+                data[end] not in DELIMITERS
+            ):
+                end += 1
+            yield 'name', data[i + 1:end]
+            i = end
+        else:
+            number = NUMBER_RE.match(data, i)
+            if number:
+                yield 'number', float(number.group())
+                i = number.end()
+                continue
+            end = i + 1
+            while (
+                end < length and not data[end:end + 1].isspace() and
+                data[end] not in DELIMITERS
+            ):
+                end += 1
+            yield 'operator', data[i:end]
+            i = end
+
+
+def content_text(data):
+    """Texto de un stream de contenido, con un salto por renglon"""
+    text = []
+    operands = []
+    array = None
+    for kind, value in tokens(data):
+        if kind == '[':
+            array = []
+        elif kind == ']':
+            operands.append(array or [])
+            array = None
+        elif array is not None:
+            array.append((kind, value))
+        elif kind != 'operator':
+            operands.append((kind, value))
+        else:
+            if value in (b"'", b'"', b'T*', b'ET'):
+                text.append('\n')
+            elif value in (b'Td', b'TD') and len(operands) >= 2:
+                text.append('\n' if operands[-1][1] else ' ')
+            elif value == b'Tm':
+                text.append('\n')
+            if value in (b'Tj', b"'", b'"') and operands:
+                kind, string = operands[-1]
+                if kind == 'string':
+                    text.append(string.decode('latin-1'))
+            elif value == b'TJ' and operands:
+                for kind, item in operands[-1]:
+                    if kind == 'string':
+                        text.append(item.decode('latin-1'))
+                    elif kind == 'number' and item < -TJ_SPACE:
+                        text.append(' ')
+            operands = []
+
+    return ''.join(text)
+
+
+class TooLarge(ValueError):
+    """Los streams del PDF superan el limite de bytes"""
+
+
+def inflate(stream, max_length):
+    """Descomprime un stream FlateDecode sin pasar de max_length bytes"""
+    decompressor = zlib.decompressobj()
+    data = decompressor.decompress(stream, max_length + 1)
+    if len(data) > max_length or decompressor.unconsumed_tail:
+        raise TooLarge(
+            'The PDF content is larger than {} bytes'.format(max_length)
+        )
+
+    return data
+
+
+def streams(data):
+    """Genera el diccionario y los datos de cada objeto con stream
+
+    Recorre el PDF una sola vez buscando las palabras clave; una expresion
+    que abarque el objeto entero retrocede sin fin con archivos armados.
+    """
+    position = 0
+    while True:
+        match = STREAM_RE.search(data, position)
+        if match is None:
+            return
+        end = data.find(b'endstream', match.end())
+        if end == -1:
+            return
+        start = data.rfind(b'obj', position, match.start())
+        if start != -1:
+            yield data[start + 3:match.start()], data[match.end():end]
+        position = end + len(b'endstream')
+
+
+def extract_text(data, max_length=MAX_TEXT_LENGTH):
+    """Extrae el texto de un PDF, sin dependencias externas
+
+    Lee los operadores de texto de los streams de contenido, sin
+    comprimir o con FlateDecode. Alcanza para los PDF que generan los
+    editores de texto con fuentes simples; con fuentes CID el texto sale
+    sin decodificar. Falla con TooLarge si los streams leidos suman mas de
+    max_length bytes, sin descomprimir el resto.
+    """
+    lines = []
+    remaining = max_length
+    for dictionary, stream in streams(data):
+        if any(key in dictionary for key in SKIPPED_STREAMS):
+            continue
+        if b'/FlateDecode' in dictionary:
+            try:
+                stream = inflate(stream, remaining)
+            except zlib.error:
+                continue
+        elif b'/Filter' in dictionary:
+            continue
+        remaining -= len(stream)
+        if remaining < 0:
+            raise TooLarge(
+                'The PDF content is larger than {} bytes'.format(max_length)
+            )
+        if b'BT' not in stream:
+            continue
+        lines.extend(content_text(stream).splitlines())
+
+    return '\n'.join(line.strip() for line in lines if line.strip())
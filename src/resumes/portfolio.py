@@ -0,0 +1,131 @@
+import hashlib
+import io
+import json
+import os
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.loader import render_to_string
+
+from core import images
+
+from resumes import builder
+
+
+PORTFOLIOS_PATH = 'Portfolios'
+
+# Cambiar la version fuerza a volver a renderizar todas las paginas
+VERSION = 1
+
+# Pagina -> partes del curriculum de las que depende
+PAGES = {
+    'index.html': ('user', 'skills', 'jobs'),
+    'experience.html': ('user', 'jobs'),
+    'skills.html': ('user', 'skills'),
+    'style.css': (),
+}
+
+PHOTO_PAGE = 'photo.jpg'
+
+
+def site_path(user_id, *parts):
+    return os.path.join(PORTFOLIOS_PATH, str(user_id), *parts)
+
+
+def page_hash(page, data, has_photo):
+    source = {part: data[part] for part in PAGES[page]}
+    payload = json.dumps([VERSION, page, has_photo, source], sort_keys=True)
+
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def read_manifest(user_id):
+    path = site_path(user_id, 'manifest.json')
+    if not default_storage.exists(path):
+        return {'pages': {}, 'zip': None}
+    with default_storage.open(path) as f:
+        return json.loads(f.read().decode())
+
+
+def write(path, content):
+    if default_storage.exists(path):
+        default_storage.delete(path)
+
+    return default_storage.save(path, ContentFile(content))
+
+
+def render_page(page, data, has_photo):
+    context = {
+        'resume': data,
+        'name': data['user']['display_name'].strip() or data['user']['email'],
+        'has_photo': has_photo,
+    }
+
+    return render_to_string(
+        'resumes/portfolio/{}'.format(page), context
+    ).encode()
+
+
+def build_portfolio(user):
+    """Genera el sitio estatico del usuario y lo empaqueta en un zip
+
+    Solo se vuelven a renderizar las paginas cuyo hash de origen cambio
+    desde el ultimo build, segun el manifest guardado junto al sitio.
+    Retorna la ruta del zip y las paginas renderizadas.
+    """
+    data = builder.get_resume(user)
+    manifest = read_manifest(user.pk)
+    # La foto se incluye recien cuando su miniatura fue generada
+    photo = data['user']['photo']
+    has_photo = bool(photo) and default_storage.exists(photo_path(photo))
+    hashes = {page: page_hash(page, data, has_photo) for page in PAGES}
+    if has_photo:
+        hashes[PHOTO_PAGE] = hashlib.sha256(photo.encode()).hexdigest()
+
+    rendered = []
+    for page, digest in hashes.items():
+        path = site_path(user.pk, 'site', page)
+        built = manifest['pages'].get(page) == digest
+        if built and default_storage.exists(path):
+            continue
+        if page == PHOTO_PAGE:
+            with default_storage.open(photo_path(photo)) as f:
+                content = f.read()
+        else:
+            content = render_page(page, data, has_photo)
+        write(path, content)
+        rendered.append(page)
+
+    for page in set(manifest['pages']) - set(hashes):
+        default_storage.delete(site_path(user.pk, 'site', page))
+
+    # El zip se identifica por el contenido de todas sus paginas
+    bundle_hash = hashlib.sha256(
+        json.dumps(hashes, sort_keys=True).encode()
+    ).hexdigest()[:16]
+    zip_path = site_path(user.pk, 'portfolio-{}.zip'.format(bundle_hash))
+    if rendered or not default_storage.exists(zip_path):
+        write(zip_path, bundle(user.pk, hashes))
+        if manifest['zip'] and manifest['zip'] != zip_path:
+            default_storage.delete(manifest['zip'])
+    write(
+        site_path(user.pk, 'manifest.json'),
+        json.dumps({'pages': hashes, 'zip': zip_path}).encode()
+    )
+
+    return {'zip': zip_path, 'rendered': sorted(rendered)}
+
+
+def photo_path(photo):
+    return images.thumbnail_path(photo, 'large', 'jpeg')
+
+
+def bundle(user_id, pages):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for page in sorted(pages):
+            with default_storage.open(site_path(user_id, 'site', page)) as f:
+                archive.writestr(page, f.read())
+
+    return buffer.getvalue()
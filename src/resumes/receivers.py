@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core import models
+from core import signals
+
+from resumes import timeline
+
+
+@receiver(post_save, sender=models.Job)
+@receiver(post_delete, sender=models.Job)
+def invalidate_job_timeline(sender, instance, **kwargs):
+    timeline.invalidate_timeline(instance.user_id)
+
+
+@receiver(signals.jobs_added)
+def invalidate_jobs_timeline(sender, jobs, **kwargs):
+    for user_id in {job.user_id for job in jobs}:
+        timeline.invalidate_timeline(user_id)
@@ -0,0 +1,130 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.loader import render_to_string
+
+from core import images
+
+from resumes import pdf
+
+
+RENDERS_PATH = 'Renders'
+
+CONTENT_TYPES = {
+    'html': 'text/html; charset=utf-8',
+    'pdf': 'application/pdf',
+}
+
+
+class ResumeTemplate(object):
+    """Plantilla de curriculum; cambiar version invalida sus renders"""
+
+    def __init__(self, name, html_template, version=1):
+        self.name = name
+        self.html_template = html_template
+        self.version = version
+
+    def render(self, data, output_format):
+        if output_format == 'html':
+            return self.render_html(data).encode()
+        if output_format == 'pdf':
+            return self.render_pdf(data)
+        raise ValueError('Unknown format {}'.format(output_format))
+
+    def render_html(self, data):
+        photo = data['user']['photo']
+        if photo:
+            # Nunca se enlaza la foto original
+            photo = settings.MEDIA_URL + images.thumbnail_path(
+                photo, 'medium', 'jpeg'
+            )
+
+        return render_to_string(self.html_template, {
+            'resume': data,
+            'name': self.name_of(data),
+            'photo_url': photo,
+        })
+
+    def render_pdf(self, data):
+        return pdf.text_document(self.lines(data))
+
+    def name_of(self, data):
+        user = data['user']
+
+        return user['display_name'].strip() or user['email']
+
+    def lines(self, data):
+        """Retorna el curriculum como lineas de texto plano"""
+        user = data['user']
+        lines = [self.name_of(data)]
+        lines.append(' | '.join(
+            value for value in (user['email'], user['cellphone']) if value
+        ))
+        if data['jobs']:
+            lines += ['', 'Experience']
+            for job in data['jobs']:
+                end = 'Present' if job['present_day'] else job['end_date']
+                title = ' - '.join(
+                    value for value in (job['title'], job['company']) if value
+                )
+                lines.append('  {} ({} - {})'.format(
+                    title, job['start_date'], end
+                ))
+        if data['skills']:
+            lines += ['', 'Skills']
+            for skill in data['skills']:
+                lines.append('  {} ({})'.format(
+                    skill['name'], skill['proficiency']
+                ))
+
+        return lines
+
+
+TEMPLATES = {}
+
+
+def register_template(template):
+    TEMPLATES[template.name] = template
+
+    return template
+
+
+def get_template(name):
+    try:
+        return TEMPLATES[name]
+    except KeyError:
+        raise ValueError('Unknown template {}'.format(name))
+
+
+register_template(ResumeTemplate('classic', 'resumes/classic.html'))
+
+
+def content_key(data, template, output_format):
+    """Hash de los datos del curriculum y la version de la plantilla"""
+    payload = json.dumps(
+        [data, template.name, template.version, output_format],
+        sort_keys=True
+    )
+
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render(data, template_name='classic', output_format='html'):
+    """Renderiza el curriculum o reusa el render guardado con el mismo hash
+
+    Retorna el nombre del archivo en el storage.
+    """
+    if output_format not in CONTENT_TYPES:
+        raise ValueError('Unknown format {}'.format(output_format))
+    template = get_template(template_name)
+    key = content_key(data, template, output_format)
+    path = '{}/{}.{}'.format(RENDERS_PATH, key, output_format)
+    if default_storage.exists(path):
+        return path
+
+    content = template.render(data, output_format)
+
+    return default_storage.save(path, ContentFile(content))
@@ -0,0 +1,119 @@
+import json
+
+from django.conf import settings
+
+from rest_framework import serializers
+
+from core import metrics
+from core import models
+
+from resumes import parsers
+from resumes import renderers
+
+
+class GenerateResumeSerializer(serializers.Serializer):
+    """Serializer para encolar el render de un curriculum"""
+    template = serializers.CharField(default='classic')
+    output_format = serializers.ChoiceField(
+        choices=tuple(renderers.CONTENT_TYPES),
+        default='pdf'
+    )
+
+    def validate_template(self, value):
+        if value not in renderers.TEMPLATES:
+            raise serializers.ValidationError('Unknown template')
+
+        return value
+
+
+class PostingSerializer(serializers.Serializer):
+    """Serializer para un aviso de trabajo contra el cual puntuar"""
+    skills = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        required=False
+    )
+    text = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if not attrs.get('skills') and not attrs.get('text'):
+            raise serializers.ValidationError('Send skills or text')
+
+        return attrs
+
+
+class MatchSerializer(PostingSerializer):
+    """Serializer para uno o varios avisos de trabajo
+
+    Un aviso va en skills y text; varios van en postings y se puntuan
+    juntos.
+    """
+    postings = PostingSerializer(many=True, required=False)
+    top_k = serializers.IntegerField(default=5, min_value=1, max_value=100)
+
+    def validate_postings(self, value):
+        max_postings = getattr(settings, 'RESUME_MATCH_MAX_POSTINGS', 50)
+        if not value:
+            raise serializers.ValidationError('Send at least one posting')
+        if len(value) > max_postings:
+            raise serializers.ValidationError(
+                'Send at most {} postings'.format(max_postings)
+            )
+
+        return value
+
+    def validate(self, attrs):
+        if 'postings' in attrs:
+            if attrs.get('skills') or attrs.get('text'):
+                raise serializers.ValidationError(
+                    'Send postings or a single posting, not both'
+                )
+            return attrs
+
+        return super().validate(attrs)
+
+
+class ImportResumeSerializer(serializers.Serializer):
+    """Serializer para subir un curriculum en PDF, DOCX o JSON de LinkedIn"""
+    file = serializers.FileField()
+    save = serializers.BooleanField(default=True)
+
+    def validate_file(self, value):
+        max_bytes = getattr(settings, 'RESUME_IMPORT_MAX_BYTES', 10485760)
+        if value.size > max_bytes:
+            raise serializers.ValidationError(
+                'The file is larger than {} bytes'.format(max_bytes)
+            )
+
+        return value
+
+    def validate(self, attrs):
+        upload = attrs['file']
+        data = upload.read()
+        upload.seek(0)
+        input_format = parsers.detect_format(upload.name, data)
+        if input_format is None:
+            raise serializers.ValidationError(
+                {'file': 'Upload a PDF, DOCX or LinkedIn JSON file'}
+            )
+        attrs['input_format'] = input_format
+
+        return attrs
+
+
+class TaskSerializer(
+    metrics.TimedSerializerMixin,
+    serializers.ModelSerializer
+):
+    """Serializer para el modelo Task"""
+    result = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.Task
+        fields = (
+            'id', 'kind', 'status', 'result', 'error',
+            'created_at', 'started_at', 'finished_at'
+        )
+        read_only_fields = fields
+
+    def get_result(self, obj):
+        return json.loads(obj.result) if obj.result else None
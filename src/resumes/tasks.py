@@ -0,0 +1,44 @@
+from django.core.files.storage import default_storage
+
+from resumes import builder
+from resumes import ingest
+from resumes import portfolio
+from resumes import renderers
+
+
+def render_resume(task, template='classic', output_format='pdf'):
+    """Tarea que renderiza el curriculum del usuario de la tarea"""
+    data = builder.get_resume(task.user)
+    path = renderers.render(data, template, output_format)
+
+    return {'path': path, 'url': default_storage.url(path)}
+
+
+def build_portfolio(task):
+    """Tarea que genera el portafolio estatico del usuario de la tarea"""
+    result = portfolio.build_portfolio(task.user)
+    result['url'] = default_storage.url(result['zip'])
+
+    return result
+
+
+def parse_resume(task, path, input_format=None, save=True, output_format=None):
+    """Tarea que importa un curriculum subido al usuario de la tarea
+
+    Con save en False solo retorna los trabajos y habilidades encontrados.
+    El archivo subido se borra cuando la tarea termina, bien o mal; si el
+    worker muere antes, queda para cuando la tarea se vuelva a encolar.
+    output_format es el nombre anterior de input_format, de las tareas
+    encoladas antes del cambio.
+    """
+    with default_storage.open(path) as f:
+        data = f.read()
+
+    try:
+        result = ingest.parse(data, input_format or output_format)
+        if save:
+            result['created'] = ingest.save(task.user, result)
+    finally:
+        default_storage.delete(path)
+
+    return result
@@ -0,0 +1,984 @@
+from unittest.mock import patch
+
+import json
+import time
+import zipfile
+import zlib
+
+from datetime import date
+from io import BytesIO
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core import models
+from core.testing import CacheMixin
+from core.testing import MediaRootMixin
+
+from resumes import builder
+from resumes import ingest
+from resumes import matching
+from resumes import parsers
+from resumes import pdf
+from resumes import portfolio
+from resumes import renderers
+from resumes import timeline
+from resumes.automaton import Automaton
+from resumes.automaton import IncrementalAutomaton
+
+
+GENERATE_URL = reverse('resumes:generate')
+IMPORT_URL = reverse('resumes:import')
+MATCH_URL = reverse('resumes:match')
+PORTFOLIO_URL = reverse('resumes:portfolio')
+
+
+def task_url(task_id):
+    return reverse('resumes:task', args=[task_id])
+
+
+def render_url(output_format):
+    return reverse('resumes:render', args=[output_format])
+
+
+class ResumeBuilderTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456',
+            first_name='Bob',
+            last_name='Marley'
+        )
+        self.python = models.Skill.objects.create_skill(name='Python')
+        self.go = models.Skill.objects.create_skill(name='Go')
+        self.user.add_skills([
+            {'skill': self.go, 'proficiency': 2},
+            {'skill': self.python, 'proficiency': 5},
+        ])
+        self.user.add_jobs([
+            {
+                'company': 'ADP',
+                'start_date': '2018-01-01',
+                'end_date': '2018-12-31'
+            },
+            {
+                'company': 'ACME',
+                'start_date': '2019-01-01',
+                'present_day': True
+            },
+        ])
+
+    def get_user(self):
+        return get_user_model().objects.get(pk=self.user.pk)
+
+    def test_build_resume_fixed_queries(self):
+        """Testea que el curriculum se arme con un numero fijo de consultas"""
+        user = self.get_user()
+
+        with self.assertNumQueries(2):
+            data = builder.build_resume(user)
+
+        self.assertEqual(data['user']['email'], self.user.email)
+        names = [skill['name'] for skill in data['skills']]
+        self.assertEqual(names, ['Python', 'Go'])
+        companies = [job['company'] for job in data['jobs']]
+        self.assertEqual(companies, ['ACME', 'ADP'])
+
+    def test_get_resume_uses_snapshot(self):
+        """Testea que una segunda lectura sea una sola consulta"""
+        builder.get_resume(self.get_user())
+        user = self.get_user()
+
+        with self.assertNumQueries(1):
+            data = builder.get_resume(user)
+
+        self.assertEqual(len(data['skills']), 2)
+
+    def test_snapshot_invalidated_on_job_change(self):
+        """Testea que el snapshot se descarte al agregar un trabajo"""
+        builder.get_resume(self.get_user())
+
+        self.user.add_job(
+            company='Initech',
+            start_date='2017-01-01',
+            end_date='2017-06-30'
+        )
+
+        self.assertEqual(models.ResumeSnapshot.objects.get().data, '')
+        data = builder.get_resume(self.get_user())
+        self.assertEqual(len(data['jobs']), 3)
+
+    def test_snapshot_invalidated_during_build(self):
+        """Testea que no se guarde un curriculum invalidado mientras se
+        armaba
+        """
+        build_resume = builder.build_resume
+
+        def build_then_change(user):
+            data = build_resume(user)
+            self.user.add_job(
+                company='Initech',
+                start_date='2017-01-01',
+                end_date='2017-06-30'
+            )
+            return data
+
+        with patch('resumes.builder.build_resume', build_then_change):
+            data = builder.get_resume(self.get_user())
+
+        self.assertEqual(len(data['jobs']), 2)
+        self.assertEqual(models.ResumeSnapshot.objects.get().data, '')
+        data = builder.get_resume(self.get_user())
+        self.assertEqual(len(data['jobs']), 3)
+
+    def test_snapshot_invalidated_on_skill_rename(self):
+        """Testea que el snapshot se descarte al renombrar una habilidad"""
+        builder.get_resume(self.get_user())
+
+        self.go.name = 'Golang'
+        self.go.save()
+
+        data = builder.get_resume(self.get_user())
+        self.assertIn('Golang', [skill['name'] for skill in data['skills']])
+
+    def test_snapshot_kept_on_login(self):
+        """Testea que el login no descarte el snapshot"""
+        builder.get_resume(self.get_user())
+
+        self.user.save(update_fields=['last_login'])
+
+        self.assertTrue(models.ResumeSnapshot.objects.exists())
+
+
+class ResumeRendererTests(MediaRootMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456',
+            first_name='Bob',
+            last_name='Marley'
+        )
+        self.user.add_job(
+            title='Singer',
+            company='Tuff Gong',
+            start_date='1970-01-01',
+            present_day=True
+        )
+        self.data = builder.get_resume(self.user)
+
+    def test_render_html(self):
+        """Testea que se renderice el curriculum en HTML"""
+        path = renderers.render(self.data, 'classic', 'html')
+
+        with renderers.default_storage.open(path) as f:
+            content = f.read().decode()
+        self.assertIn('Bob Marley', content)
+        self.assertIn('Tuff Gong', content)
+
+    def test_render_pdf(self):
+        """Testea que se renderice el curriculum en PDF"""
+        path = renderers.render(self.data, 'classic', 'pdf')
+
+        with renderers.default_storage.open(path) as f:
+            content = f.read()
+        self.assertTrue(content.startswith(b'%PDF-'))
+        self.assertIn(b'Tuff Gong', content)
+        self.assertTrue(content.rstrip().endswith(b'%%EOF'))
+
+    def test_render_reuses_cached_output(self):
+        """Testea que un curriculum sin cambios no se vuelva a renderizar"""
+        with patch.object(
+            renderers.ResumeTemplate, 'render', return_value=b'<html>'
+        ) as render:
+            first = renderers.render(self.data, 'classic', 'html')
+            second = renderers.render(self.data, 'classic', 'html')
+
+        self.assertEqual(first, second)
+        self.assertEqual(render.call_count, 1)
+
+    def test_template_version_changes_key(self):
+        """Testea que cambiar la version de la plantilla cambie el hash"""
+        template = renderers.get_template('classic')
+        key = renderers.content_key(self.data, template, 'html')
+        new_template = renderers.ResumeTemplate(
+            'classic', template.html_template, version=template.version + 1
+        )
+
+        new_key = renderers.content_key(self.data, new_template, 'html')
+
+        self.assertNotEqual(key, new_key)
+
+    def test_unknown_template_fail(self):
+        """Testea que falle renderizar con una plantilla inexistente"""
+        with self.assertRaises(ValueError):
+            renderers.render(self.data, 'missing', 'html')
+
+
+class PortfolioTests(MediaRootMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456',
+            first_name='Bob',
+            last_name='Marley'
+        )
+        self.user.add_job(
+            title='Singer',
+            company='Tuff Gong',
+            start_date='1970-01-01',
+            present_day=True
+        )
+
+    def read_zip(self, path):
+        with renderers.default_storage.open(path) as f:
+            return zipfile.ZipFile(BytesIO(f.read()))
+
+    def test_build_portfolio(self):
+        """Testea que se generen todas las paginas del portafolio"""
+        result = portfolio.build_portfolio(self.user)
+
+        self.assertEqual(result['rendered'], sorted(portfolio.PAGES))
+        archive = self.read_zip(result['zip'])
+        self.assertEqual(sorted(archive.namelist()), sorted(portfolio.PAGES))
+        content = archive.read('experience.html').decode()
+        self.assertIn('Bob Marley', content)
+        self.assertIn('Tuff Gong', content)
+
+    def test_rebuild_unchanged_portfolio(self):
+        """Testea que un portafolio sin cambios no se vuelva a renderizar"""
+        first = portfolio.build_portfolio(self.user)
+
+        second = portfolio.build_portfolio(self.user)
+
+        self.assertEqual(second['rendered'], [])
+        self.assertEqual(first['zip'], second['zip'])
+
+    def test_rebuild_only_changed_pages(self):
+        """Testea que solo se rendericen las paginas afectadas"""
+        first = portfolio.build_portfolio(self.user)
+        skill = models.Skill.objects.create(name='Reggae')
+
+        self.user.add_skill(skill=skill, proficiency=5)
+        second = portfolio.build_portfolio(self.user)
+
+        self.assertEqual(second['rendered'], ['index.html', 'skills.html'])
+        self.assertNotEqual(first['zip'], second['zip'])
+        self.assertFalse(renderers.default_storage.exists(first['zip']))
+        archive = self.read_zip(second['zip'])
+        self.assertIn('Reggae', archive.read('skills.html').decode())
+
+    def test_portfolio_download(self):
+        """Testea descargar el portafolio y el ETag del zip"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        res = client.get(PORTFOLIO_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(BytesIO(b''.join(res.streaming_content)))
+        self.assertIn('index.html', archive.namelist())
+
+        res = client.get(PORTFOLIO_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_portfolio_task(self):
+        """Testea encolar la generacion del portafolio"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        res = client.post(PORTFOLIO_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        call_command('run_workers', workers=1, once=True, stdout=StringIO())
+        task = models.Task.objects.get(id=res.data['id'])
+        self.assertEqual(task.status, models.Task.DONE)
+
+
+class RenderApiTests(MediaRootMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_render_unauthorized(self):
+        """Testea que la autenticacion sea requerida"""
+        self.client.force_authenticate(user=None)
+
+        res = self.client.get(render_url('pdf'))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_render_pdf_successful(self):
+        """Testea descargar el curriculum en PDF"""
+        res = self.client.get(render_url('pdf'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(res.streaming_content).startswith(b'%PDF'))
+
+    def test_render_not_modified(self):
+        """Testea que un curriculum sin cambios retorne 304"""
+        res = self.client.get(render_url('html'))
+        etag = res['ETag']
+        res.close()
+
+        res = self.client.get(render_url('html'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_render_unknown_format(self):
+        """Testea que un formato desconocido retorne 404"""
+        res = self.client.get(render_url('docx'))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class GenerateApiTests(MediaRootMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_generate_resume(self):
+        """Testea encolar un render y consultar su resultado"""
+        res = self.client.post(GENERATE_URL, {'output_format': 'html'})
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data['status'], models.Task.PENDING)
+
+        call_command('run_workers', workers=1, once=True, stdout=StringIO())
+        res = self.client.get(task_url(res.data['id']))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['status'], models.Task.DONE)
+        self.assertTrue(res.data['result']['path'].endswith('.html'))
+
+    def test_generate_unknown_template_fail(self):
+        """Testea que no se encole un render con plantilla inexistente"""
+        res = self.client.post(GENERATE_URL, {'template': 'missing'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(models.Task.objects.exists())
+
+    def test_retrieve_other_user_task_fail(self):
+        """Testea que un usuario no vea las tareas de otro"""
+        other = get_user_model().objects.create_user(
+            email='other@mail.com',
+            password='123456'
+        )
+        task = models.Task.objects.create(kind='render_resume', user=other)
+
+        res = self.client.get(task_url(task.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MatchingTests(TestCase):
+    resume = {
+        'skills': [
+            {'id': 1, 'name': 'Python', 'proficiency': 5},
+            {'id': 2, 'name': 'C', 'proficiency': 2},
+            {'id': 3, 'name': 'C++', 'proficiency': 4},
+            {'id': 4, 'name': 'Django', 'proficiency': 3},
+        ],
+        'jobs': [
+            {'id': 1, 'title': 'Django Developer', 'company': 'ACME'},
+            {'id': 2, 'title': 'Embedded C++ Engineer', 'company': 'ADP'},
+            {'id': 3, 'title': 'Cashier', 'company': 'Initech'},
+        ],
+    }
+
+    def setUp(self):
+        self.profile = matching.Profile(self.resume)
+
+    def test_match_skill_list(self):
+        """Testea puntuar las habilidades por competencia"""
+        result = self.profile.match([['django', 'Python', 'Rust']])[0]
+
+        names = [skill['name'] for skill in result['skills']]
+        self.assertEqual(names, ['Python', 'Django'])
+        self.assertEqual(result['skills'][0]['score'], 1.0)
+        self.assertEqual(result['jobs'][0]['id'], 1)
+
+    def test_match_text_respects_symbols(self):
+        """Testea que C++ en el texto no cuente como C"""
+        result = self.profile.match(['Senior C++ engineer wanted'])[0]
+
+        names = [skill['name'] for skill in result['skills']]
+        self.assertEqual(names, ['C++'])
+        self.assertEqual(result['jobs'][0]['id'], 2)
+        self.assertNotIn(3, [job['id'] for job in result['jobs']])
+
+    def test_match_many_targets(self):
+        """Testea puntuar varios avisos a la vez"""
+        results = self.profile.match(
+            ['python backend', 'C developer', 'gardener'],
+            top_k=1
+        )
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]['skills'][0]['name'], 'Python')
+        self.assertEqual(results[1]['skills'][0]['name'], 'C')
+        self.assertEqual(results[2], {'skills': [], 'jobs': []})
+
+    def test_match_empty_resume(self):
+        """Testea puntuar un curriculum vacio"""
+        profile = matching.Profile({'skills': [], 'jobs': []})
+
+        self.assertEqual(
+            profile.match(['python']), [{'skills': [], 'jobs': []}]
+        )
+
+
+class MatchApiTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        python = models.Skill.objects.create_skill(name='Python')
+        go = models.Skill.objects.create_skill(name='Go')
+        self.user.add_skills([
+            {'skill': python, 'proficiency': 5},
+            {'skill': go, 'proficiency': 3},
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_match_successful(self):
+        """Testea elegir el contenido del curriculum para un aviso"""
+        payload = {'text': 'We need Go and Kubernetes', 'top_k': 3}
+
+        res = self.client.post(MATCH_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        names = [skill['name'] for skill in res.data['skills']]
+        self.assertEqual(names, ['Go'])
+
+    def test_match_empty_target_fail(self):
+        """Testea que se requiera un aviso"""
+        res = self.client.post(MATCH_URL, {}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_match_many_postings(self):
+        """Testea puntuar varios avisos en una peticion"""
+        payload = {'postings': [
+            {'text': 'We need Go and Kubernetes'},
+            {'skills': ['Python']},
+        ]}
+
+        res = self.client.post(MATCH_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [[skill['name'] for skill in item['skills']] for item in res.data],
+            [['Go'], ['Python']]
+        )
+
+    @override_settings(RESUME_MATCH_MAX_POSTINGS=2)
+    def test_match_invalid_postings_fail(self):
+        """Testea rechazar avisos vacios, de mas o mezclados con uno solo"""
+        payloads = [
+            {'postings': []},
+            {'postings': [{'skills': ['Go']}] * 3},
+            {'postings': [{'text': ''}]},
+            {'postings': [{'skills': ['Go']}], 'text': 'Python'},
+        ]
+
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                res = self.client.post(MATCH_URL, payload, format='json')
+
+                self.assertEqual(
+                    res.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+
+class TimelineTests(CacheMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+
+    def test_merge_intervals(self):
+        """Testea unir intervalos superpuestos y contiguos"""
+        intervals = [
+            (date(2019, 1, 1), date(2019, 6, 30)),
+            (date(2018, 1, 1), date(2018, 12, 31)),
+            (date(2018, 6, 1), date(2018, 8, 31)),
+            (date(2020, 1, 1), date(2020, 3, 31)),
+        ]
+
+        merged = timeline.merge_intervals(intervals)
+
+        self.assertEqual(merged, [
+            (date(2018, 1, 1), date(2019, 6, 30)),
+            (date(2020, 1, 1), date(2020, 3, 31)),
+        ])
+
+    def test_build_timeline(self):
+        """Testea calcular la experiencia total, los huecos y las empresas"""
+        jobs = [
+            ('ADP', date(2018, 1, 1), date(2018, 12, 31)),
+            ('ACME', date(2018, 7, 1), date(2019, 6, 30)),
+            ('ACME', date(2020, 1, 1), None),
+        ]
+
+        result = timeline.build_timeline(jobs, today=date(2020, 12, 31))
+
+        self.assertEqual(result['total_days'], 546 + 366)
+        self.assertEqual(result['total_years'], 2.5)
+        self.assertEqual(result['gaps'], [
+            {'start': '2019-07-01', 'end': '2019-12-31', 'days': 184},
+        ])
+        self.assertEqual(result['companies'][0]['company'], 'ACME')
+        self.assertEqual(result['companies'][0]['days'], 365 + 366)
+
+    def test_get_timeline_cached(self):
+        """Testea que la linea de tiempo se cachee por usuario"""
+        self.user.add_job(
+            company='ADP', start_date='2018-01-01', end_date='2018-12-31'
+        )
+        timeline.get_timeline(self.user)
+
+        with self.assertNumQueries(0):
+            result = timeline.get_timeline(self.user)
+
+        self.assertEqual(result['total_days'], 365)
+
+    def test_get_timeline_invalidated(self):
+        """Testea que cambiar los trabajos invalide la linea de tiempo"""
+        job = self.user.add_job(
+            company='ADP', start_date='2018-01-01', end_date='2018-12-31'
+        )
+        timeline.get_timeline(self.user)
+
+        self.user.add_jobs([{
+            'company': 'ACME',
+            'start_date': '2019-01-01',
+            'end_date': '2019-01-31'
+        }])
+        self.assertEqual(timeline.get_timeline(self.user)['total_days'], 396)
+
+        job.delete()
+        self.assertEqual(timeline.get_timeline(self.user)['total_days'], 31)
+
+    def test_get_timeline_invalidated_while_building(self):
+        """Testea que una lectura vieja no pise una invalidacion"""
+        self.user.add_job(
+            company='ADP', start_date='2018-01-01', end_date='2018-12-31'
+        )
+        build_timeline = timeline.build_timeline
+
+        def build_then_change(jobs, today):
+            # Otra peticion cambia los trabajos despues de la consulta
+            result = build_timeline(jobs, today)
+            self.user.add_job(
+                company='ACME', start_date='2019-01-01', end_date='2019-01-31'
+            )
+            return result
+
+        with patch('resumes.timeline.build_timeline', build_then_change):
+            result = timeline.get_timeline(self.user)
+
+        self.assertEqual(result['total_days'], 365)
+
+        self.assertEqual(timeline.get_timeline(self.user)['total_days'], 396)
+
+
+def docx_document(paragraphs):
+    """Arma un DOCX minimo con un parrafo por elemento"""
+    namespace = parsers.WORD_NS[1:-1]
+    body = ''.join(
+        '<w:p><w:r><w:t>{}</w:t></w:r></w:p>'.format(paragraph)
+        for paragraph in paragraphs
+    )
+    out = BytesIO()
+    with zipfile.ZipFile(out, 'w') as archive:
+        archive.writestr(
+            'word/document.xml',
+            '<w:document xmlns:w="{}"><w:body>{}</w:body></w:document>'.format(
+                namespace, body
+            )
+        )
+
+    return out.getvalue()
+
+
+class AutomatonTests(TestCase):
+
+    def test_find_word_boundaries(self):
+        """Testea que solo se encuentren palabras completas"""
+        automaton = Automaton([('C', 1), ('C++', 2), ('Go', 3)])
+
+        matches = automaton.find('Cats, C++ and go. Google C')
+
+        self.assertEqual([value for _, _, value in matches], [2, 3, 1])
+
+    def test_find_longest(self):
+        """Testea que gane el nombre mas largo entre los superpuestos"""
+        automaton = IncrementalAutomaton([
+            ('Machine Learning', 1), ('Learning', 2)
+        ])
+
+        matches = automaton.find('machine learning and learning')
+
+        self.assertEqual([value for _, _, value in matches], [1, 2])
+
+    def test_add_incremental(self):
+        """Testea agregar nombres sin rearmar el automata principal"""
+        automaton = IncrementalAutomaton([('Python', 1)], min_merge=2)
+        main = automaton.main
+
+        self.assertFalse(automaton.add([('Django', 2)]))
+        self.assertIs(automaton.main, main)
+        self.assertEqual(
+            [value for _, _, value in automaton.find('Python, Django')],
+            [1, 2]
+        )
+
+        self.assertTrue(automaton.add([('Go', 3), ('Rust', 4)]))
+        self.assertEqual(len(automaton.delta), 0)
+        self.assertEqual(len(automaton), 4)
+        self.assertEqual(
+            [value for _, _, value in automaton.find('Rust, Go, Django')],
+            [4, 3, 2]
+        )
+
+
+class ParserTests(TestCase):
+
+    def test_pdf_round_trip(self):
+        """Testea leer el texto de un PDF generado por el renderer"""
+        lines = ['Engineer at ACME (Python)', 'Jan 2018 - Present']
+
+        self.assertEqual(
+            pdf.extract_text(pdf.text_document(lines)), '\n'.join(lines)
+        )
+
+    def test_pdf_compression_bomb(self):
+        """Testea no descomprimir un stream de mas del limite"""
+        stream = zlib.compress(b'BT (a) Tj ET' + b' ' * 10000)
+        data = (
+            b'%PDF-1.4\n1 0 obj\n<< /Filter /FlateDecode >>\nstream\n' +
+            stream + b'\nendstream\nendobj\n'
+        )
+
+        self.assertEqual(pdf.extract_text(data), 'a')
+        with self.assertRaises(pdf.TooLarge):
+            pdf.extract_text(data, max_length=1000)
+        with override_settings(RESUME_MAX_TEXT_LENGTH=1000):
+            with self.assertRaises(parsers.ParseError):
+                parsers.parse(data, 'pdf')
+
+    def test_pdf_without_streams_linear(self):
+        """Testea que los objetos sin stream no se revisen una y otra vez"""
+        data = b'%PDF-1.4\n' + b'1 0 obj ' * 40000 + b'stream\n' * 40000
+
+        start = time.perf_counter()
+        self.assertEqual(pdf.extract_text(data), '')
+        self.assertLess(time.perf_counter() - start, 1)
+
+    def test_detect_format(self):
+        """Testea reconocer el formato por el contenido"""
+        self.assertEqual(
+            parsers.detect_format('cv.bin', pdf.text_document(['a'])), 'pdf'
+        )
+        self.assertEqual(
+            parsers.detect_format('cv.bin', docx_document(['a'])), 'docx'
+        )
+        self.assertEqual(parsers.detect_format('cv.json', b'{}'), 'linkedin')
+        self.assertIsNone(parsers.detect_format('cv.txt', b'hello'))
+
+    def test_extract_jobs(self):
+        """Testea encontrar trabajos por sus rangos de fechas"""
+        text = '\n'.join([
+            'Backend Developer at ACME  Mar 2018 - Present',
+            'Globex | Engineer',
+            '06/2015 - 2017',
+            'Education 2010',
+        ])
+
+        jobs = parsers.extract_jobs(text)
+
+        self.assertEqual(jobs, [
+            {
+                'title': 'Backend Developer',
+                'company': 'ACME',
+                'start_date': '2018-03-01',
+                'end_date': None,
+                'present_day': True,
+            },
+            {
+                'title': 'Globex',
+                'company': 'Engineer',
+                'start_date': '2015-06-01',
+                'end_date': '2017-12-01',
+                'present_day': False,
+            },
+        ])
+
+    def test_docx(self):
+        """Testea leer los trabajos de un DOCX"""
+        data = docx_document([
+            'Ingeniera en Initech', 'marzo de 2016 - diciembre de 2019'
+        ])
+
+        text, jobs = parsers.parse(data, 'docx')
+
+        self.assertEqual(jobs[0]['company'], 'Initech')
+        self.assertEqual(jobs[0]['start_date'], '2016-03-01')
+        self.assertEqual(jobs[0]['end_date'], '2019-12-01')
+
+    @override_settings(RESUME_MAX_TEXT_LENGTH=1000)
+    def test_docx_too_large(self):
+        """Testea no descomprimir un DOCX de mas del limite"""
+        data = docx_document(['Python ' * 200])
+
+        with self.assertRaises(parsers.ParseError):
+            parsers.parse(data, 'docx')
+
+    @override_settings(RESUME_MAX_TEXT_LENGTH=1000)
+    def test_text_too_long(self):
+        """Testea el limite de caracteres del texto leido"""
+        data = json.dumps({'summary': 'Python ' * 200}).encode()
+
+        with self.assertRaises(parsers.ParseError):
+            parsers.parse(data, 'linkedin')
+
+    def test_linkedin_invalid_date(self):
+        """Testea que una fecha invalida sea un error de lectura"""
+        data = json.dumps({'positions': [{
+            'company': 'ACME',
+            'startDate': {'year': 2020, 'month': 13},
+        }]}).encode()
+
+        with self.assertRaises(parsers.ParseError):
+            parsers.parse(data, 'linkedin')
+
+    def test_linkedin_inverted_range(self):
+        """Testea descartar un trabajo que termina antes de empezar"""
+        data = json.dumps({'positions': [{
+            'company': 'ACME',
+            'startDate': {'year': 2020, 'month': 5},
+            'endDate': {'year': 2019, 'month': 1},
+        }]}).encode()
+
+        text, jobs = parsers.parse(data, 'linkedin')
+
+        self.assertEqual(jobs, [])
+
+    def test_linkedin(self):
+        """Testea leer los trabajos y habilidades del JSON de LinkedIn"""
+        data = json.dumps({
+            'headline': 'Data engineer',
+            'positions': {'values': [{
+                'title': 'Engineer',
+                'company': {'name': 'ACME'},
+                'startDate': {'year': 2019, 'month': 4},
+                'isCurrent': True,
+            }]},
+            'skills': ['Python', {'skill': {'name': 'SQL'}}],
+        }).encode()
+
+        text, jobs = parsers.parse(data, 'linkedin')
+
+        self.assertIn('Python\nSQL', text)
+        self.assertEqual(jobs, [{
+            'title': 'Engineer',
+            'company': 'ACME',
+            'start_date': '2019-04-01',
+            'end_date': None,
+            'present_day': True,
+        }])
+
+
+class IngestTests(CacheMixin, TestCase):
+
+    def setUp(self):
+        # La version del catalogo vive en el cache
+        super().setUp()
+        self.python = models.Skill.objects.create(name='Python')
+        self.matcher = ingest.SkillMatcher()
+
+    def test_match_counts_mentions(self):
+        """Testea contar las menciones de cada habilidad"""
+        models.Skill.objects.create(name='C++')
+
+        mentions, names = self.matcher.match('Python, C++ and python')
+
+        self.assertEqual(mentions, {
+            self.python.id: 2,
+            models.Skill.objects.get(name='C++').id: 1,
+        })
+
+    def test_match_new_skills_incremental(self):
+        """Testea que las habilidades nuevas se agreguen sin rearmar"""
+        self.matcher.match('')
+        main = self.matcher.automaton.main
+        django = models.Skill.objects.create(name='Django')
+
+        mentions, _ = self.matcher.match('Django')
+
+        self.assertIs(self.matcher.automaton.main, main)
+        self.assertEqual(mentions, {django.id: 1})
+
+    def test_match_skill_committed_out_of_order(self):
+        """Testea encontrar una habilidad confirmada con un id menor"""
+        gap_id = models.Skill.objects.create(name='Gap').id
+        go = models.Skill.objects.create(name='Go')
+        models.Skill.objects.filter(id=gap_id).delete()
+        self.matcher.match('')
+        self.assertEqual(self.matcher.max_id, go.id)
+        # Se confirma despues que Go aunque tomo su id antes
+        django = models.Skill.objects.create(id=gap_id, name='Django')
+
+        mentions, _ = self.matcher.match('Django')
+
+        self.assertEqual(mentions, {django.id: 1})
+
+    def test_match_rename_rebuilds(self):
+        """Testea que renombrar una habilidad rearme el automata"""
+        self.matcher.match('')
+        self.python.name = 'Python 3'
+        self.python.save()
+
+        self.assertEqual(self.matcher.match('Python')[0], {})
+        self.assertEqual(
+            self.matcher.match('Python 3')[0], {self.python.id: 1}
+        )
+
+    def test_match_unchanged_no_queries(self):
+        """Testea que sin cambios en el catalogo no se consulte la base"""
+        self.matcher.match('')
+
+        with self.assertNumQueries(0):
+            self.matcher.match('Python')
+
+
+class ImportApiTests(CacheMixin, MediaRootMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.python = models.Skill.objects.create(name='Python')
+
+    def upload(self, data, name='cv.pdf', **extra):
+        resume = BytesIO(data)
+        resume.name = name
+
+        return self.client.post(
+            IMPORT_URL, dict(file=resume, **extra), format='multipart'
+        )
+
+    def test_import_resume(self):
+        """Testea importar los trabajos y habilidades de un PDF"""
+        res = self.upload(pdf.text_document([
+            'Engineer at ACME', 'Jan 2018 - Present', 'Python, Python'
+        ]))
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data['kind'], 'parse_resume')
+
+        call_command('run_workers', workers=1, once=True, stdout=StringIO())
+        res = self.client.get(task_url(res.data['id']))
+
+        self.assertEqual(res.data['status'], models.Task.DONE)
+        self.assertEqual(
+            res.data['result']['created'], {'jobs': 1, 'skills': 1}
+        )
+        job = self.user.jobs.get()
+        self.assertEqual(job.company, 'ACME')
+        self.assertTrue(job.present_day)
+        self.assertEqual(
+            models.UserSkill.objects.get(user=self.user).proficiency, 2
+        )
+        self.assertEqual(default_storage.listdir('Imports'), ([], []))
+
+    def test_import_keeps_upload_while_parsing(self):
+        """Testea que el archivo siga subido hasta que la tarea termine"""
+        self.upload(pdf.text_document(['Python']))
+        path = json.loads(models.Task.objects.get().params)['path']
+
+        def parse(data, input_format):
+            # Si el worker muere aqui, la tarea reencolada necesita el archivo
+            self.assertTrue(default_storage.exists(path))
+            raise parsers.ParseError('The file could not be parsed')
+
+        with patch('resumes.ingest.parse', side_effect=parse), \
+                self.assertLogs('core.tasks', 'ERROR'):
+            call_command(
+                'run_workers', workers=1, once=True, stdout=StringIO()
+            )
+
+        task = models.Task.objects.get()
+        self.assertEqual(task.status, models.Task.FAILED)
+        self.assertEqual(task.error, 'The file could not be parsed')
+        self.assertFalse(default_storage.exists(path))
+
+    def test_import_resume_twice(self):
+        """Testea que importar de nuevo no duplique trabajos ni habilidades"""
+        data = pdf.text_document(['ACME', '2018 - 2019', 'Python'])
+        result = ingest.parse(data, 'pdf')
+
+        self.assertEqual(
+            ingest.save(self.user, result), {'jobs': 1, 'skills': 1}
+        )
+        self.assertEqual(
+            ingest.save(self.user, result), {'jobs': 0, 'skills': 0}
+        )
+
+    def test_import_preview(self):
+        """Testea importar sin guardar nada en el perfil"""
+        self.upload(docx_document(['Python']), name='cv.docx', save=False)
+
+        call_command('run_workers', workers=1, once=True, stdout=StringIO())
+        task = models.Task.objects.get()
+
+        self.assertEqual(task.status, models.Task.DONE)
+        self.assertEqual(
+            json.loads(task.result)['skills'][0]['name'], 'Python'
+        )
+        self.assertFalse(models.UserSkill.objects.exists())
+
+    def test_import_unknown_format_fail(self):
+        """Testea que no se encole un archivo de formato desconocido"""
+        res = self.upload(b'plain text', name='cv.txt')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(models.Task.objects.exists())
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from core import models
+
+
+CACHE_KEY = 'resumes:timeline:{}:{}'
+GENERATION_KEY = 'resumes:timeline:generation:{}'
+# La linea de tiempo solo vale para el dia en que se armo
+CACHE_TIMEOUT = 24 * 60 * 60
+DAYS_PER_YEAR = 365.25
+
+
+def generation(user_id):
+    """Retorna la generacion actual de la linea de tiempo del usuario"""
+    key = GENERATION_KEY.format(user_id)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, uuid4().hex, None)
+        value = cache.get(key)
+
+    return value
+
+
+def cache_key(user_id, generation):
+    return CACHE_KEY.format(user_id, generation)
+
+
+def merge_intervals(intervals):
+    """Une los intervalos (inicio, fin) que se superponen o se tocan
+
+    Las fechas son inclusivas. O(n log n) por el ordenamiento.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    return [(start, end) for start, end in merged]
+
+
+def days(intervals):
+    return sum((end - start).days + 1 for start, end in intervals)
+
+
+def years(total_days):
+    return round(total_days / DAYS_PER_YEAR, 1)
+
+
+def build_timeline(jobs, today):
+    """Arma la linea de tiempo de una lista de (empresa, inicio, fin)
+
+    Un fin None significa que el trabajo sigue hasta hoy.
+    """
+    intervals = []
+    by_company = {}
+    for company, start, end in jobs:
+        end = min(end or today, today)
+        if end < start:
+            continue
+        intervals.append((start, end))
+        by_company.setdefault(company, []).append((start, end))
+
+    periods = merge_intervals(intervals)
+    gaps = [
+        (previous[1] + timedelta(days=1), following[0] - timedelta(days=1))
+        for previous, following in zip(periods, periods[1:])
+    ]
+    companies = sorted(
+        (
+            (company, days(merge_intervals(company_intervals)))
+            for company, company_intervals in by_company.items()
+        ),
+        key=lambda item: (-item[1], item[0])
+    )
+    total_days = days(periods)
+
+    return {
+        'as_of': today.isoformat(),
+        'total_days': total_days,
+        'total_years': years(total_days),
+        'periods': [
+            {'start': start.isoformat(), 'end': end.isoformat()}
+            for start, end in periods
+        ],
+        'gaps': [
+            {
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'days': (end - start).days + 1,
+            }
+            for start, end in gaps
+        ],
+        'companies': [
+            {'company': company, 'days': total, 'years': years(total)}
+            for company, total in companies
+        ],
+    }
+
+
+def get_timeline(user):
+    """Retorna la linea de tiempo del usuario, cacheada hasta que cambie
+
+    Los trabajos actuales crecen cada dia, asi que el cache solo vale para
+    la fecha con la que se armo. La clave lleva la generacion leida antes
+    de consultar los trabajos: si se invalida durante el armado, la linea
+    de tiempo vieja queda guardada bajo una generacion que ya nadie lee.
+    """
+    today = timezone.localdate()
+    key = cache_key(user.pk, generation(user.pk))
+    cached = cache.get(key)
+    if cached is not None and cached['as_of'] == today.isoformat():
+        return cached
+
+    jobs = [
+        (company, start, None if present_day else end)
+        for company, start, end, present_day in models.Job.objects.filter(
+            user_id=user.pk
+        ).values_list('company', 'start_date', 'end_date', 'present_day')
+    ]
+    timeline = build_timeline(jobs, today)
+    cache.set(key, timeline, CACHE_TIMEOUT)
+
+    return timeline
+
+
+def invalidate_timeline(user_id):
+    cache.set(GENERATION_KEY.format(user_id), uuid4().hex, None)
@@ -0,0 +1,27 @@
+from django.urls import path
+
+from resumes import views
+
+
+app_name = 'resumes'
+
+urlpatterns = [
+    path(
+        'render/<str:output_format>/',
+        views.RenderResumeView.as_view(),
+        name='render'
+    ),
+    path('match/', views.MatchResumeView.as_view(), name='match'),
+    path(
+        'generate/',
+        views.GenerateResumeView.as_view(),
+        name='generate'
+    ),
+    path('import/', views.ImportResumeView.as_view(), name='import'),
+    path(
+        'portfolio/',
+        views.PortfolioView.as_view(),
+        name='portfolio'
+    ),
+    path('tasks/<uuid:pk>/', views.TaskView.as_view(), name='task'),
+]
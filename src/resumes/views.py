@@ -0,0 +1,163 @@
+import os
+
+from uuid import uuid4
+
+from django.core.files.storage import default_storage
+from django.http import FileResponse
+from django.http import HttpResponseNotModified
+
+from rest_framework import exceptions
+from rest_framework import generics
+from rest_framework import permissions
+from rest_framework import status
+from rest_framework.response import Response
+
+from core import tasks
+
+from resumes import builder
+from resumes import matching
+from resumes import parsers
+from resumes import portfolio
+from resumes import renderers
+from resumes import serializers
+
+
+class RenderResumeView(generics.GenericAPIView):
+    """Descarga el curriculum del usuario renderizado en HTML o PDF"""
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request, output_format, *args, **kwargs):
+        template_name = request.query_params.get('template', 'classic')
+        data = builder.get_resume(request.user)
+        try:
+            path = renderers.render(data, template_name, output_format)
+        except ValueError as e:
+            raise exceptions.NotFound(str(e))
+
+        etag = '"{}"'.format(os.path.splitext(os.path.basename(path))[0])
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            return HttpResponseNotModified()
+
+        response = FileResponse(
+            default_storage.open(path),
+            content_type=renderers.CONTENT_TYPES[output_format]
+        )
+        response['ETag'] = etag
+
+        return response
+
+
+class MatchResumeView(generics.GenericAPIView):
+    """Elige las habilidades y trabajos mas relevantes para los avisos
+
+    Con postings retorna una lista de resultados en el mismo orden.
+    """
+    serializer_class = serializers.MatchSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def target(self, posting):
+        target = posting.get('skills', [])
+        text = posting.get('text')
+        if text:
+            target = [text] + target
+
+        return target
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        postings = serializer.validated_data.get('postings')
+        if postings is None:
+            targets = [self.target(serializer.validated_data)]
+        else:
+            targets = [self.target(posting) for posting in postings]
+
+        profile = matching.Profile(builder.get_resume(request.user))
+        result = profile.match(
+            targets,
+            top_k=serializer.validated_data['top_k']
+        )
+
+        return Response(result if postings is not None else result[0])
+
+
+class GenerateResumeView(generics.GenericAPIView):
+    """Encola el render del curriculum y retorna la tarea"""
+    serializer_class = serializers.GenerateResumeSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task = tasks.enqueue(
+            'render_resume',
+            user=request.user,
+            **serializer.validated_data
+        )
+        data = serializers.TaskSerializer(task).data
+
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
+class ImportResumeView(generics.GenericAPIView):
+    """Encola la importacion de un curriculum subido y retorna la tarea"""
+    serializer_class = serializers.ImportResumeSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        input_format = serializer.validated_data['input_format']
+        # Los workers leen el archivo desde el storage
+        path = default_storage.save(
+            'Imports/{}.{}'.format(
+                uuid4().hex, parsers.EXTENSIONS[input_format]
+            ),
+            serializer.validated_data['file']
+        )
+        task = tasks.enqueue(
+            'parse_resume',
+            user=request.user,
+            path=path,
+            input_format=input_format,
+            save=serializer.validated_data['save']
+        )
+        data = serializers.TaskSerializer(task).data
+
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
+class PortfolioView(generics.GenericAPIView):
+    """Descarga o encola el portafolio estatico del usuario en un zip"""
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        path = portfolio.build_portfolio(request.user)['zip']
+        etag = '"{}"'.format(os.path.splitext(os.path.basename(path))[0])
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            return HttpResponseNotModified()
+
+        response = FileResponse(
+            default_storage.open(path),
+            as_attachment=True,
+            filename='portfolio.zip',
+            content_type='application/zip'
+        )
+        response['ETag'] = etag
+
+        return response
+
+    def post(self, request, *args, **kwargs):
+        task = tasks.enqueue('build_portfolio', user=request.user)
+        data = serializers.TaskSerializer(task).data
+
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
+class TaskView(generics.RetrieveAPIView):
+    """Consulta el estado de una tarea del usuario"""
+    serializer_class = serializers.TaskSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.request.user.tasks.all()
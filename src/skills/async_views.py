@@ -0,0 +1,55 @@
+from django.utils.http import http_date
+from django.utils.http import parse_http_date_safe
+
+from core import aio
+from core import catalog
+
+from skills.views import wants_stream
+
+
+def not_modified(request, etag, modified):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags or 'W/' + etag in tags
+
+    since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE') or ''
+    )
+
+    return since is not None and modified <= since
+
+
+def cached_page(request):
+    """Retorna la version del catalogo y la pagina cacheada, si existe"""
+    version, modified = catalog.catalog_version()
+    key = catalog.cache_key(version, request.build_absolute_uri())
+
+    return version, modified, catalog.get_cache().get(key)
+
+
+async def list_skills(request):
+    """Version async de ListSkillsView para paginas ya cacheadas
+
+    Las paginas que no estan en el cache y el modo stream siguen por la
+    vista DRF, que las guarda en el cache.
+    """
+    if wants_stream(request.GET):
+        return None
+    user = await aio.authenticate(request)
+    if user is None:
+        return None
+
+    version, modified, data = await aio.run_sync(cached_page, request)
+    etag = '"{}"'.format(version)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(modified),
+        'Allow': 'GET, HEAD, OPTIONS',
+    }
+    if not_modified(request, etag, modified):
+        return aio.Response(status=304, headers=headers)
+    if data is None:
+        return None
+
+    return aio.Response(data, headers=headers)
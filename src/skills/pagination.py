@@ -0,0 +1,9 @@
+from rest_framework import pagination
+
+
+class SkillCursorPagination(pagination.CursorPagination):
+    """Paginacion por cursor (keyset) sobre el nombre de la habilidad"""
+    ordering = 'name'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
@@ -0,0 +1,81 @@
+from django.db import connection
+from django.db.models import Q
+
+from core import models
+
+
+MIN_SIMILARITY = 0.3
+
+
+def trigrams(text):
+    """Retorna los trigramas de un texto, igual que pg_trgm"""
+    grams = set()
+    for word in text.lower().split():
+        padded = '  {} '.format(word)
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+
+    return grams
+
+
+def similarity(left, right):
+    """Similitud de trigramas entre dos conjuntos, igual que pg_trgm"""
+    if not left or not right:
+        return 0.0
+
+    return len(left & right) / len(left | right)
+
+
+def search_skills(query, limit=20):
+    """Busca habilidades por prefijo y luego por similitud de trigramas"""
+    query = query.strip()
+    if not query:
+        return []
+
+    if connection.vendor == 'postgresql':
+        return _search_indexed(query, limit)
+
+    return _search_in_process(query, limit)
+
+
+def _search_indexed(query, limit):
+    # Ambas consultas usan los indices GIN creados en la migracion 0007
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    skills = list(
+        models.Skill.objects.filter(name__istartswith=query)[:limit]
+    )
+    if len(skills) < limit:
+        fuzzy = models.Skill.objects.filter(
+            Q(name__trigram_similar=query) & ~Q(name__istartswith=query)
+        ).annotate(
+            similarity=TrigramSimilarity('name', query)
+        ).order_by('-similarity', 'name')
+        skills += list(fuzzy[:limit - len(skills)])
+
+    return skills
+
+
+def _search_in_process(query, limit):
+    # Alternativa para bases de datos sin pg_trgm (ej. SQLite en los tests)
+    prefix = query.lower()
+    query_grams = trigrams(query)
+    matches = []
+    rows = models.Skill.objects.values_list('id', 'name').iterator()
+    for skill_id, name in rows:
+        # Los prefijos van primero, luego los mas similares
+        if name.lower().startswith(prefix):
+            rank = (0, 0.0)
+        else:
+            score = similarity(query_grams, trigrams(name))
+            if score < MIN_SIMILARITY:
+                continue
+            rank = (1, -score)
+        matches.append((rank, name, skill_id))
+
+    matches.sort()
+
+    return [
+        models.Skill(id=skill_id, name=name)
+        for _, name, skill_id in matches[:limit]
+    ]
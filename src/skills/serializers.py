@@ -1,9 +1,13 @@
 from rest_framework import serializers
 
+from core import metrics
 from core import models
 
 
-class SkillSerializer(serializers.ModelSerializer):
+class SkillSerializer(
+    metrics.TimedSerializerMixin,
+    serializers.ModelSerializer
+):
     """Serializer para el modelo Skill"""
 
     class Meta:
@@ -18,3 +22,20 @@ class SkillSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Crea un nuevo usuario y lo retorna"""
         return self.Meta.model.objects.create_skill(**validated_data)
+
+
+class BulkSkillSerializer(serializers.Serializer):
+    """Serializer para crear varias habilidades a la vez"""
+    names = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        max_length=10000
+    )
+
+    def create(self, validated_data):
+        """Crea las habilidades que no existan y retorna la cantidad"""
+        count = models.Skill.objects.bulk_create_skills(
+            validated_data.get('names')
+        )
+
+        return {'count': count}
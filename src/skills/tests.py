@@ -1,3 +1,5 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
@@ -6,10 +8,15 @@ from rest_framework.test import APIClient
 from rest_framework import status
 
 from core import models
+from core import routers
+from core.testing import CacheMixin
+from core.testing import QueryBudgetMixin
 
 
 CREATE_SKILL_URL = reverse('skills:create')
+BULK_SKILLS_URL = reverse('skills:bulk')
 LIST_SKILLS_URL = reverse('skills:list')
+SEARCH_SKILLS_URL = reverse('skills:search')
 
 
 def create_skill(name):
@@ -35,13 +42,14 @@ class PublicTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
 
-class PrivateTests(TestCase):
+class PrivateTests(CacheMixin, TestCase):
     """Testea el API de habilidades (privado)"""
     payload = {
         'name': 'C++'
     }
 
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
         self.admin = get_user_model().objects.create_superuser(
             email='admin@test.com',
@@ -55,6 +63,13 @@ class PrivateTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
+    def test_create_skill_pins_admin(self):
+        """Testea que quien crea una habilidad lea luego del primario"""
+        res = self.client.post(CREATE_SKILL_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(routers.is_pinned(self.admin))
+
     def test_non_admin_create_skill_fail(self):
         """Testea que un no administrador no pueda crear un skill"""
         user = get_user_model().objects.create_user(
@@ -66,6 +81,32 @@ class PrivateTests(TestCase):
         res = self.client.post(CREATE_SKILL_URL, self.payload)
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_bulk_create_skills_successful(self):
+        """Testea la creacion de varias habilidades ignorando duplicados"""
+        create_skill('Python')
+        payload = {'names': ['Python', 'Django', 'Go', 'Django']}
+
+        res = self.client.post(BULK_SKILLS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['count'], 2)
+        names = models.Skill.objects.values_list('name', flat=True)
+        self.assertEqual(list(names), ['Django', 'Go', 'Python'])
+
+    def test_non_admin_bulk_create_skills_fail(self):
+        """Testea que un no administrador no pueda crear skills en lote"""
+        user = get_user_model().objects.create_user(
+            email='test@test.com',
+            password='123456'
+        )
+        self.client.force_authenticate(user=user)
+
+        res = self.client.post(
+            BULK_SKILLS_URL, {'names': ['Go']}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_list_skills_successful(self):
         """Testea que se puedan listar las habilidades creadas"""
         skills = ['C++', 'Python', 'Java', 'HTML']
@@ -75,7 +116,157 @@ class PrivateTests(TestCase):
         res = self.client.get(LIST_SKILLS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data[0].get('name'), skills[0])
-        self.assertEqual(res.data[1].get('name'), skills[3])
-        self.assertEqual(res.data[2].get('name'), skills[2])
-        self.assertEqual(res.data[3].get('name'), skills[1])
+        results = res.data.get('results')
+        self.assertEqual(results[0].get('name'), skills[0])
+        self.assertEqual(results[1].get('name'), skills[3])
+        self.assertEqual(results[2].get('name'), skills[2])
+        self.assertEqual(results[3].get('name'), skills[1])
+
+    def test_list_skills_cursor_pagination(self):
+        """Testea que el listado se pagine por cursor sobre el nombre"""
+        skills = ['C++', 'Python', 'Java', 'HTML']
+        for skill in skills:
+            create_skill(skill)
+
+        res = self.client.get(LIST_SKILLS_URL, {'page_size': 3})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data.get('results')), 3)
+        self.assertIsNone(res.data.get('previous'))
+
+        res = self.client.get(res.data.get('next'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        names = [skill.get('name') for skill in res.data.get('results')]
+        self.assertEqual(names, ['Python'])
+        self.assertIsNone(res.data.get('next'))
+
+    def test_list_skills_cached(self):
+        """Testea que el catalogo se sirva desde el cache"""
+        create_skill('Python')
+        self.client.get(LIST_SKILLS_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(LIST_SKILLS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0].get('name'), 'Python')
+
+    def test_list_skills_not_modified(self):
+        """Testea que un catalogo sin cambios retorne 304"""
+        create_skill('Python')
+        res = self.client.get(LIST_SKILLS_URL)
+        etag = res['ETag']
+        self.assertIn('Last-Modified', res)
+
+        res = self.client.get(LIST_SKILLS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_skills_invalidated_on_create(self):
+        """Testea que crear una habilidad invalide el catalogo cacheado"""
+        create_skill('Python')
+        res = self.client.get(LIST_SKILLS_URL)
+        etag = res['ETag']
+
+        self.client.post(CREATE_SKILL_URL, self.payload)
+        res = self.client.get(LIST_SKILLS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_list_skills_invalidated_on_bulk_create(self):
+        """Testea que la creacion en lote invalide el catalogo cacheado"""
+        self.client.get(LIST_SKILLS_URL)
+
+        models.Skill.objects.bulk_create_skills(['Go', 'Rust'])
+        res = self.client.get(LIST_SKILLS_URL)
+
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_list_skills_stream(self):
+        """Testea que el catalogo se pueda obtener como NDJSON"""
+        skills = ['C++', 'Python', 'Java', 'HTML']
+        for skill in skills:
+            create_skill(skill)
+
+        res = self.client.get(LIST_SKILLS_URL, {'stream': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(res.streaming_content).decode().splitlines()
+        names = [json.loads(line).get('name') for line in lines]
+        self.assertEqual(names, sorted(skills))
+
+    def test_list_skills_stream_false(self):
+        """Testea que stream=0 o stream=false retornen la pagina normal"""
+        create_skill('Python')
+
+        for value in ('0', 'false', 'False', ''):
+            with self.subTest(stream=value):
+                res = self.client.get(LIST_SKILLS_URL, {'stream': value})
+
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertEqual(res.data['results'][0]['name'], 'Python')
+
+        res = self.client.get(LIST_SKILLS_URL, {'stream': 'true'})
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+
+    def test_search_skills_prefix(self):
+        """Testea que la busqueda retorne primero los prefijos"""
+        skills = ['Java', 'JavaScript', 'Python', 'Jakarta EE']
+        for skill in skills:
+            create_skill(skill)
+
+        res = self.client.get(SEARCH_SKILLS_URL, {'q': 'jav'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        names = [skill.get('name') for skill in res.data]
+        self.assertEqual(names[:2], ['Java', 'JavaScript'])
+        self.assertNotIn('Python', names)
+
+    def test_search_skills_typo(self):
+        """Testea que la busqueda tolere errores de tipeo"""
+        skills = ['Python', 'Django', 'PostgreSQL']
+        for skill in skills:
+            create_skill(skill)
+
+        res = self.client.get(SEARCH_SKILLS_URL, {'q': 'Pyton'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0].get('name'), 'Python')
+
+    def test_search_skills_empty_query(self):
+        """Testea que una busqueda vacia no retorne resultados"""
+        create_skill('Python')
+
+        res = self.client.get(SEARCH_SKILLS_URL, {'q': ''})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [])
+
+
+class QueryBudgetTests(CacheMixin, QueryBudgetMixin, TestCase):
+    """Testea el numero maximo de consultas de las vistas de habilidades"""
+
+    def setUp(self):
+        super().setUp()
+        models.Skill.objects.bulk_create_skills(
+            'Skill {}'.format(i) for i in range(50)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=get_user_model().objects.create_superuser(
+                email='admin@test.com',
+                password='123456'
+            )
+        )
+
+    def test_view_budgets(self):
+        """Testea que las vistas no hagan consultas por cada fila"""
+        self.assertViewBudgets(self.client, [
+            ('GET', LIST_SKILLS_URL, 1),
+            ('GET', LIST_SKILLS_URL, 0),
+            ('GET', SEARCH_SKILLS_URL + '?q=skill', 1),
+            ('POST', CREATE_SKILL_URL, 2, {'name': 'Go'}),
+        ])
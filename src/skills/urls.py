@@ -7,5 +7,7 @@ app_name = 'skills'
 
 urlpatterns = [
     path('create/', views.CreateSkillView.as_view(), name='create'),
+    path('bulk/', views.BulkCreateSkillsView.as_view(), name='bulk'),
     path('list/', views.ListSkillsView.as_view(), name='list'),
+    path('search/', views.SearchSkillsView.as_view(), name='search'),
 ]
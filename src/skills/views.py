@@ -1,9 +1,31 @@
+import json
+
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
 from rest_framework import generics
 from rest_framework import permissions
+from rest_framework import status
+from rest_framework.response import Response
 
 from skills import serializers
+from skills import pagination
+from skills import search
 
+from core import catalog
 from core import models
+from core import routers
+
+
+STREAM_CHUNK_SIZE = 2000
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 50
+
+
+def wants_stream(params):
+    """Retorna True si se pidio el catalogo como NDJSON con ?stream"""
+    return params.get('stream', '').lower() in ('1', 'true')
 
 
 class CreateSkillView(generics.CreateAPIView):
@@ -14,13 +36,99 @@ class CreateSkillView(generics.CreateAPIView):
         permissions.IsAdminUser
     )
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        routers.pin(self.request.user.pk)
+
+
+class BulkCreateSkillsView(generics.GenericAPIView):
+    """Crea varias habilidades en una sola peticion"""
+    serializer_class = serializers.BulkSkillSerializer
+    permission_classes = (
+        permissions.IsAuthenticated,
+        permissions.IsAdminUser
+    )
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+        routers.pin(request.user.pk)
+
+        return Response(result, status=status.HTTP_201_CREATED)
+
 
-class ListSkillsView(generics.ListAPIView):
+class ListSkillsView(routers.ReplicaReadMixin, generics.ListAPIView):
     """Lista las habidades creadas"""
     serializer_class = serializers.SkillSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = pagination.SkillCursorPagination
 
     def get_queryset(self):
         queryset = models.Skill.objects.all()
 
         return queryset
+
+    def list(self, request, *args, **kwargs):
+        if wants_stream(request.query_params):
+            return self.stream(self.get_queryset())
+
+        version, modified = catalog.catalog_version()
+        etag = '"{}"'.format(version)
+        not_modified = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        # La pagina cacheada depende del cursor y el tamaño pedidos
+        cache = catalog.get_cache()
+        key = catalog.cache_key(version, request.build_absolute_uri())
+        data = cache.get(key)
+        if data is None:
+            # Las replicas pueden no tener aun el ultimo cambio, y la pagina
+            # quedaria cacheada con la version nueva
+            replica = (
+                routers.reading_from_replica() and
+                not routers.recently_written(modified)
+            )
+            with routers.use_replica(replica):
+                data = super().list(request, *args, **kwargs).data
+            cache.set(key, data)
+
+        response = Response(data)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(modified)
+
+        return response
+
+    def stream(self, queryset):
+        """Retorna todo el catalogo como NDJSON usando un cursor de servidor"""
+        rows = queryset.values('id', 'name').iterator(
+            chunk_size=STREAM_CHUNK_SIZE
+        )
+        lines = (json.dumps(row) + '\n' for row in rows)
+
+        return StreamingHttpResponse(
+            lines,
+            content_type='application/x-ndjson'
+        )
+
+
+class SearchSkillsView(generics.ListAPIView):
+    """Busca habilidades por prefijo o nombre aproximado"""
+    serializer_class = serializers.SkillSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = None
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '')
+        try:
+            limit = int(self.request.query_params.get('limit', SEARCH_LIMIT))
+        except ValueError:
+            limit = SEARCH_LIMIT
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+
+        return search.search_skills(query, limit=limit)
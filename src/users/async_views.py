@@ -0,0 +1,37 @@
+from core import aio
+from core import routers
+
+from resumes import builder
+
+from users import serializers
+
+
+ALLOW = {'Allow': 'GET, PUT, PATCH, HEAD, OPTIONS'}
+
+
+async def me(request):
+    """Version async del GET de ManageUserView"""
+    user = await aio.authenticate(request)
+    if user is None:
+        return None
+
+    data = await aio.run_sync(
+        routers.read,
+        user,
+        lambda: serializers.UserSerializer(
+            user, context={'request': request}
+        ).data
+    )
+
+    return aio.Response(data, headers=ALLOW)
+
+
+async def resume(request):
+    """Version async de ResumeView"""
+    user = await aio.authenticate(request)
+    if user is None:
+        return None
+
+    data = await aio.run_sync(routers.read, user, builder.get_resume, user)
+
+    return aio.Response(data, headers={'Allow': 'GET, HEAD, OPTIONS'})
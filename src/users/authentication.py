@@ -0,0 +1,114 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.functional import SimpleLazyObject
+from django.utils.functional import empty
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+# Datos del usuario que viajan firmados dentro del token
+CLAIMS = ('email', 'is_staff', 'is_active')
+
+REQUIRED_CLAIMS = CLAIMS + ('iat',)
+
+REVOKED_KEY = 'jwt-revoked:{}'
+
+
+def get_cache():
+    """Cache de las revocaciones, separado para que otros datos no las
+    descarten antes de tiempo
+    """
+    return caches[getattr(settings, 'JWT_REVOCATION_CACHE', 'default')]
+
+
+def add_claims(token, user):
+    """Agrega al token los datos del usuario que se usan sin consultarlo"""
+    for claim in CLAIMS:
+        token[claim] = getattr(user, claim)
+    # Con fraccion de segundo, para compararlo con la revocacion
+    token['iat'] = time.time()
+
+    return token
+
+
+def revoke(user_id):
+    """Invalida los tokens de acceso emitidos hasta ahora para el usuario
+
+    Basta con recordarlo mientras dura un token de acceso, despues de eso
+    los tokens anteriores ya expiraron.
+    """
+    get_cache().set(
+        REVOKED_KEY.format(user_id),
+        time.time(),
+        api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    )
+
+
+def is_revoked(validated_token):
+    revoked_at = get_cache().get(REVOKED_KEY.format(
+        validated_token[api_settings.USER_ID_CLAIM]
+    ))
+
+    return revoked_at is not None and validated_token['iat'] <= revoked_at
+
+
+class ClaimsUser(SimpleLazyObject):
+    """Usuario armado desde los claims del token
+
+    Los claims se responden sin ir a la base de datos. Cualquier otro
+    atributo, o usar el objeto como instancia de User, carga el usuario
+    una sola vez.
+    """
+
+    def __init__(self, claims):
+        user_id = claims[api_settings.USER_ID_CLAIM]
+        self.__dict__['_claims'] = dict(
+            {claim: claims[claim] for claim in CLAIMS},
+            id=user_id,
+            pk=user_id,
+            is_authenticated=True,
+            is_anonymous=False
+        )
+        super().__init__(lambda: get_user_model().objects.get(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ))
+
+    def __getattr__(self, name):
+        claims = self.__dict__['_claims']
+        if self._wrapped is empty and name in claims:
+            return claims[name]
+
+        return super().__getattr__(name)
+
+    def __bool__(self):
+        return True
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Autenticacion JWT que confia en los claims firmados del token
+
+    A diferencia de JWTAuthentication no consulta el usuario en cada
+    peticion; solo revisa la lista de revocacion en el cache. Los tokens
+    emitidos sin claims se autentican contra la base de datos.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('Token contained no recognizable user')
+        if any(claim not in validated_token for claim in REQUIRED_CLAIMS):
+            return super().get_user(validated_token)
+
+        if is_revoked(validated_token):
+            raise AuthenticationFailed('Token revoked', code='token_revoked')
+        if not validated_token['is_active']:
+            raise AuthenticationFailed(
+                'User is inactive', code='user_inactive'
+            )
+
+        return ClaimsUser(validated_token)
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import numpy as np
+
+from django.conf import settings
+
+from core import models
+
+
+def max_age():
+    return getattr(settings, 'CANDIDATE_INDEX_MAX_AGE', 300)
+
+
+class Posting(object):
+    """Usuarios con una habilidad, ordenados por id, y su competencia"""
+    __slots__ = ('users', 'proficiency')
+
+    def __init__(self, users=None, proficiency=None):
+        if users is None:
+            users = np.empty(0, dtype=np.int64)
+            proficiency = np.empty(0, dtype=np.int16)
+        self.users = users
+        self.proficiency = proficiency
+
+    def set(self, user_id, proficiency):
+        position = np.searchsorted(self.users, user_id)
+        if position < self.users.size and self.users[position] == user_id:
+            self.proficiency[position] = proficiency
+        else:
+            self.users = np.insert(self.users, position, user_id)
+            self.proficiency = np.insert(
+                self.proficiency, position, proficiency
+            )
+
+    def remove(self, user_id):
+        position = np.searchsorted(self.users, user_id)
+        if position < self.users.size and self.users[position] == user_id:
+            self.users = np.delete(self.users, position)
+            self.proficiency = np.delete(self.proficiency, position)
+
+    def at_least(self, proficiency):
+        return self.users[self.proficiency >= proficiency]
+
+
+class CandidateIndex(object):
+    """Indice invertido habilidad -> usuarios, en memoria del proceso
+
+    Se arma con una sola consulta y se mantiene al dia con las señales de
+    UserSkill de este proceso. Los cambios hechos en otros procesos se ven
+    cuando el indice se vuelve a armar, a lo sumo cada
+    CANDIDATE_INDEX_MAX_AGE segundos.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Solo un hilo a la vez arma el indice
+        self.build_lock = threading.Lock()
+        self.postings = None
+        self.built_at = 0
+
+    def build(self):
+        rows = models.UserSkill.objects.order_by(
+            'skill_id', 'user_id', 'proficiency'
+        ).values_list('skill_id', 'user_id', 'proficiency')
+        data = np.array(list(rows.iterator(chunk_size=10000)), dtype=np.int64)
+        postings = {}
+        if data.size:
+            # Para filas repetidas queda la de mayor competencia
+            last = np.ones(len(data), dtype=bool)
+            last[:-1] = np.any(data[1:, :2] != data[:-1, :2], axis=1)
+            data = data[last]
+            skills, starts = np.unique(data[:, 0], return_index=True)
+            ends = np.append(starts[1:], len(data))
+            for skill_id, start, end in zip(skills, starts, ends):
+                postings[int(skill_id)] = Posting(
+                    data[start:end, 1].copy(),
+                    data[start:end, 2].astype(np.int16)
+                )
+
+        with self.lock:
+            self.postings = postings
+            self.built_at = time.monotonic()
+
+    def stale(self):
+        return time.monotonic() - self.built_at > max_age()
+
+    def ensure_built(self):
+        """Arma el indice si falta o esta viejo
+
+        Sin indice los hilos esperan a que uno lo arme. Con un indice viejo
+        uno lo vuelve a armar y los demas siguen usando el viejo mientras
+        tanto, en vez de hacer cada uno la consulta completa.
+        """
+        if self.postings is None:
+            with self.build_lock:
+                if self.postings is None:
+                    self.build()
+        elif self.stale() and self.build_lock.acquire(blocking=False):
+            try:
+                if self.stale():
+                    self.build()
+            finally:
+                self.build_lock.release()
+
+    def reset(self):
+        with self.lock:
+            self.postings = None
+
+    def update(self, skill_id, user_id, proficiency):
+        with self.lock:
+            if self.postings is None:
+                return
+            posting = self.postings.setdefault(skill_id, Posting())
+            posting.set(user_id, proficiency)
+
+    def remove(self, skill_id, user_id):
+        with self.lock:
+            if self.postings is None or skill_id not in self.postings:
+                return
+            self.postings[skill_id].remove(user_id)
+
+    def search(self, requirements):
+        """Retorna los ids de usuarios que cumplen todos los requisitos
+
+        requirements es una lista de (skill_id, competencia minima).
+        """
+        self.ensure_built()
+        with self.lock:
+            matches = []
+            for skill_id, proficiency in requirements:
+                posting = self.postings.get(skill_id)
+                if posting is None:
+                    return np.empty(0, dtype=np.int64)
+                matches.append(posting.at_least(proficiency))
+
+        if not matches:
+            return np.empty(0, dtype=np.int64)
+
+        # Se intersecta desde la lista mas corta
+        matches.sort(key=len)
+        result = matches[0]
+        for users in matches[1:]:
+            if not result.size:
+                break
+            result = np.intersect1d(result, users, assume_unique=True)
+
+        return result
+
+
+index = CandidateIndex()
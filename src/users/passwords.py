@@ -0,0 +1,132 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.hashers import make_password
+
+from rest_framework import exceptions
+from rest_framework import status
+
+
+class PasswordPoolBusy(exceptions.APIException):
+    """Todos los lugares del pool de claves estan ocupados"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins in progress, try again later.'
+    default_code = 'login_busy'
+
+    def __init__(self, wait=1):
+        super().__init__()
+        # DRF lo envia como header Retry-After
+        self.wait = wait
+
+
+class PasswordPool(object):
+    """Hashea claves en un pool de hilos acotado
+
+    Como maximo workers claves se hashean a la vez y queue esperan su
+    turno; el resto espera hasta timeout segundos por un lugar y luego
+    falla con PasswordPoolBusy, para que una ola de logins no ocupe todos
+    los nucleos. Con workers en 0 se hashea en el hilo de la peticion.
+    """
+
+    def __init__(self, workers=0, queue=0, timeout=0):
+        self.config = (workers, queue, timeout)
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(workers + queue)
+        self.executor = None
+        if workers > 0:
+            self.executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix='passwords'
+            )
+
+    def run(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PasswordPoolBusy()
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda future: self.slots.release())
+
+        return future.result()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Pool de claves segun la configuracion actual de los settings"""
+    global _pool
+    config = (
+        getattr(settings, 'PASSWORD_POOL_WORKERS', 0),
+        getattr(settings, 'PASSWORD_POOL_QUEUE', 0),
+        getattr(settings, 'PASSWORD_POOL_TIMEOUT', 0),
+    )
+    with _pool_lock:
+        if _pool is None or _pool.config != config:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = PasswordPool(*config)
+
+        return _pool
+
+
+def verify(password, encoded):
+    """Verifica la clave y retorna si es valida y, si el hash usa un
+    algoritmo o costos anteriores, el nuevo hash a guardar
+    """
+    rehash = []
+    valid = check_password(password, encoded, setter=rehash.append)
+    if valid and rehash:
+        return True, make_password(password)
+
+    return valid, None
+
+
+class PooledModelBackend(ModelBackend):
+    """ModelBackend que hashea las claves en el pool de claves
+
+    Las consultas y el guardado del nuevo hash se hacen en el hilo de la
+    peticion, el pool solo calcula los hashes.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        User = get_user_model()
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        pool = get_pool()
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # Hashea igual para no revelar que el usuario no existe
+            pool.run(make_password, password)
+            return None
+
+        valid, encoded = pool.run(verify, password, user.password)
+        if not valid:
+            return None
+        if encoded is not None:
+            user.password = encoded
+            user.save(update_fields=['password'])
+
+        if self.user_can_authenticate(user):
+            return user
+
+        return None
@@ -0,0 +1,61 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from core import models
+from core import signals
+
+from users import authentication
+from users.candidates import index
+
+
+@receiver(post_save, sender=models.UserSkill)
+def index_user_skill(sender, instance, **kwargs):
+    index.update(instance.skill_id, instance.user_id, instance.proficiency)
+
+
+@receiver(signals.user_skills_added)
+def index_user_skills(sender, user_skills, **kwargs):
+    for user_skill in user_skills:
+        index.update(
+            user_skill.skill_id,
+            user_skill.user_id,
+            user_skill.proficiency
+        )
+
+
+@receiver(post_delete, sender=models.UserSkill)
+def unindex_user_skill(sender, instance, **kwargs):
+    index.remove(instance.skill_id, instance.user_id)
+
+
+@receiver(pre_save, sender=models.User)
+def check_token_fields(sender, instance, update_fields=None, **kwargs):
+    """Marca al usuario si cambia su clave o los claims de sus tokens"""
+    if instance.pk is None:
+        return
+    # set_password guarda la clave nueva en _password hasta el save, al
+    # actualizar solo el hash de la misma clave queda en None
+    if instance._password is not None:
+        instance._revoke_tokens = True
+        return
+    claims = authentication.CLAIMS
+    if update_fields and not set(update_fields) & set(claims):
+        return
+    old = sender.objects.filter(pk=instance.pk).values(*claims).first()
+    instance._revoke_tokens = old is not None and any(
+        old[claim] != getattr(instance, claim) for claim in claims
+    )
+
+
+@receiver(post_save, sender=models.User)
+def revoke_changed_user_tokens(sender, instance, **kwargs):
+    if getattr(instance, '_revoke_tokens', False):
+        authentication.revoke(instance.pk)
+        instance._revoke_tokens = False
+
+
+@receiver(post_delete, sender=models.User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    authentication.revoke(instance.pk)
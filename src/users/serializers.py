@@ -1,13 +1,49 @@
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 
 from rest_framework import serializers
 
 from drf_extra_fields.fields import Base64ImageField
 
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 
-class UserSerializer(serializers.ModelSerializer):
+from core import images
+from core import metrics
+from core import models
+
+from users import authentication
+
+
+class PhotoField(Base64ImageField):
+    """Base64ImageField que valida tamaño y dimensiones antes de decodificar"""
+
+    def to_internal_value(self, base64_data):
+        # Cada 4 caracteres de base64 son 3 bytes
+        if isinstance(base64_data, str):
+            if len(base64_data) * 3 // 4 > images.max_bytes():
+                raise serializers.ValidationError(
+                    'Image is larger than {} bytes'.format(images.max_bytes())
+                )
+
+        photo = super().to_internal_value(base64_data)
+        if photo is not None:
+            try:
+                images.validate_image(photo)
+            except ValidationError as e:
+                raise serializers.ValidationError(e.messages)
+
+        return photo
+
+
+class UserSerializer(
+    metrics.TimedSerializerMixin,
+    serializers.ModelSerializer
+):
     """Serializer para el modelo User"""
-    photo = Base64ImageField(required=False)
+    photo = PhotoField(required=False)
 
     class Meta:
         model = get_user_model()
@@ -25,4 +61,82 @@ class UserSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         """Crea un nuevo usuario y lo retorna"""
-        return get_user_model().objects.create_user(**validated_data)
+        user = get_user_model().objects.create_user(**validated_data)
+        if validated_data.get('photo'):
+            images.schedule_thumbnails(user)
+
+        return user
+
+    def update(self, instance, validated_data):
+        """Actualiza el usuario y encola las miniaturas si cambio la foto"""
+        password = validated_data.pop('password', None)
+        if password:
+            instance.set_password(password)
+        user = super().update(instance, validated_data)
+        if validated_data.get('photo'):
+            images.schedule_thumbnails(user)
+
+        return user
+
+
+class UserSkillSerializer(
+    metrics.TimedSerializerMixin,
+    serializers.ModelSerializer
+):
+    """Serializer para el modelo UserSkill"""
+
+    class Meta:
+        model = models.UserSkill
+        fields = ('id', 'skill', 'proficiency')
+        extra_kwargs = {
+            'id': {'read_only': True}
+        }
+
+
+class JobSerializer(
+    metrics.TimedSerializerMixin,
+    serializers.ModelSerializer
+):
+    """Serializer para el modelo Job"""
+
+    class Meta:
+        model = models.Job
+        fields = (
+            'id', 'title', 'company', 'start_date',
+            'end_date', 'present_day'
+        )
+        extra_kwargs = {
+            'id': {'read_only': True}
+        }
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """Emite tokens con los claims que usa ClaimsJWTAuthentication"""
+
+    @classmethod
+    def get_token(cls, user):
+        return authentication.add_claims(super().get_token(user), user)
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """Renueva el token de acceso con los datos actuales del usuario
+
+    Los claims del refresh pueden estar desactualizados, asi que se
+    vuelven a leer del usuario y se rechaza a los usuarios inactivos.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        refresh = RefreshToken(attrs['refresh'])
+        user = get_user_model().objects.filter(**{
+            api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]
+        }).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(
+                'User is inactive', code='user_inactive'
+            )
+
+        access = authentication.add_claims(refresh.access_token, user)
+        data['access'] = str(access)
+
+        return data
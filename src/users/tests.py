@@ -1,19 +1,77 @@
 import base64
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
 
+from io import BytesIO
+from io import StringIO
 from unittest.mock import patch
 from PIL import Image
 
+from django.contrib.auth import hashers as django_hashers
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test import override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth import get_user_model
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from rest_framework_simplejwt.tokens import AccessToken
 
+from users import authentication
+from users import candidates
+from users import passwords
+from users import uploads
+
+from core import images
+from core import models
+from core import routers
+from core.testing import CacheMixin
+from core.testing import MediaRootMixin
+from core.testing import QueryBudgetMixin
+
+from resumes import builder
+
+
+TOKEN_URL = reverse('users:token')
+REFRESH_URL = reverse('users:refresh')
 CREATE_USER_URL = reverse('users:create')
 ME_URL = reverse('users:me')
+RESUME_URL = reverse('users:resume')
+TIMELINE_URL = reverse('users:timeline')
+SEARCH_URL = reverse('users:search')
+SKILLS_BULK_URL = reverse('users:skills-bulk')
+JOBS_BULK_URL = reverse('users:jobs-bulk')
+EXPORT_URL = reverse('users:export')
+EXPORT_ALL_URL = reverse('users:export-all')
+IMPORT_URL = reverse('users:import')
+
+
+PHOTO_UPLOAD_URL = reverse('users:photo-upload')
+PHOTO_UPLOADS_URL = reverse('users:photo-uploads')
+
+
+def photo_chunk_url(upload_id):
+    return reverse('users:photo-upload-chunk', args=[upload_id])
+
+
+def photo_complete_url(upload_id):
+    return reverse('users:photo-upload-complete', args=[upload_id])
+
+
+def photo_url(size):
+    return reverse('users:photo', args=[size])
 
 
 def create_user(**params):
@@ -58,6 +116,16 @@ class PublicTests(TestCase):
         self.assertTrue(user.check_password(self.payload.get('password')))
         self.assertNotIn('password', res.data)
 
+    @override_settings(PHOTO_MAX_BYTES=10)
+    def test_create_user_photo_too_large(self):
+        """Testea que se rechace una foto mas grande que el limite"""
+        payload = self.payload.copy()
+        payload['photo'] = self.encoded_content
+        res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('photo', res.data)
+
     def test_user_exists(self):
         """Testea que no se pueda crear un usuario que ya existe"""
         create_user(**self.payload)
@@ -109,3 +177,880 @@ class PrivateTests(TestCase):
         res = self.client.post(ME_URL, {})
 
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_retrieve_resume_successful(self):
+        """Testea que un usuario pueda obtener su curriculum"""
+        self.user.add_job(
+            company='ADP',
+            start_date='2019-09-02',
+            end_date='2019-12-24'
+        )
+
+        res = self.client.get(RESUME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['user']['email'], self.user.email)
+        self.assertEqual(res.data['jobs'][0]['company'], 'ADP')
+
+    def test_retrieve_timeline_successful(self):
+        """Testea que un usuario pueda obtener su linea de tiempo"""
+        self.user.add_job(
+            company='ADP',
+            start_date='2019-09-02',
+            end_date='2019-12-24'
+        )
+
+        res = self.client.get(TIMELINE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['total_days'], 114)
+        self.assertEqual(res.data['companies'][0]['company'], 'ADP')
+
+    def test_bulk_add_skills_successful(self):
+        """Testea agregar varias habilidades al usuario"""
+        cpp = models.Skill.objects.create_skill(name='C++')
+        go = models.Skill.objects.create_skill(name='Go')
+        payload = [
+            {'skill': cpp.id, 'proficiency': 4},
+            {'skill': go.id, 'proficiency': 2},
+        ]
+
+        res = self.client.post(SKILLS_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.user.skills.count(), 2)
+
+    def test_bulk_add_jobs_successful(self):
+        """Testea agregar varios trabajos al usuario"""
+        payload = [
+            {
+                'company': 'ADP',
+                'start_date': '2019-09-02',
+                'end_date': '2019-12-24'
+            },
+            {
+                'company': 'ACME',
+                'start_date': '2020-01-06',
+                'present_day': True
+            },
+        ]
+
+        res = self.client.post(JOBS_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.user.jobs.count(), 2)
+
+    def test_bulk_add_jobs_invalid_fail(self):
+        """Testea que no se agregue ningun trabajo si uno es invalido"""
+        payload = [
+            {
+                'company': 'ADP',
+                'start_date': '2019-09-02',
+                'end_date': '2019-12-24'
+            },
+            {
+                'company': 'ACME',
+                'start_date': '2020-01-06'
+            },
+        ]
+
+        res = self.client.post(JOBS_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.user.jobs.exists())
+
+
+class JWTAuthTests(CacheMixin, TestCase):
+    """Testea la autenticacion JWT con claims"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user(email='test@mail.com', password='123456')
+        self.client = APIClient()
+
+    def get_tokens(self):
+        res = self.client.post(
+            TOKEN_URL, {'email': 'test@mail.com', 'password': '123456'}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return res.data
+
+    def authenticate(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access)
+
+    def test_token_has_claims(self):
+        """Testea que el token incluya los datos del usuario"""
+        token = AccessToken(self.get_tokens()['access'])
+
+        self.assertEqual(token['email'], 'test@mail.com')
+        self.assertTrue(token['is_active'])
+        self.assertFalse(token['is_staff'])
+
+    def test_authenticate_without_user_query(self):
+        """Testea que autenticar no consulte la tabla de usuarios"""
+        self.authenticate(self.get_tokens()['access'])
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(reverse('skills:list'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user_table = get_user_model()._meta.db_table
+        for query in context.captured_queries:
+            self.assertNotIn(user_table, query['sql'])
+
+    def test_claims_user_loads_when_needed(self):
+        """Testea que el usuario completo se cargue al necesitarlo"""
+        self.authenticate(self.get_tokens()['access'])
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.data['email'], 'test@mail.com')
+
+        res = self.client.post(reverse('resumes:generate'), {})
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(models.Task.objects.get().user, self.user)
+
+    def test_token_without_claims(self):
+        """Testea que los tokens sin claims usen la base de datos"""
+        self.authenticate(str(AccessToken.for_user(self.user)))
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_revoked(self):
+        """Testea que desactivar un usuario anule sus tokens"""
+        tokens = self.get_tokens()
+        self.authenticate(tokens['access'])
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(reverse('skills:list'))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        res = self.client.post(REFRESH_URL, {'refresh': tokens['refresh']})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_survives_cache_pressure(self):
+        """Testea que llenar los caches no descarte una revocacion"""
+        self.authenticate(self.get_tokens()['access'])
+        self.user.is_active = False
+        self.user.save()
+
+        # Mas entradas que el MAX_ENTRIES por defecto de Django
+        for i in range(400):
+            cache.set('filler:{}'.format(i), i)
+            authentication.revoke('other-{}'.format(i))
+        res = self.client.get(reverse('skills:list'))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_profile_update_keeps_tokens(self):
+        """Testea que cambiar datos fuera del token no lo anule"""
+        self.authenticate(self.get_tokens()['access'])
+
+        res = self.client.patch(ME_URL, {'first_name': 'Bob'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(authentication.get_cache().get(
+            authentication.REVOKED_KEY.format(self.user.pk)
+        ))
+
+    def test_refresh_updates_claims(self):
+        """Testea que renovar el token lea los datos actuales"""
+        refresh = self.get_tokens()['refresh']
+        self.user.is_staff = True
+        self.user.save()
+
+        res = self.client.post(REFRESH_URL, {'refresh': refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(AccessToken(res.data['access'])['is_staff'])
+        self.authenticate(res.data['access'])
+        res = self.client.get(SEARCH_URL, {'skill': 'Python'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class PasswordTests(CacheMixin, TestCase):
+    """Testea el hasheo de claves al hacer login"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user(email='test@mail.com', password='123456')
+        self.client = APIClient()
+
+    def login(self):
+        return self.client.post(
+            TOKEN_URL, {'email': 'test@mail.com', 'password': '123456'}
+        )
+
+    def test_rehash_on_login(self):
+        """Testea que un hash anterior se actualice al hacer login"""
+        self.user.password = make_password('123456', hasher='pbkdf2_sha256')
+        self.user.save()
+
+        res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('argon2$'))
+        self.assertFalse(authentication.get_cache().get(
+            authentication.REVOKED_KEY.format(self.user.pk)
+        ))
+
+    def test_rehash_on_cost_change(self):
+        """Testea que cambiar los costos de Argon2 actualice el hash"""
+        with self.settings(ARGON2_TIME_COST=3):
+            res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertIn(',t=3,', self.user.password)
+
+    def test_argon2id(self):
+        """Testea hashear con Argon2id y los costos de los settings"""
+        with self.settings(
+            ARGON2_TIME_COST=3, ARGON2_MEMORY_COST=1024, ARGON2_PARALLELISM=2
+        ):
+            encoded = make_password('123456')
+
+        self.assertTrue(encoded.startswith('argon2$argon2id$'))
+        self.assertIn('$m=1024,t=3,p=2$', encoded)
+
+    def test_rehash_argon2i(self):
+        """Testea aceptar un hash Argon2i y actualizarlo a Argon2id"""
+        self.user.password = make_password(
+            '123456', hasher=django_hashers.Argon2PasswordHasher()
+        )
+        self.user.save()
+        self.assertIn('$argon2i$', self.user.password)
+
+        res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('argon2$argon2id$'))
+
+    def test_wrong_password_fail(self):
+        """Testea que no se emitan tokens con una clave incorrecta"""
+        res = self.client.post(
+            TOKEN_URL, {'email': 'test@mail.com', 'password': 'wrong'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(PASSWORD_POOL_WORKERS=2)
+    def test_login_with_pool(self):
+        """Testea hacer login verificando la clave en el pool"""
+        res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(
+        PASSWORD_POOL_WORKERS=1,
+        PASSWORD_POOL_QUEUE=0,
+        PASSWORD_POOL_TIMEOUT=0
+    )
+    def test_login_pool_busy(self):
+        """Testea que un pool lleno rechace el login en vez de esperar"""
+        pool = passwords.get_pool()
+        pool.slots.acquire()
+        self.addCleanup(pool.slots.release)
+
+        res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res['Retry-After'], '1')
+
+    def test_password_change_revokes_tokens(self):
+        """Testea que cambiar la clave anule los tokens emitidos"""
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + self.login().data['access']
+        )
+
+        res = self.client.patch(ME_URL, {'password': 'new-password'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('new-password'))
+        self.assertTrue(authentication.get_cache().get(
+            authentication.REVOKED_KEY.format(self.user.pk)
+        ))
+
+
+@patch('core.routers.choose_replica', return_value=None)
+class ReplicaTests(CacheMixin, TestCase):
+    """Testea las lecturas desde las replicas y el fijado al primario"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user(email='test@mail.com', password='123456')
+        self.client = APIClient()
+        res = self.client.post(
+            TOKEN_URL, {'email': 'test@mail.com', 'password': '123456'}
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + res.data['access']
+        )
+
+    def test_read_views_use_replica(self, choose_replica):
+        """Testea que el perfil y el curriculum se lean de las replicas"""
+        for url in (ME_URL, RESUME_URL):
+            choose_replica.reset_mock()
+            res = self.client.get(url)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertTrue(choose_replica.called, url)
+            self.assertFalse(routers.reading_from_replica())
+
+    def test_resume_snapshot_built_from_primary(self, choose_replica):
+        """Testea que el snapshot no se arme con una replica atrasada"""
+        stale = builder.build_resume(self.user)
+        self.user.add_jobs([{
+            'title': 'Developer',
+            'company': 'ACME',
+            'start_date': '2019-01-01',
+            'present_day': True,
+        }])
+        build_resume = builder.build_resume
+
+        def build(user):
+            # La replica todavia no tiene el trabajo nuevo
+            if routers.reading_from_replica():
+                return stale
+            return build_resume(user)
+
+        with patch('resumes.builder.build_resume', side_effect=build):
+            res = self.client.get(RESUME_URL)
+
+        self.assertEqual(len(res.data['jobs']), 1)
+        snapshot = models.ResumeSnapshot.objects.get(user=self.user)
+        self.assertEqual(len(json.loads(snapshot.data)['jobs']), 1)
+
+    def test_bulk_add_then_read_resume(self, choose_replica):
+        """Testea leer lo recien agregado aunque la replica este atrasada"""
+        stale = self.client.get(RESUME_URL).data
+        get_resume = builder.get_resume
+
+        def lagging(user):
+            # La replica todavia tiene el snapshot anterior
+            if routers.reading_from_replica():
+                return stale
+            return get_resume(user)
+
+        go = models.Skill.objects.create_skill(name='Go')
+        requests = (
+            (SKILLS_BULK_URL, [{'skill': go.id, 'proficiency': 3}], 'skills'),
+            (JOBS_BULK_URL, [{
+                'company': 'ACME',
+                'start_date': '2020-01-06',
+                'present_day': True
+            }], 'jobs'),
+        )
+        for url, payload, key in requests:
+            res = self.client.post(url, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+            with patch('users.views.builder.get_resume', side_effect=lagging):
+                res = self.client.get(RESUME_URL)
+
+            self.assertEqual(len(res.data[key]), 1, key)
+
+    def test_update_pins_user(self, choose_replica):
+        """Testea leer del primario despues de actualizar el perfil"""
+        res = self.client.patch(ME_URL, {'first_name': 'New name'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(choose_replica.called)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['first_name'], 'New name')
+        self.assertFalse(choose_replica.called)
+
+    def test_create_user_pins_new_user(self, choose_replica):
+        """Testea que el usuario recien creado lea del primario"""
+        res = APIClient().post(CREATE_USER_URL, {
+            'email': 'new@mail.com',
+            'password': '123456'
+        })
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        user = get_user_model().objects.get(email='new@mail.com')
+        self.assertTrue(routers.is_pinned(user))
+        self.assertFalse(routers.is_pinned(self.user))
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Testea el numero maximo de consultas de las vistas de usuarios"""
+
+    def setUp(self):
+        self.user = create_user(email='test@mail.com', password='123456')
+        skills = [
+            models.Skill.objects.create_skill(name=name)
+            for name in ('Python', 'Go', 'SQL')
+        ]
+        self.user.add_skills([
+            {'skill': skill, 'proficiency': 3} for skill in skills
+        ])
+        self.user.add_jobs([
+            {
+                'company': 'ADP',
+                'start_date': '2018-01-01',
+                'present_day': True
+            },
+            {
+                'company': 'ACME',
+                'start_date': '2016-01-01',
+                'end_date': '2017-12-31'
+            },
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_view_budgets(self):
+        """Testea que las vistas no hagan consultas por cada fila"""
+        self.assertViewBudgets(self.client, [
+            ('GET', ME_URL, 0),
+            # Arma el snapshot, con el savepoint de la fila vacia
+            ('GET', RESUME_URL, 7),
+            ('GET', RESUME_URL, 1),
+            ('GET', TIMELINE_URL, 2),
+        ])
+
+
+class PhotoTests(CacheMixin, MediaRootMixin, TestCase):
+    """Testea las miniaturas de la foto del usuario"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user(
+            email='test@mail.com',
+            password='123456'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        buffer = BytesIO()
+        Image.new('RGB', (800, 600)).save(buffer, 'PNG')
+        self.content = buffer.getvalue()
+        self.encoded_content = base64.b64encode(self.content).decode()
+
+    def use_uploads_dir(self):
+        """Usa un directorio de subidas vacio durante el test"""
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        settings_override = override_settings(FILE_UPLOAD_TEMP_DIR=path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def send_chunk(self, upload_id, chunk, offset):
+        return self.client.generic(
+            'PATCH',
+            photo_chunk_url(upload_id),
+            chunk,
+            content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_multipart_upload_successful(self):
+        """Testea subir la foto como multipart"""
+        photo = SimpleUploadedFile(
+            'avatar.png', self.content, content_type='image/png'
+        )
+
+        res = self.client.put(
+            PHOTO_UPLOAD_URL, {'photo': photo}, format='multipart'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(routers.is_pinned(self.user))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.photo.name.startswith('Users/'))
+        self.assertTrue(self.user.photo.name.endswith('.png'))
+        self.assertNotIn('avatar', self.user.photo.name)
+        self.assertTrue(
+            models.Task.objects.filter(kind='photo_thumbnails').exists()
+        )
+
+    def test_multipart_upload_invalid_image(self):
+        """Testea que se rechace un archivo que no es imagen"""
+        photo = SimpleUploadedFile(
+            'avatar.png', b'not an image', content_type='image/png'
+        )
+
+        res = self.client.put(
+            PHOTO_UPLOAD_URL, {'photo': photo}, format='multipart'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.photo)
+
+    def test_chunked_upload_successful(self):
+        """Testea subir la foto por partes"""
+        res = self.client.post(PHOTO_UPLOADS_URL)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        upload_id = res.data['id']
+        half = len(self.content) // 2
+
+        res = self.send_chunk(upload_id, self.content[:half], 0)
+        self.assertEqual(res.data['offset'], half)
+        res = self.send_chunk(upload_id, self.content[half:], half)
+        self.assertEqual(res.data['offset'], len(self.content))
+        res = self.client.post(photo_complete_url(upload_id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(routers.is_pinned(self.user))
+        self.user.refresh_from_db()
+        with self.user.photo.open() as f:
+            self.assertEqual(f.read(), self.content)
+        res = self.client.post(photo_complete_url(upload_id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_chunked_upload_wrong_offset(self):
+        """Testea que se rechace una parte con el offset equivocado"""
+        upload_id = self.client.post(PHOTO_UPLOADS_URL).data['id']
+        self.addCleanup(self.client.delete, photo_chunk_url(upload_id))
+
+        res = self.send_chunk(upload_id, self.content[:10], 5)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PHOTO_MAX_BYTES=100)
+    def test_chunked_upload_too_large(self):
+        """Testea que se rechace una subida mas grande que el limite"""
+        upload_id = self.client.post(PHOTO_UPLOADS_URL).data['id']
+        self.addCleanup(self.client.delete, photo_chunk_url(upload_id))
+
+        res = self.send_chunk(upload_id, self.content, 0)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.head(photo_chunk_url(upload_id))
+        self.assertEqual(res['Upload-Offset'], '0')
+
+    @override_settings(PHOTO_UPLOADS_MAX_OPEN=2)
+    def test_chunked_upload_open_limit(self):
+        """Testea limitar las subidas abiertas de un usuario"""
+        self.use_uploads_dir()
+        for _ in range(2):
+            res = self.client.post(PHOTO_UPLOADS_URL)
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(PHOTO_UPLOADS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(uploads.upload_paths(self.user)), 2)
+
+    @override_settings(PHOTO_UPLOADS_MAX_OPEN=1, PHOTO_UPLOAD_MAX_AGE=60)
+    def test_chunked_upload_expired_removed(self):
+        """Testea que una subida abandonada se borre y no cuente"""
+        self.use_uploads_dir()
+        upload_id = self.client.post(PHOTO_UPLOADS_URL).data['id']
+        path = uploads.ChunkedUpload(self.user, upload_id).path
+        old = time.time() - 120
+        os.utime(path, (old, old))
+
+        res = self.client.post(PHOTO_UPLOADS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(os.path.exists(path))
+
+    @override_settings(PHOTO_UPLOAD_MAX_AGE=60)
+    def test_clean_uploads_command(self):
+        """Testea borrar las subidas abandonadas de todos los usuarios"""
+        self.use_uploads_dir()
+        expired = uploads.ChunkedUpload.start(self.user)
+        current = uploads.ChunkedUpload.start(self.user)
+        old = time.time() - 120
+        os.utime(expired.path, (old, old))
+        out = StringIO()
+
+        call_command('clean_uploads', stdout=out)
+
+        self.assertIn('Deleted 1 expired uploads', out.getvalue())
+        self.assertFalse(expired.exists)
+        self.assertTrue(current.exists)
+
+    def test_update_photo_schedules_thumbnails(self):
+        """Testea que cambiar la foto encole la generacion de miniaturas"""
+        res = self.client.patch(ME_URL, {'photo': self.encoded_content})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        task = models.Task.objects.get(user=self.user)
+        self.assertEqual(task.kind, 'photo_thumbnails')
+
+    def test_thumbnail_not_ready(self):
+        """Testea que una miniatura aun no generada retorne 404"""
+        self.client.patch(ME_URL, {'photo': self.encoded_content})
+
+        res = self.client.get(photo_url('small'))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_thumbnail_successful(self):
+        """Testea servir la miniatura en el formato aceptado"""
+        self.client.patch(ME_URL, {'photo': self.encoded_content})
+        self.user.refresh_from_db()
+        images.generate_thumbnails(self.user.photo.name)
+
+        res = self.client.get(photo_url('small'), HTTP_ACCEPT='image/webp')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'image/webp')
+        thumbnail = Image.open(BytesIO(b''.join(res.streaming_content)))
+        self.assertEqual(thumbnail.size, (64, 48))
+
+    @patch('PIL.features.check', lambda feature: feature != 'webp')
+    def test_thumbnail_without_webp(self):
+        """Testea servir JPEG si Pillow no soporta WEBP"""
+        self.client.patch(ME_URL, {'photo': self.encoded_content})
+        self.user.refresh_from_db()
+        images.generate_thumbnails(self.user.photo.name)
+
+        res = self.client.get(photo_url('small'), HTTP_ACCEPT='image/webp')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'image/jpeg')
+
+    def test_thumbnail_unknown_size(self):
+        """Testea que un tamaño desconocido retorne 404"""
+        res = self.client.get(photo_url('huge'))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CandidateSearchTests(TestCase):
+    """Testea la busqueda de candidatos por habilidades"""
+
+    def setUp(self):
+        candidates.index.reset()
+        self.python = models.Skill.objects.create_skill(name='Python')
+        self.django = models.Skill.objects.create_skill(name='Django')
+        self.bob = create_user(email='bob@mail.com', password='123456')
+        self.ana = create_user(email='ana@mail.com', password='123456')
+        self.bob.add_skills([
+            {'skill': self.python, 'proficiency': 5},
+            {'skill': self.django, 'proficiency': 2},
+        ])
+        self.ana.add_skill(self.python, 4)
+        self.ana.add_skill(self.django, 3)
+
+        self.admin = get_user_model().objects.create_superuser(
+            email='admin@test.com',
+            password='123456'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def search(self, *requirements):
+        return list(candidates.index.search(requirements))
+
+    def test_index_search(self):
+        """Testea intersectar varios requisitos"""
+        self.assertEqual(
+            self.search((self.python.id, 4), (self.django.id, 3)),
+            [self.ana.id]
+        )
+        self.assertEqual(
+            self.search((self.python.id, 1)),
+            sorted([self.bob.id, self.ana.id])
+        )
+        self.assertEqual(self.search((self.python.id, 6)), [])
+
+    def test_index_incremental_updates(self):
+        """Testea que el indice se actualice con los cambios de UserSkill"""
+        self.search((self.python.id, 1))
+        go = models.Skill.objects.create_skill(name='Go')
+
+        self.bob.add_skills([{'skill': go, 'proficiency': 3}])
+        self.ana.add_skill(go, 1)
+        user_skill = models.UserSkill.objects.get(
+            user=self.bob, skill=self.django
+        )
+        user_skill.proficiency = 4
+        user_skill.save()
+        models.UserSkill.objects.get(user=self.ana, skill=self.django).delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.search((go.id, 1)), sorted([self.bob.id, self.ana.id])
+            )
+            self.assertEqual(self.search((self.django.id, 3)), [self.bob.id])
+
+    def test_index_single_build(self):
+        """Testea que los hilos concurrentes armen el indice una sola vez"""
+        index = candidates.CandidateIndex()
+        # Los otros hilos no ven los datos de la transaccion del test
+        index.build()
+        postings = index.postings
+        index.reset()
+        started = threading.Event()
+        finish = threading.Event()
+
+        def slow_build():
+            started.set()
+            finish.wait(5)
+            index.postings = postings
+            index.built_at = time.monotonic()
+
+        def search():
+            results.append(list(index.search([(self.python.id, 5)])))
+
+        with patch.object(index, 'build', side_effect=slow_build) as mock:
+            # Sin indice todos esperan al unico hilo que lo arma
+            results = []
+            threads = [threading.Thread(target=search) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            started.wait(5)
+            finish.set()
+            for thread in threads:
+                thread.join(5)
+
+            self.assertEqual(mock.call_count, 1)
+            self.assertEqual(results, [[self.bob.id]] * 4)
+
+            # Con el indice viejo los demas no esperan la reconstruccion
+            index.built_at -= candidates.max_age() + 1
+            started.clear()
+            finish.clear()
+            results = []
+            builder = threading.Thread(target=search)
+            builder.start()
+            started.wait(5)
+            threads = [threading.Thread(target=search) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+                thread.join(5)
+
+            self.assertEqual(results, [[self.bob.id]] * 3)
+            finish.set()
+            builder.join(5)
+
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual(len(results), 4)
+
+    def test_search_api(self):
+        """Testea buscar candidatos por nombre de habilidad"""
+        res = self.client.get(
+            SEARCH_URL, {'skill': ['Python:4', 'Django:3']}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 1)
+        self.assertEqual(res.data['results'][0]['email'], self.ana.email)
+
+    def test_search_api_unknown_skill(self):
+        """Testea que una habilidad desconocida no retorne candidatos"""
+        res = self.client.get(SEARCH_URL, {'skill': ['Python', 'Cobol:1']})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 0)
+
+    def test_search_api_invalid_requirement(self):
+        """Testea que un requisito mal formado retorne 400"""
+        res = self.client.get(SEARCH_URL, {'skill': 'Python:high'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_api_non_admin_fail(self):
+        """Testea que un no administrador no pueda buscar candidatos"""
+        self.client.force_authenticate(user=self.bob)
+
+        res = self.client.get(SEARCH_URL, {'skill': 'Python'})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ArchiveTests(MediaRootMixin, TestCase):
+    """Testea descargar y subir las exportaciones de datos"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user(email='test@mail.com', password='123456')
+        self.admin = get_user_model().objects.create_superuser(
+            email='admin@mail.com',
+            password='123456'
+        )
+        self.client = APIClient()
+
+    def download(self, url):
+        res = self.client.get(url, HTTP_ACCEPT='application/zip')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/zip')
+
+        return BytesIO(b''.join(res.streaming_content))
+
+    def test_export_own_data(self):
+        """Testea que un usuario descargue solo sus datos"""
+        self.client.force_authenticate(user=self.user)
+
+        archive = self.download(EXPORT_URL)
+
+        with zipfile.ZipFile(archive) as f:
+            rows = [
+                json.loads(line)
+                for line in f.read('users/00000.jsonl').splitlines()
+            ]
+        self.assertEqual([row['email'] for row in rows], ['test@mail.com'])
+        self.assertIsNone(rows[0]['password'])
+
+    def test_export_all_requires_admin(self):
+        """Testea que solo un admin exporte todos los usuarios"""
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.get(EXPORT_ALL_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        res = self.client.post(IMPORT_URL, {})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_and_import(self):
+        """Testea importar lo exportado por un admin"""
+        self.client.force_authenticate(user=self.admin)
+        archive = self.download(EXPORT_ALL_URL)
+        self.user.delete()
+
+        res = self.client.post(IMPORT_URL, {
+            'archive': SimpleUploadedFile('export.zip', archive.getvalue())
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['users'], 1)
+        self.assertEqual(res.data['skipped'], 1)
+        user = get_user_model().objects.get(email='test@mail.com')
+        self.assertTrue(user.check_password('123456'))
+
+    def test_import_repeated_skill(self):
+        """Testea que una habilidad repetida en una fila sea un error 400"""
+        self.client.force_authenticate(user=self.admin)
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as f:
+            f.writestr('manifest.json', json.dumps({'version': 1}))
+            f.writestr('users/00000.jsonl', json.dumps({
+                'email': 'new@mail.com',
+                'skills': [
+                    {'name': 'Python', 'proficiency': 3},
+                    {'name': 'Python', 'proficiency': 4},
+                ],
+            }))
+
+        res = self.client.post(IMPORT_URL, {
+            'archive': SimpleUploadedFile('export.zip', buffer.getvalue())
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(
+            get_user_model().objects.filter(email='new@mail.com').exists()
+        )
+
+    def test_import_invalid_archive(self):
+        """Testea que falle subir un archivo que no es una exportacion"""
+        self.client.force_authenticate(user=self.admin)
+
+        res = self.client.post(IMPORT_URL, {
+            'archive': SimpleUploadedFile('export.zip', b'not a zip')
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
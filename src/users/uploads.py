@@ -0,0 +1,141 @@
+import glob
+import os
+import re
+import tempfile
+import time
+
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+
+from core import images
+
+
+CHUNK_SIZE = 64 * 1024
+
+UPLOAD_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def save_photo(user, file):
+    """Valida y guarda la foto del usuario sin cargarla entera en memoria
+
+    El nombre final lo genera PathAndRename del campo photo.
+    """
+    image_format = images.validate_image(file)
+    file.seek(0)
+    user.photo.save('photo.{}'.format(image_format.lower()), File(file))
+    images.schedule_thumbnails(user)
+
+    return user
+
+
+def max_open_uploads():
+    return getattr(settings, 'PHOTO_UPLOADS_MAX_OPEN', 3)
+
+
+def upload_max_age():
+    """Segundos sin recibir partes tras los cuales se borra una subida"""
+    return getattr(settings, 'PHOTO_UPLOAD_MAX_AGE', 24 * 60 * 60)
+
+
+def uploads_dir():
+    base = settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir()
+    path = os.path.join(base, 'photo-uploads')
+    os.makedirs(path, exist_ok=True)
+
+    return path
+
+
+def upload_paths(user=None):
+    pattern = '{}-*.part'.format(user.pk) if user is not None else '*.part'
+
+    return glob.glob(os.path.join(uploads_dir(), pattern))
+
+
+def remove_expired(user=None):
+    """Borra las subidas abandonadas, de user o de todos, y retorna cuantas"""
+    limit = time.time() - upload_max_age()
+    removed = 0
+    for path in upload_paths(user):
+        try:
+            if os.path.getmtime(path) < limit:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            # Se completo o se borro mientras tanto
+            pass
+
+    return removed
+
+
+class ChunkedUpload(object):
+    """Subida de la foto por partes, escrita a disco a medida que llega"""
+
+    def __init__(self, user, upload_id):
+        if not UPLOAD_ID_RE.match(upload_id):
+            raise ValueError('Invalid upload id')
+
+        self.user = user
+        self.id = upload_id
+        self.path = os.path.join(
+            uploads_dir(), '{}-{}.part'.format(user.pk, upload_id)
+        )
+
+    @classmethod
+    def start(cls, user):
+        """Crea una subida vacia, hasta PHOTO_UPLOADS_MAX_OPEN por usuario"""
+        remove_expired(user)
+        if len(upload_paths(user)) >= max_open_uploads():
+            raise ValidationError(
+                'Too many uploads in progress, complete or cancel one first'
+            )
+
+        upload = cls(user, uuid4().hex)
+        open(upload.path, 'wb').close()
+
+        return upload
+
+    @property
+    def exists(self):
+        return os.path.exists(self.path)
+
+    @property
+    def offset(self):
+        return os.path.getsize(self.path)
+
+    def append(self, stream, offset):
+        """Agrega una parte leida de stream de a CHUNK_SIZE bytes"""
+        if offset != self.offset:
+            raise ValidationError(
+                'Expected offset {}'.format(self.offset)
+            )
+
+        with open(self.path, 'ab') as f:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if f.tell() + len(chunk) > images.max_bytes():
+                    f.truncate(offset)
+                    raise ValidationError(
+                        'Image is larger than {} bytes'.format(
+                            images.max_bytes()
+                        )
+                    )
+                f.write(chunk)
+
+        return self.offset
+
+    def complete(self):
+        """Guarda lo subido como la foto del usuario y borra la subida"""
+        try:
+            with open(self.path, 'rb') as f:
+                return save_photo(self.user, File(f))
+        finally:
+            self.discard()
+
+    def discard(self):
+        if self.exists:
+            os.remove(self.path)
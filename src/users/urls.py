@@ -1,16 +1,54 @@
 from django.urls import path
 
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.views import TokenRefreshView
-
 from users import views
 
 
 app_name = 'users'
 
 urlpatterns = [
-    path('token/', TokenObtainPairView.as_view(), name='token'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='refresh'),
+    path('token/', views.TokenObtainPairView.as_view(), name='token'),
+    path(
+        'token/refresh/',
+        views.TokenRefreshView.as_view(),
+        name='refresh'
+    ),
     path('create/', views.CreateUserView.as_view(), name='create'),
-    path('me/', views.ManageUserView.as_view(), name='me')
+    path('me/', views.ManageUserView.as_view(), name='me'),
+    path('search/', views.CandidateSearchView.as_view(), name='search'),
+    path('me/photo/', views.UploadPhotoView.as_view(), name='photo-upload'),
+    path(
+        'me/photo/uploads/',
+        views.StartPhotoUploadView.as_view(),
+        name='photo-uploads'
+    ),
+    path(
+        'me/photo/uploads/<str:upload_id>/',
+        views.PhotoUploadView.as_view(),
+        name='photo-upload-chunk'
+    ),
+    path(
+        'me/photo/uploads/<str:upload_id>/complete/',
+        views.CompletePhotoUploadView.as_view(),
+        name='photo-upload-complete'
+    ),
+    path(
+        'me/photo/<str:size>/',
+        views.PhotoThumbnailView.as_view(),
+        name='photo'
+    ),
+    path('me/resume/', views.ResumeView.as_view(), name='resume'),
+    path('me/timeline/', views.TimelineView.as_view(), name='timeline'),
+    path('me/export/', views.ExportView.as_view(), name='export'),
+    path('export/', views.ExportAllView.as_view(), name='export-all'),
+    path('import/', views.ImportView.as_view(), name='import'),
+    path(
+        'me/skills/bulk/',
+        views.BulkCreateUserSkillsView.as_view(),
+        name='skills-bulk'
+    ),
+    path(
+        'me/jobs/bulk/',
+        views.BulkCreateJobsView.as_view(),
+        name='jobs-bulk'
+    ),
 ]
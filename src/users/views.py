@@ -1,18 +1,407 @@
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import IntegrityError
+from django.http import FileResponse
+from django.http import StreamingHttpResponse
+
+from rest_framework import exceptions
 from rest_framework import generics
+from rest_framework import parsers
 from rest_framework import permissions
+from rest_framework import serializers as rest_serializers
+from rest_framework import status
+from rest_framework.response import Response
+
+from rest_framework_simplejwt import views as jwt_views
 
+from users import candidates
 from users import serializers
+from users import uploads
+
+from core import archive
+from core import images
+from core import models
+from core import routers
+
+from resumes import builder
+from resumes import timeline
+
+
+MULTIPART_OVERHEAD = 64 * 1024
+SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 500
+
+
+class TokenObtainPairView(jwt_views.TokenObtainPairView):
+    """Emite el par de tokens JWT con los claims del usuario"""
+    serializer_class = serializers.TokenObtainPairSerializer
+
+
+class TokenRefreshView(jwt_views.TokenRefreshView):
+    """Renueva el token de acceso JWT"""
+    serializer_class = serializers.TokenRefreshSerializer
 
 
 class CreateUserView(generics.CreateAPIView):
     """Crea un nuevo usuario en el sistema"""
     serializer_class = serializers.UserSerializer
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        # El nuevo usuario lee del primario hasta que las replicas lo tengan
+        routers.pin(serializer.instance.pk)
+
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(
+    routers.ReplicaReadMixin,
+    generics.RetrieveUpdateAPIView
+):
     """Administra el perfil de un usuario"""
     serializer_class = serializers.UserSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
         return self.request.user
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        routers.pin(self.request.user.pk)
+
+
+class CandidateSearchView(generics.GenericAPIView):
+    """Busca usuarios con habilidades y competencia minima
+
+    Cada requisito va como ?skill=<nombre>:<competencia minima>.
+    """
+    serializer_class = serializers.UserSerializer
+    permission_classes = (
+        permissions.IsAuthenticated,
+        permissions.IsAdminUser
+    )
+
+    def get(self, request, *args, **kwargs):
+        wanted = self.parse_requirements(request.query_params.getlist('skill'))
+        skill_ids = dict(
+            models.Skill.objects.filter(
+                name__in=wanted
+            ).values_list('name', 'id')
+        )
+        if len(skill_ids) < len(wanted):
+            user_ids = []
+        else:
+            user_ids = candidates.index.search([
+                (skill_ids[name], proficiency)
+                for name, proficiency in wanted.items()
+            ])
+
+        try:
+            limit = int(request.query_params.get('limit', SEARCH_LIMIT))
+        except ValueError:
+            limit = SEARCH_LIMIT
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+        users = get_user_model().objects.filter(
+            id__in=[int(user_id) for user_id in user_ids[:limit]]
+        ).order_by('id')
+
+        return Response({
+            'count': len(user_ids),
+            'results': self.get_serializer(users, many=True).data,
+        })
+
+    def parse_requirements(self, values):
+        if not values:
+            raise rest_serializers.ValidationError(
+                {'skill': 'At least one skill is required'}
+            )
+
+        wanted = {}
+        for value in values:
+            name, _, proficiency = value.rpartition(':')
+            if not name:
+                name, proficiency = proficiency, '1'
+            try:
+                wanted[name] = int(proficiency)
+            except ValueError:
+                raise rest_serializers.ValidationError(
+                    {'skill': 'Invalid requirement {}'.format(value)}
+                )
+
+        return wanted
+
+
+class ResumeView(routers.ReplicaReadMixin, generics.GenericAPIView):
+    """Retorna el curriculum completo del usuario"""
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        return Response(builder.get_resume(request.user))
+
+
+class UploadPhotoView(generics.GenericAPIView):
+    """Sube la foto del usuario como multipart/form-data"""
+    serializer_class = serializers.UserSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    parser_classes = (parsers.MultiPartParser,)
+
+    def put(self, request, *args, **kwargs):
+        # Se rechaza antes de leer el cuerpo
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if length > images.max_bytes() + MULTIPART_OVERHEAD:
+            raise rest_serializers.ValidationError(
+                {'photo': 'Image is larger than {} bytes'.format(
+                    images.max_bytes()
+                )}
+            )
+
+        photo = request.data.get('photo')
+        if not photo:
+            raise rest_serializers.ValidationError(
+                {'photo': 'No file was submitted'}
+            )
+        try:
+            uploads.save_photo(request.user, photo)
+        except ValidationError as e:
+            raise rest_serializers.ValidationError({'photo': e.messages})
+        routers.pin(request.user.pk)
+
+        return Response(self.get_serializer(request.user).data)
+
+
+class StartPhotoUploadView(generics.GenericAPIView):
+    """Inicia una subida de la foto por partes"""
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        try:
+            upload = uploads.ChunkedUpload.start(request.user)
+        except ValidationError as e:
+            raise rest_serializers.ValidationError(e.messages)
+
+        return Response(
+            {'id': upload.id, 'offset': 0},
+            status=status.HTTP_201_CREATED
+        )
+
+
+class PhotoUploadMixin(object):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_upload(self, upload_id):
+        try:
+            upload = uploads.ChunkedUpload(self.request.user, upload_id)
+        except ValueError:
+            raise exceptions.NotFound()
+        if not upload.exists:
+            raise exceptions.NotFound()
+
+        return upload
+
+
+class PhotoUploadView(PhotoUploadMixin, generics.GenericAPIView):
+    """Agrega una parte a la subida; el offset va en Upload-Offset"""
+
+    def head(self, request, upload_id, *args, **kwargs):
+        upload = self.get_upload(upload_id)
+        response = Response()
+        response['Upload-Offset'] = upload.offset
+
+        return response
+
+    def patch(self, request, upload_id, *args, **kwargs):
+        upload = self.get_upload(upload_id)
+        try:
+            offset = int(request.META.get('HTTP_UPLOAD_OFFSET', ''))
+        except ValueError:
+            raise rest_serializers.ValidationError(
+                'Upload-Offset header is required'
+            )
+        # Se lee el cuerpo crudo por partes, sin pasar por los parsers
+        stream = request.stream or BytesIO()
+        try:
+            offset = upload.append(stream, offset)
+        except ValidationError as e:
+            raise rest_serializers.ValidationError(e.messages)
+
+        return Response({'id': upload.id, 'offset': offset})
+
+    def delete(self, request, upload_id, *args, **kwargs):
+        self.get_upload(upload_id).discard()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CompletePhotoUploadView(PhotoUploadMixin, generics.GenericAPIView):
+    """Termina la subida por partes y guarda la foto"""
+    serializer_class = serializers.UserSerializer
+
+    def post(self, request, upload_id, *args, **kwargs):
+        upload = self.get_upload(upload_id)
+        try:
+            user = upload.complete()
+        except ValidationError as e:
+            raise rest_serializers.ValidationError({'photo': e.messages})
+        routers.pin(user.pk)
+
+        return Response(self.get_serializer(user).data)
+
+
+class TimelineView(generics.GenericAPIView):
+    """Retorna la linea de tiempo de la carrera del usuario"""
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        return Response(timeline.get_timeline(request.user))
+
+
+class PhotoThumbnailView(generics.GenericAPIView):
+    """Sirve una miniatura de la foto del usuario, nunca la original"""
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def perform_content_negotiation(self, request, force=False):
+        # El Accept de una imagen no coincide con los renderers JSON
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, size, *args, **kwargs):
+        photo = request.user.photo
+        if size not in images.THUMBNAIL_SIZES or not photo:
+            raise exceptions.NotFound()
+
+        if (
+            'image/webp' in request.META.get('HTTP_ACCEPT', '') and
+            'webp' in images.thumbnail_formats()
+        ):
+            extension = 'webp'
+        else:
+            extension = 'jpeg'
+        path = images.thumbnail_path(photo.name, size, extension)
+        if not default_storage.exists(path):
+            raise exceptions.NotFound('Thumbnail is not ready yet')
+
+        response = FileResponse(
+            default_storage.open(path),
+            content_type=images.THUMBNAIL_FORMATS[extension][1]
+        )
+        response['Vary'] = 'Accept'
+
+        return response
+
+
+class BulkCreateView(generics.GenericAPIView):
+    """Crea varios objetos del usuario en una sola transaccion
+
+    create_method es el metodo del usuario que recibe los datos validados,
+    como add_skills o add_jobs.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+    create_method = None
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        try:
+            objects = getattr(request.user, self.create_method)(
+                serializer.validated_data
+            )
+        except (ValueError, ValidationError) as e:
+            raise rest_serializers.ValidationError(str(e))
+        except IntegrityError:
+            raise rest_serializers.ValidationError(
+                'Some of the items already exist'
+            )
+        # El usuario lee del primario hasta que las replicas tengan lo nuevo
+        routers.pin(request.user.pk)
+
+        data = self.get_serializer(objects, many=True).data
+
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class BulkCreateUserSkillsView(BulkCreateView):
+    """Agrega varias habilidades al usuario"""
+    serializer_class = serializers.UserSkillSerializer
+    create_method = 'add_skills'
+
+
+class BulkCreateJobsView(BulkCreateView):
+    """Agrega varios trabajos al usuario"""
+    serializer_class = serializers.JobSerializer
+    create_method = 'add_jobs'
+
+
+class ExportView(generics.GenericAPIView):
+    """Descarga los datos de carrera del usuario como un zip
+
+    El zip se genera por partes mientras se envia. No incluye el hash de
+    la clave.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+    filename = 'career-data.zip'
+    include_passwords = False
+
+    def perform_content_negotiation(self, request, force=False):
+        # El Accept de un zip no coincide con los renderers JSON
+        return super().perform_content_negotiation(request, force=True)
+
+    def get_users(self):
+        return get_user_model().objects.filter(pk=self.request.user.pk)
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            archive.stream_archive(
+                users=self.get_users(),
+                include_passwords=self.include_passwords
+            ),
+            content_type='application/zip'
+        )
+        response['Content-Disposition'] = 'attachment; filename="{}"'.format(
+            self.filename
+        )
+
+        return response
+
+
+class ExportAllView(ExportView):
+    """Descarga los datos de todos los usuarios y el catalogo de
+    habilidades, con los hashes de las claves
+    """
+    permission_classes = (
+        permissions.IsAuthenticated,
+        permissions.IsAdminUser
+    )
+    filename = 'export.zip'
+    include_passwords = True
+
+    def get_users(self):
+        # Sin filtro tambien se exporta el catalogo de habilidades
+        return None
+
+
+class ImportView(generics.GenericAPIView):
+    """Importa un zip de ExportView o ExportAllView
+
+    Los usuarios que ya existen se saltan. Para archivos muy grandes
+    conviene el comando import_data.
+    """
+    permission_classes = (
+        permissions.IsAuthenticated,
+        permissions.IsAdminUser
+    )
+    parser_classes = (parsers.MultiPartParser,)
+
+    def post(self, request, *args, **kwargs):
+        file = request.FILES.get('archive')
+        if file is None:
+            raise rest_serializers.ValidationError(
+                {'archive': 'This field is required.'}
+            )
+        try:
+            counts = archive.import_archive(file)
+        except (ValueError, KeyError) as e:
+            raise rest_serializers.ValidationError(
+                {'archive': 'Invalid archive: {}'.format(e)}
+            )
+
+        return Response(counts, status=status.HTTP_201_CREATED)